@@ -0,0 +1,359 @@
+"""
+Benchmarks reproducibles del sistema de análisis postural
+Corre sin cámara ni ventanas y guarda los resultados en JSON para comparar entre commits
+
+Uso:
+    python benchmark.py                                    # Todos los benchmarks con datos sintéticos
+    python benchmark.py --source grabaciones/sesion.mp4    # Extremo a extremo sobre un video
+    python benchmark.py --compare benchmarks/base.json     # Falla si alguna tasa cae más de --tolerance
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+import numpy as np
+from posture_analysis import KEY_POINT_INDICES, NUM_LANDMARKS
+
+# === DATOS SINTÉTICOS ===
+# Postura correcta de referencia (x, y, z normalizados) para nariz, orejas, hombros y caderas
+GOOD_KEY_POINTS = np.array([
+    [0.50, 0.30, -0.30],  # nariz
+    [0.55, 0.28, -0.10],  # oreja izquierda
+    [0.45, 0.28, -0.10],  # oreja derecha
+    [0.62, 0.50, -0.05],  # hombro izquierdo
+    [0.38, 0.50, -0.05],  # hombro derecho
+    [0.58, 0.85, 0.00],   # cadera izquierda
+    [0.42, 0.85, 0.00]    # cadera derecha
+])
+# Cabeza adelantada e inclinada hacia abajo
+BAD_OFFSET = np.zeros_like(GOOD_KEY_POINTS)
+BAD_OFFSET[0] = [0.0, 0.06, -0.35]
+
+
+def synthetic_session(calibration_frames=90, good_frames=600, bad_frames=600, fps=30.0, noise=0.002, seed=0):
+    """
+    Genera una sesión sintética: calibración, postura correcta y postura incorrecta
+    Args:
+        calibration_frames, good_frames, bad_frames: Frames de cada segmento
+        fps: Tasa de las marcas de tiempo
+        noise: Desviación estándar del ruido de los landmarks
+        seed: Semilla del generador
+    Returns:
+        tuple: (landmarks (N, 33, 4), timestamps (N,), bad (N,) con la etiqueta de cada frame)
+    """
+    rng = np.random.default_rng(seed)
+    total = calibration_frames + good_frames + bad_frames
+
+    bad = np.zeros(total, dtype=bool)
+    bad[calibration_frames + good_frames:] = True
+
+    # Landmarks no usados por el análisis: alrededor del centro del torso
+    landmarks = np.empty((total, NUM_LANDMARKS, 4))
+    landmarks[:, :, :3] = GOOD_KEY_POINTS.mean(axis=0) + rng.normal(0, 0.1, (NUM_LANDMARKS, 3))
+    landmarks[:, KEY_POINT_INDICES, :3] = GOOD_KEY_POINTS + bad[:, None, None] * BAD_OFFSET
+    landmarks[:, :, :3] += rng.normal(0, noise, (total, NUM_LANDMARKS, 3))
+    landmarks[:, :, 3] = 0.99
+
+    timestamps = 1_000_000.0 + np.arange(total) / fps
+    return landmarks, timestamps, bad
+
+
+def latency_summary(latencies, elapsed, frames):
+    """
+    Tasa y percentiles de latencia de una serie de mediciones
+    Args:
+        latencies: Duraciones por operación en segundos
+        elapsed: Tiempo total en segundos
+        frames: Operaciones realizadas
+    """
+    p50, p95, p99 = np.percentile(latencies, (50, 95, 99)) * 1e6
+    return {
+        'frames': frames,
+        'elapsed_s': elapsed,
+        'fps': frames / elapsed if elapsed > 0 else 0.0,
+        'latency_us': {'p50': float(p50), 'p95': float(p95), 'p99': float(p99)}
+    }
+
+
+# === BENCHMARKS ===
+def bench_analysis(landmarks, timestamps, expected_bad):
+    """
+    Etapa de análisis de PostureDetector (calibración + analizadores + filtrado), frame a frame
+    y en lote con evaluate_batch
+    """
+    from posture_detector import PostureDetector
+
+    detector = PostureDetector(enable_inference=False)
+    detector.start_calibration()
+
+    latencies = np.empty(len(landmarks))
+    verdicts = np.zeros(len(landmarks), dtype=bool)
+    start = time.perf_counter()
+    for i in range(len(landmarks)):
+        frame_start = time.perf_counter()
+        verdicts[i], _, _ = detector.analyze_landmarks(landmarks[i], timestamps[i])
+        latencies[i] = time.perf_counter() - frame_start
+    elapsed = time.perf_counter() - start
+
+    result = latency_summary(latencies, elapsed, len(landmarks))
+
+    # Comprobación de los datos: la postura incorrecta debe detectarse
+    result['bad_detected_ratio'] = float(verdicts[expected_bad].mean()) if expected_bad.any() else 0.0
+    result['good_flagged_ratio'] = float(verdicts[~expected_bad][detector.CALIBRATION_FRAMES_NEEDED + 1:].mean())
+
+    batch_start = time.perf_counter()
+    detector.evaluate_batch(landmarks, timestamps=timestamps)
+    batch_elapsed = time.perf_counter() - batch_start
+    result['batch_fps'] = len(landmarks) / batch_elapsed if batch_elapsed > 0 else 0.0
+    return result
+
+
+def bench_statistics(expected_bad, timestamps):
+    """
+    Rendimiento de PostureStatistics.update_posture_state con el reloj de los datos
+    """
+    from posture_statistics import PostureStatistics
+
+    clock_time = [timestamps[0]]
+    statistics = PostureStatistics(clock=lambda: clock_time[0])
+    statistics.start_session()
+
+    issues = ["Cabeza muy adelantada", "Cabeza inclinada hacia abajo"]
+    latencies = np.empty(len(expected_bad))
+    start = time.perf_counter()
+    for i, bad in enumerate(expected_bad):
+        clock_time[0] = timestamps[i]
+        update_start = time.perf_counter()
+        statistics.update_posture_state(not bad, issues if bad else None)
+        latencies[i] = time.perf_counter() - update_start
+    elapsed = time.perf_counter() - start
+
+    summary_start = time.perf_counter()
+    statistics.get_statistics_summary()
+    result = latency_summary(latencies, elapsed, len(expected_bad))
+    result['summary_us'] = (time.perf_counter() - summary_start) * 1e6
+    return result
+
+
+def bench_dashboard(expected_bad, timestamps, redraws=20):
+    """
+    Redibujado de los gráficos del dashboard sobre un lienzo Agg (sin ventana)
+    """
+    try:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        from dashboard import PostureDashboard
+        from posture_statistics import PostureStatistics
+    except ImportError as e:
+        return {'skipped': f"Dependencia no disponible: {e}"}
+
+    clock_time = [timestamps[0]]
+    statistics = PostureStatistics(clock=lambda: clock_time[0])
+    statistics.start_session()
+    for i, bad in enumerate(expected_bad):
+        clock_time[0] = timestamps[i]
+        statistics.update_posture_state(not bad, ["Cabeza muy adelantada"] if bad else None)
+
+    # Mismo lienzo que el dashboard, sin Tk
+    dashboard = PostureDashboard(statistics)
+    dashboard.figure = Figure(figsize=(12, 6), facecolor='#f0f0f0')
+    dashboard.ax1 = dashboard.figure.add_subplot(121)
+    dashboard.ax2 = dashboard.figure.add_subplot(122)
+    dashboard.canvas = FigureCanvasAgg(dashboard.figure)
+    dashboard._init_charts()
+    dashboard._update_charts()  # Calentamiento (fuentes, caché de texto, fondo)
+
+    # Entre refrescos la sesión avanza (cambia la postura), como en el dashboard en vivo
+    latencies = np.empty(redraws)
+    start = time.perf_counter()
+    for i in range(redraws):
+        clock_time[0] += 1.0
+        statistics.update_posture_state(i % 2 == 0, None if i % 2 == 0 else ["Cabeza muy adelantada"])
+        redraw_start = time.perf_counter()
+        dashboard._update_charts()
+        latencies[i] = time.perf_counter() - redraw_start
+    elapsed = time.perf_counter() - start
+
+    result = latency_summary(latencies, elapsed, redraws)
+    result['full_redraws'] = dashboard.full_redraws
+    result['blit_redraws'] = dashboard.blit_redraws
+    result['redraws_per_s'] = result.pop('fps')
+    return result
+
+
+def synthetic_frames(landmarks, width=640, height=480):
+    """
+    Dibuja los puntos clave sintéticos como figura de palitos sobre un fondo gris
+    """
+    import cv2
+
+    for frame_landmarks in landmarks:
+        image = np.full((height, width, 3), 90, dtype=np.uint8)
+        points = (frame_landmarks[KEY_POINT_INDICES, :2] * (width, height)).astype(int)
+        for a, b in ((1, 2), (3, 4), (3, 5), (4, 6), (5, 6)):
+            cv2.line(image, tuple(points[a]), tuple(points[b]), (220, 220, 220), 8)
+        cv2.circle(image, tuple(points[0]), 40, (200, 180, 160), -1)
+        yield image
+
+
+def bench_end_to_end(landmarks, timestamps, source=None, max_frames=300, profile='full'):
+    """
+    Extremo a extremo: fuente de frames + espejo + MediaPipe + análisis
+    Args:
+        source: Video o carpeta de imágenes; None usa frames sintéticos
+        max_frames: Frames a procesar
+        profile: Perfil del modelo
+    """
+    try:
+        from posture_detector import PostureDetector
+        detector = PostureDetector(profile=profile)
+    except ImportError as e:
+        return {'skipped': f"Dependencia no disponible: {e}"}
+
+    detector.draw_pose = False
+    detector.start_calibration()
+
+    if source:
+        from frame_sources import open_source
+        frame_source = open_source(source)
+        frame_source.profiler = detector.profiler
+
+        def frames():
+            for _ in range(max_frames):
+                ret, frame, timestamp = frame_source.read()
+                if not ret:
+                    return
+                yield frame, timestamp
+    else:
+        frame_source = None
+
+        def frames():
+            images = synthetic_frames(landmarks[:max_frames])
+            for image, timestamp in zip(images, timestamps):
+                yield image, timestamp
+
+    latencies = []
+    start = time.perf_counter()
+    for frame, timestamp in frames():
+        frame_start = time.perf_counter()
+        detector.detect_posture(frame, timestamp)
+        latencies.append(time.perf_counter() - frame_start)
+    elapsed = time.perf_counter() - start
+
+    if frame_source:
+        frame_source.release()
+    if not latencies:
+        return {'skipped': "La fuente no entregó frames"}
+
+    result = latency_summary(np.array(latencies), elapsed, len(latencies))
+    result['source'] = source or 'synthetic'
+    result['profile'] = detector.profile
+    result['inference_ratio'] = detector.scheduler.get_counters()['inference_ratio']
+    result['stages_ms'] = {name: {key: entry[key] for key in ('p50', 'p95', 'p99') if key in entry}
+                           for name, entry in detector.profiler.summary().items()}
+    return result
+
+
+# === RESULTADOS ===
+def git_commit():
+    """Commit actual del repositorio, None si no está disponible"""
+    try:
+        output = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5)
+        return output.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare_results(current, baseline, tolerance):
+    """
+    Compara las tasas (fps, batch_fps, redraws_per_s) contra una ejecución anterior
+    Returns:
+        list: Regresiones como (benchmark, métrica, anterior, actual)
+    """
+    regressions = []
+    print(f"\n📈 Comparación contra {baseline['meta'].get('commit')} (tolerancia {tolerance * 100:.0f}%)")
+    for name, result in current['results'].items():
+        previous = baseline['results'].get(name, {})
+        for metric in ('fps', 'batch_fps', 'redraws_per_s'):
+            if metric not in result or metric not in previous:
+                continue
+            ratio = result[metric] / previous[metric] if previous[metric] else float('inf')
+            marker = "❌" if ratio < 1 - tolerance else "✅"
+            print(f"   {marker} {name}.{metric}: {previous[metric]:.1f} → {result[metric]:.1f} ({ratio:.2f}x)")
+            if ratio < 1 - tolerance:
+                regressions.append((name, metric, previous[metric], result[metric]))
+    return regressions
+
+
+def main():
+    """
+    Función principal
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks del sistema de análisis postural")
+    parser.add_argument('--only', nargs='+', choices=['analysis', 'statistics', 'dashboard', 'end_to_end'],
+                        help="Benchmarks a ejecutar (por defecto todos)")
+    parser.add_argument('--source', help="Video o carpeta de imágenes para el benchmark extremo a extremo")
+    parser.add_argument('--frames', type=int, default=300, help="Frames del benchmark extremo a extremo")
+    parser.add_argument('--profile', default='full', choices=['lite', 'full', 'heavy'],
+                        help="Perfil del modelo para el benchmark extremo a extremo")
+    parser.add_argument('--seed', type=int, default=0, help="Semilla de los datos sintéticos")
+    parser.add_argument('--output', help="Archivo JSON de resultados (por defecto benchmarks/benchmark_<fecha>.json)")
+    parser.add_argument('--compare', metavar='ANTERIOR.json', help="Resultados anteriores para detectar regresiones")
+    parser.add_argument('--tolerance', type=float, default=0.1, help="Caída de tasa tolerada (0.1 = 10%%)")
+    args = parser.parse_args()
+
+    selected = args.only or ['analysis', 'statistics', 'dashboard', 'end_to_end']
+    landmarks, timestamps, expected_bad = synthetic_session(seed=args.seed)
+
+    benchmarks = {
+        'analysis': lambda: bench_analysis(landmarks, timestamps, expected_bad),
+        'statistics': lambda: bench_statistics(expected_bad, timestamps),
+        'dashboard': lambda: bench_dashboard(expected_bad, timestamps),
+        'end_to_end': lambda: bench_end_to_end(landmarks, timestamps, args.source, args.frames, args.profile)
+    }
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'frames': len(landmarks)
+        },
+        'results': {}
+    }
+
+    for name in selected:
+        print(f"⏱️  {name}...")
+        result = benchmarks[name]()
+        report['results'][name] = result
+        if 'skipped' in result:
+            print(f"   ⚠️  Omitido: {result['skipped']}")
+        else:
+            rate = result.get('fps', result.get('redraws_per_s', 0.0))
+            print(f"   {rate:.1f}/s | p50 {result['latency_us']['p50']:.0f}µs | p99 {result['latency_us']['p99']:.0f}µs")
+
+    output = args.output or os.path.join('benchmarks', f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Resultados: {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare_results(report, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
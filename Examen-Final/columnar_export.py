@@ -0,0 +1,137 @@
+"""
+Exportación columnar por frame
+Cada columna (marca de tiempo, las cinco mediciones, cada problema y el veredicto suavizado) se
+escribe por bloques en su propio archivo .npy durante la sesión; se leen sin copias con
+np.load(ruta, mmap_mode='r') o todas juntas con load_frame_columns()
+
+Formato (una carpeta por sesión):
+    timestamp.npy, <medición>.npy, issue_<i>.npy, bad_posture.npy, ...
+    columns.json  - Esquema: columnas, tipos, nombres de problemas y número de frames
+"""
+
+import json
+import os
+import numpy as np
+from npy_stream import NpyStreamWriter
+from posture_analysis import MEASUREMENT_NAMES
+
+FORMAT_VERSION = 1
+SCHEMA_FILE = 'columns.json'
+
+# Columnas fijas: nombre -> tipo
+BASE_COLUMNS = {
+    'timestamp': '<f8',
+    'has_pose': 'u1',
+    'calibrating': 'u1',
+    'inferred': 'u1',     # 0 si el frame reutilizó el resultado anterior (inferencia adaptativa)
+    'bad_posture': 'u1'   # Veredicto suavizado del detector
+}
+MEASUREMENT_DTYPE = '<f4'  # NaN en frames sin pose
+
+
+def issue_column(index):
+    """Nombre de la columna del problema con ese índice"""
+    return f"issue_{index}"
+
+
+class ColumnarFrameExporter:
+    """
+    Escribe una fila por frame repartida en columnas .npy
+    """
+
+    def __init__(self, directory, issue_names, chunk_size=1024):
+        """
+        Inicializa los escritores de cada columna
+        Args:
+            directory: Carpeta de la sesión (se crea)
+            issue_names: Nombres de los problemas en el orden de PostureDetector.posture_checks
+            chunk_size: Frames acumulados en memoria por columna antes de escribir
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.issue_names = list(issue_names)
+        self._issue_index = {name: i for i, name in enumerate(self.issue_names)}
+
+        self.columns = dict(BASE_COLUMNS)
+        self.columns.update({name: MEASUREMENT_DTYPE for name in MEASUREMENT_NAMES})
+        self.columns.update({issue_column(i): 'u1' for i in range(len(self.issue_names))})
+
+        self.writers = {name: NpyStreamWriter(os.path.join(directory, f"{name}.npy"), dtype, chunk_size)
+                        for name, dtype in self.columns.items()}
+        self._measurement_writers = [self.writers[name] for name in MEASUREMENT_NAMES]
+        self._issue_writers = [self.writers[issue_column(i)] for i in range(len(self.issue_names))]
+        self._write_schema()
+
+        print(f"🗂️  Exportación columnar por frame: {directory}")
+
+    def append(self, timestamp, measurements, posture_issues, is_bad_posture, calibrating, inferred=True):
+        """
+        Agrega un frame
+        Args:
+            timestamp: Marca de tiempo del frame
+            measurements: Arreglo con las cinco mediciones en el orden de MEASUREMENT_NAMES, o None sin pose
+            posture_issues: Problemas detectados en el frame
+            is_bad_posture: Veredicto suavizado
+            calibrating: Si el detector estaba calibrando
+            inferred: Si el frame pasó por MediaPipe
+        """
+        writers = self.writers
+        writers['timestamp'].append(timestamp)
+        writers['has_pose'].append(measurements is not None)
+        writers['calibrating'].append(calibrating)
+        writers['inferred'].append(inferred)
+        writers['bad_posture'].append(is_bad_posture)
+
+        for i, writer in enumerate(self._measurement_writers):
+            writer.append(np.nan if measurements is None else measurements[i])
+
+        flags = [0] * len(self._issue_writers)
+        for issue in posture_issues:
+            index = self._issue_index.get(issue)
+            if index is not None:
+                flags[index] = 1
+        for writer, flag in zip(self._issue_writers, flags):
+            writer.append(flag)
+
+    def __len__(self):
+        return len(self.writers['timestamp'])
+
+    def _write_schema(self):
+        """Escribe el esquema de la carpeta"""
+        schema = {
+            'version': FORMAT_VERSION,
+            'frame_count': len(self),
+            'columns': self.columns,
+            'measurement_names': list(MEASUREMENT_NAMES),
+            'issue_names': self.issue_names,
+            'issue_columns': [issue_column(i) for i in range(len(self.issue_names))]
+        }
+        with open(os.path.join(self.directory, SCHEMA_FILE), 'w', encoding='utf-8') as f:
+            json.dump(schema, f, indent=2, ensure_ascii=False)
+
+    def close(self):
+        """Vacía y cierra todas las columnas"""
+        if self.writers['timestamp'].file is None:
+            return
+
+        for writer in self.writers.values():
+            writer.close()
+        self._write_schema()
+        print(f"💾 Exportación columnar guardada: {self.directory} ({len(self)} frames)")
+
+
+def load_frame_columns(directory):
+    """
+    Abre las columnas de una sesión sin copiarlas a memoria
+    Args:
+        directory: Carpeta creada por ColumnarFrameExporter
+    Returns:
+        tuple: (columnas {nombre: memmap}, esquema)
+    """
+    with open(os.path.join(directory, SCHEMA_FILE), encoding='utf-8') as f:
+        schema = json.load(f)
+
+    # Todas las columnas se recortan al mismo número de frames (por si la sesión se interrumpió)
+    columns = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r') for name in schema['columns']}
+    frame_count = min(len(column) for column in columns.values())
+    return {name: column[:frame_count] for name, column in columns.items()}, schema
@@ -8,6 +8,7 @@ from tkinter import ttk, messagebox, filedialog
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
+import math
 import os
 
 class PostureDashboard:
@@ -15,16 +16,14 @@ class PostureDashboard:
     Dashboard visual para mostrar estadísticas de postura (versión simplificada)
     """
     
-    def __init__(self, statistics, main_system=None):
+    def __init__(self, statistics):
         """
         Inicializa el dashboard
         
         Args:
-            statistics (PostureStatistics): Instancia del sistema de estadísticas
-            main_system: Referencia al sistema principal para control de cámara
+            statistics: PostureStatistics, o SnapshotStatistics en el proceso del dashboard
         """
         self.statistics = statistics
-        self.main_system = main_system
         self.window = None
         
         # Referencias a los gráficos
@@ -33,6 +32,24 @@ class PostureDashboard:
         self.ax2 = None  # Gráfico circular (distribución tiempo)
         self.canvas = None
         
+        # Artistas persistentes (se actualizan sus datos, no se recrean)
+        self._bar_container = None
+        self._bar_labels = []
+        self._bar_problems = None
+        self._bar_ylim = 0
+        self._problems_placeholder = None
+        self._time_placeholder = None
+        self._pie_artists = []
+        self._background = None  # Fondo en caché para blitting
+        self._chart_state = None  # Datos dibujados por última vez
+        
+        # Refresco periódico y contadores de redibujado
+        self.REFRESH_RATE = 4.0  # Refrescos por segundo
+        self._refresh_job = None
+        self.full_redraws = 0
+        self.blit_redraws = 0
+        self.skipped_redraws = 0
+        
         # Variables de la interfaz
         self.session_time_var = None
         self.good_time_var = None
@@ -91,8 +108,8 @@ class PostureDashboard:
         
         print("🔍 DEBUG: Actualizando display...")
         
-        # Actualizar una vez al inicio
-        self._update_display()
+        # Actualizar al inicio y luego periódicamente
+        self._schedule_refresh()
         
         print("🔍 DEBUG: Ventana completamente configurada")
     
@@ -146,7 +163,8 @@ class PostureDashboard:
         self.canvas = FigureCanvasTkAgg(self.figure, charts_frame)
         self.canvas.get_tk_widget().pack(fill='both', expand=True)
         
-        # Inicializar gráficos vacíos
+        # Crear artistas y dibujar por primera vez
+        self._init_charts()
         self._update_charts()
     
     def _create_buttons_section(self):
@@ -195,7 +213,7 @@ class PostureDashboard:
     def _update_display(self):
         """Actualiza todos los elementos de la interfaz"""
         try:
-            stats = self.statistics.get_statistics_summary()
+            stats = self.statistics.get_cached_summary()
             
             # Actualizar variables de texto del header
             self.session_time_var.set(f"Tiempo: {stats['session_duration_formatted']}")
@@ -204,109 +222,205 @@ class PostureDashboard:
             self.alerts_var.set(f"Alertas: {stats['alert_count']}")
             
             # Actualizar gráficos
-            self._update_charts()
+            self._update_charts(stats)
             
         except Exception as e:
             print(f"Error actualizando display: {e}")
     
-    def _update_charts(self):
-        """Actualiza los gráficos con datos actuales"""
+    def _update_charts(self, stats=None):
+        """
+        Actualiza los gráficos con datos actuales: solo cambia los datos de los artistas y
+        redibuja sobre el fondo en caché (blitting). Un dibujo completo solo ocurre al cambiar
+        la estructura (nuevo problema, escala del eje) y nada se redibuja si los datos no cambiaron
+        """
         try:
-            stats = self.statistics.get_statistics_summary()
+            if stats is None:
+                stats = self.statistics.get_cached_summary()
             
-            # Limpiar gráficos
-            self.ax1.clear()
-            self.ax2.clear()
+            # Lo que se ve en los gráficos (porcentaje con la precisión de la etiqueta)
+            chart_state = (tuple(stats['problem_counts'].items()), round(stats['good_percentage'], 1),
+                           stats['good_posture_time'] > 0, stats['bad_posture_time'] > 0)
+            if chart_state == self._chart_state:
+                self.skipped_redraws += 1
+                return
+            self._chart_state = chart_state
             
             # Gráfico de barras - Tipos de problemas
-            self._create_problems_chart(stats)
+            rebuilt = self._update_problems_chart(stats['problem_counts'])
             
             # Gráfico circular - Distribución de tiempo
-            self._create_time_distribution_chart(stats)
+            self._update_time_distribution_chart(stats)
             
-            # Ajustar layout y actualizar
-            self.figure.tight_layout()
-            self.canvas.draw()
+            if rebuilt or self._background is None:
+                # Dibujo completo: _on_draw guarda el nuevo fondo
+                self.figure.tight_layout()
+                self.canvas.draw()
+                self.full_redraws += 1
+            else:
+                self.canvas.restore_region(self._background)
+                self._draw_animated()
+                self.canvas.blit(self.figure.bbox)
+                self.blit_redraws += 1
             
         except Exception as e:
             print(f"Error actualizando gráficos: {e}")
     
-    def _create_problems_chart(self, stats):
-        """Crea el gráfico de barras con tipos de problemas"""
-        problem_counts = stats['problem_counts']
-        
-        if not problem_counts:
-            # Si no hay datos, mostrar mensaje
-            self.ax1.text(0.5, 0.5, 'Sin problemas detectados aún', 
-                         ha='center', va='center', transform=self.ax1.transAxes,
-                         fontsize=12, color='gray')
-            self.ax1.set_title('Tipos de Problemas Detectados', fontsize=14, fontweight='bold')
-            return
-        
-        # Traducir nombres y preparar datos
-        problems = []
-        counts = []
-        colors = ['#e74c3c', '#f39c12', '#9b59b6', '#3498db', '#e67e22', '#1abc9c']
-        
-        for i, (problem, count) in enumerate(problem_counts.items()):
-            problem_name = self._translate_problem_name(problem)
-            problems.append(problem_name)
-            counts.append(count)
-        
-        # Crear gráfico de barras
-        bars = self.ax1.bar(problems, counts, color=colors[:len(problems)])
+    def _init_charts(self):
+        """
+        Crea una sola vez los artistas de ambos gráficos; las actualizaciones cambian sus datos.
+        Los artistas de datos son animados: no forman parte del fondo en caché
+        """
+        # Una ventana nueva trae figura nueva: olvidar los artistas y el fondo anteriores
+        self._bar_container = None
+        self._bar_labels = []
+        self._bar_problems = None
+        self._background = None
+        self._chart_state = None
+
+        self.canvas.mpl_connect('draw_event', self._on_draw)
         
-        # Configurar el gráfico
         self.ax1.set_title('Tipos de Problemas Detectados', fontsize=14, fontweight='bold')
-        self.ax1.set_ylabel('Cantidad de Detecciones')
+        self._problems_placeholder = self.ax1.text(0.5, 0.5, 'Sin problemas detectados aún',
+                                                   ha='center', va='center', transform=self.ax1.transAxes,
+                                                   fontsize=12, color='gray', animated=True)
+        self._build_problem_bars([], 0)
         
-        # Rotar etiquetas si son muy largas
-        if len(max(problems, key=len)) > 10:
-            self.ax1.tick_params(axis='x', rotation=45)
-        
-        # Agregar valores encima de las barras
-        for bar, count in zip(bars, counts):
-            height = bar.get_height()
-            self.ax1.text(bar.get_x() + bar.get_width()/2., height + 0.1,
-                         f'{count}', ha='center', va='bottom', fontweight='bold')
-    
-    def _create_time_distribution_chart(self, stats):
-        """Crea el gráfico circular con distribución de tiempo"""
-        good_time = stats['good_posture_time']
-        bad_time = stats['bad_posture_time']
-        
-        if good_time == 0 and bad_time == 0:
-            # Si no hay datos, mostrar mensaje
-            self.ax2.text(0.5, 0.5, 'Sesión no iniciada', 
-                         ha='center', va='center', transform=self.ax2.transAxes,
-                         fontsize=12, color='gray')
-            self.ax2.set_title('Distribución del Tiempo', fontsize=14, fontweight='bold')
-            return
+        self.ax2.set_title('Distribución del Tiempo', fontsize=14, fontweight='bold')
+        self._time_placeholder = self.ax2.text(0.5, 0.5, 'Sesión no iniciada',
+                                               ha='center', va='center', transform=self.ax2.transAxes,
+                                               fontsize=12, color='gray', animated=True)
+        wedges, texts, autotexts = self.ax2.pie([1, 1], labels=['Buena Postura', 'Mala Postura'],
+                                                colors=['#27ae60', '#e74c3c'],
+                                                autopct='%1.1f%%', startangle=90)
         
-        # Preparar datos para el gráfico circular
-        sizes = [good_time, bad_time]
-        labels = ['Buena Postura', 'Mala Postura']
-        colors = ['#27ae60', '#e74c3c']
+        # Mejorar apariencia del texto
+        for autotext in autotexts:
+            autotext.set_color('white')
+            autotext.set_fontweight('bold')
         
-        # Filtrar valores cero
-        filtered_data = [(size, label, color) for size, label, color in zip(sizes, labels, colors) if size > 0]
+        self._pie_artists = list(zip(wedges, texts, autotexts))
+        for artists in self._pie_artists:
+            for artist in artists:
+                artist.set_animated(True)
+    
+    def _build_problem_bars(self, problems, max_count):
+        """
+        Recrea las barras cuando cambian los tipos de problema o los conteos superan la escala del eje
+        Args:
+            problems: Claves de los problemas en orden de aparición
+            max_count: Conteo más alto (el eje se escala al doble para crecer sin redibujar)
+        """
+        if self._bar_container is not None:
+            self._bar_container.remove()
+        for label in self._bar_labels:
+            label.remove()
         
-        if not filtered_data:
-            return
+        positions = list(range(len(problems)))
+        colors = ['#e74c3c', '#f39c12', '#9b59b6', '#3498db', '#e67e22', '#1abc9c']
+        names = [self._translate_problem_name(problem) for problem in problems]
         
-        sizes, labels, colors = zip(*filtered_data)
+        self._bar_container = self.ax1.bar(positions, [0] * len(problems),
+                                           color=[colors[i % len(colors)] for i in positions], animated=True)
+        self._bar_labels = [self.ax1.text(i, 0, '', ha='center', va='bottom', fontweight='bold', animated=True)
+                            for i in positions]
         
-        # Crear gráfico circular
-        wedges, texts, autotexts = self.ax2.pie(sizes, labels=labels, colors=colors, 
-                                               autopct='%1.1f%%', startangle=90)
+        self.ax1.set_xticks(positions)
+        self.ax1.set_xticklabels(names)
         
-        # Configurar estilo
-        self.ax2.set_title('Distribución del Tiempo', fontsize=14, fontweight='bold')
+        # Rotar etiquetas si son muy largas
+        self.ax1.tick_params(axis='x', rotation=45 if names and len(max(names, key=len)) > 10 else 0)
         
-        # Mejorar apariencia del texto
-        for autotext in autotexts:
-            autotext.set_color('white')
-            autotext.set_fontweight('bold')
+        self.ax1.set_xlim(-0.6, max(len(problems), 1) - 0.4)
+        self._bar_ylim = max(10, 2 * max_count)
+        self.ax1.set_ylim(0, self._bar_ylim)
+        self.ax1.set_ylabel('Cantidad de Detecciones' if problems else '')
+        self._bar_problems = list(problems)
+    
+    def _update_problems_chart(self, problem_counts):
+        """
+        Actualiza la altura y el valor de cada barra
+        Returns:
+            bool: True si las barras se recrearon (requiere un dibujo completo)
+        """
+        problems = list(problem_counts)
+        counts = list(problem_counts.values())
+        max_count = max(counts, default=0)
+        
+        # Dejar espacio para el valor encima de la barra más alta
+        rebuild = problems != self._bar_problems or max_count > 0.85 * self._bar_ylim
+        if rebuild:
+            self._build_problem_bars(problems, max_count)
+        
+        for bar, label, count in zip(self._bar_container.patches, self._bar_labels, counts):
+            bar.set_height(count)
+            label.set_position((bar.get_x() + bar.get_width() / 2., count + 0.1))
+            label.set_text(f'{count}')
+        
+        self._problems_placeholder.set_visible(not problems)
+        return rebuild
+    
+    def _update_time_distribution_chart(self, stats):
+        """Actualiza ángulos y etiquetas de las porciones del gráfico circular"""
+        sizes = [stats['good_posture_time'], stats['bad_posture_time']]
+        total = sum(sizes)
+        self._time_placeholder.set_visible(total <= 0)
+        
+        # Misma geometría que Axes.pie: inicio a 90°, etiquetas a 1.1 y porcentajes a 0.6 del radio
+        theta = 90.0
+        for size, (wedge, label, autotext) in zip(sizes, self._pie_artists):
+            fraction = size / total if total > 0 else 0.0
+            for artist in (wedge, label, autotext):
+                artist.set_visible(fraction > 0)  # Ocultar porciones vacías
+            if fraction <= 0:
+                continue
+            
+            wedge.set_theta1(theta)
+            wedge.set_theta2(theta + 360 * fraction)
+            middle = math.radians(theta + 180 * fraction)
+            x, y = math.cos(middle), math.sin(middle)
+            label.set_position((1.1 * x, 1.1 * y))
+            label.set_horizontalalignment('left' if x > 0 else 'right')
+            autotext.set_position((0.6 * x, 0.6 * y))
+            autotext.set_text(f'{fraction * 100:.1f}%')
+            theta += 360 * fraction
+    
+    def _animated_artists(self):
+        """Artistas de datos que se dibujan sobre el fondo en caché"""
+        artists = [self._problems_placeholder, self._time_placeholder]
+        artists.extend(self._bar_container.patches)
+        artists.extend(self._bar_labels)
+        for pie_artists in self._pie_artists:
+            artists.extend(pie_artists)
+        return artists
+    
+    def _draw_animated(self):
+        """Dibuja los artistas de datos (los invisibles se omiten solos)"""
+        for artist in self._animated_artists():
+            artist.axes.draw_artist(artist)
+    
+    def _on_draw(self, event):
+        """
+        Tras cada dibujo completo (creación, cambio de estructura, redimensionar la ventana)
+        guarda el fondo sin datos y dibuja los datos encima
+        """
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_animated()
+    
+    def _schedule_refresh(self):
+        """Refresca el dashboard REFRESH_RATE veces por segundo mientras la ventana exista"""
+        if not self._window_exists():
+            return
+        self._update_display()
+        self._refresh_job = self.window.after(int(1000 / self.REFRESH_RATE), self._schedule_refresh)
+    
+    def _cancel_refresh(self):
+        """Cancela el refresco periódico pendiente"""
+        if self._refresh_job is not None and self.window:
+            try:
+                self.window.after_cancel(self._refresh_job)
+            except Exception:
+                pass
+        self._refresh_job = None
     
     def _translate_problem_name(self, problem_key):
         """Traduce nombres técnicos a nombres legibles (versión corta para gráficos)"""
@@ -336,23 +450,32 @@ class PostureDashboard:
             )
             
             if filename:
-                # Exportar usando el método del statistics
-                self.statistics.export_to_csv(os.path.basename(filename))
+                # Exportar usando el método del statistics en la ubicación elegida
+                result = self.statistics.export_to_csv(os.path.basename(filename), output_dir=os.path.dirname(filename))
                 
-                # Copiar a la ubicación elegida si es diferente
-                if not filename.endswith(os.path.basename(filename)):
-                    import shutil
-                    default_path = os.path.join("estadisticas", os.path.basename(filename))
-                    if os.path.exists(default_path):
-                        shutil.copy2(default_path, filename)
-                
-                messagebox.showinfo("Exportación Exitosa", 
-                                  f"Estadísticas exportadas a:\n{filename}")
-                print(f"💾 Datos exportados: {filename}")
+                if result is None:
+                    # Dashboard en su propio proceso: el resultado llega con show_export_result
+                    print(f"⏳ Exportación solicitada: {filename}")
+                else:
+                    self.show_export_result(filename)
             
         except Exception as e:
-            messagebox.showerror("Error de Exportación", f"Error al exportar: {str(e)}")
-            print(f"❌ Error exportando: {e}")
+            self.show_export_result(None, str(e))
+    
+    def show_export_result(self, path, error=None):
+        """
+        Informa al usuario el resultado de una exportación
+        Args:
+            path: Archivo exportado
+            error: Mensaje de error, None si se exportó
+        """
+        if error is None:
+            messagebox.showinfo("Exportación Exitosa", 
+                              f"Estadísticas exportadas a:\n{path}")
+            print(f"💾 Datos exportados: {path}")
+        else:
+            messagebox.showerror("Error de Exportación", f"Error al exportar: {error}")
+            print(f"❌ Error exportando: {error}")
     
     def _reset_statistics(self):
         """Reinicia las estadísticas después de confirmación"""
@@ -366,14 +489,11 @@ class PostureDashboard:
             print("🔄 Estadísticas reiniciadas por el usuario")
     
     def _resume_camera(self):
-        """Cierra el dashboard y reanuda la detección con cámara"""
-        print("📷 Reanudando detección con cámara...")
-        
-        # Reanudar el sistema principal si existe la referencia
-        if self.main_system:
-            self.main_system.resume_camera_detection()
+        """Cierra el dashboard y vuelve a la ventana de la cámara (la detección nunca se detuvo)"""
+        print("📷 Volviendo a la cámara...")
         
         # Cerrar la ventana y salir del mainloop
+        self._cancel_refresh()
         if self.window:
             self.window.quit()  # Salir del mainloop
             self.window.destroy()
@@ -381,6 +501,7 @@ class PostureDashboard:
     
     def close(self):
         """Cierra el dashboard"""
+        self._cancel_refresh()
         if self.window:
             self.window.quit()  # Salir del mainloop
             self.window.destroy()
@@ -0,0 +1,201 @@
+"""
+Dashboard en un proceso separado
+El bucle de detección publica una instantánea del resumen de estadísticas unas veces por segundo;
+el proceso del dashboard (Tkinter + matplotlib) dibuja la más reciente y devuelve por otra cola
+las acciones del usuario (reiniciar, exportar), que el bucle principal aplica entre frames. El
+resultado de cada exportación vuelve por la cola de instantáneas.
+Así la cámara y la detección siguen corriendo mientras se miran las estadísticas
+"""
+
+import multiprocessing
+import os
+import queue
+import time
+
+
+class DashboardProcess:
+    """
+    Lado del proceso principal: inicia el dashboard, le envía instantáneas y recibe sus comandos
+    """
+
+    def __init__(self, rate=4.0):
+        """
+        Inicializa sin iniciar el proceso
+        Args:
+            rate: Instantáneas enviadas por segundo como máximo
+        """
+        self.rate = rate
+        self.process = None
+        self.snapshots = None
+        self.commands = None
+        self._last_publish = 0.0
+
+    def show(self):
+        """
+        Abre el dashboard; si ya está abierto no hace nada
+        Returns:
+            bool: True si se inició un proceso nuevo
+        """
+        if self.is_open():
+            print("📊 El dashboard ya está abierto")
+            return False
+
+        context = multiprocessing.get_context('spawn')  # Tk no se comparte entre procesos bifurcados
+        self.snapshots = context.Queue()
+        self.commands = context.Queue()
+        self.process = context.Process(target=_dashboard_main, args=(self.snapshots, self.commands),
+                                       name="PostureDashboard", daemon=True)
+        self.process.start()
+        self._last_publish = 0.0
+        print("📊 Dashboard abierto (la detección continúa)")
+        return True
+
+    def is_open(self):
+        """Verifica si el proceso del dashboard sigue vivo"""
+        return self.process is not None and self.process.is_alive()
+
+    def publish(self, statistics, force=False):
+        """
+        Envía el resumen actual si pasó 1/rate s desde el último envío; no bloquea
+        Args:
+            statistics: PostureStatistics de la sesión
+            force: Enviar aunque no haya pasado el intervalo (tras reiniciar)
+        """
+        if not self.is_open():
+            return
+
+        now = time.monotonic()
+        if not force and now - self._last_publish < 1.0 / self.rate:
+            return
+        self._last_publish = now
+
+        self.snapshots.put(dict(statistics.get_cached_summary()))
+
+    def send_export_result(self, path, error=None):
+        """
+        Informa al dashboard el resultado de una exportación pedida desde él
+        Args:
+            path: Archivo escrito (o pedido, si falló)
+            error: Mensaje de error, None si se exportó
+        """
+        if self.is_open():
+            self.snapshots.put(('export_result', path, error))
+    
+    def poll_commands(self):
+        """
+        Comandos pendientes del dashboard, sin bloquear
+        Returns:
+            list: Tuplas ('reset',) o ('export', ruta)
+        """
+        commands = []
+        if self.commands is None:
+            return commands
+
+        while True:
+            try:
+                commands.append(self.commands.get_nowait())
+            except queue.Empty:
+                return commands
+            except (EOFError, OSError):
+                return commands
+
+    def close(self):
+        """Cierra el dashboard y espera a que termine su proceso"""
+        if self.process is None:
+            return
+
+        if self.process.is_alive():
+            self.snapshots.put(None)  # Marca de cierre
+            self.process.join(timeout=3.0)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+
+        # No esperar a vaciar colas que ya nadie lee
+        self.snapshots.cancel_join_thread()
+        self.commands.cancel_join_thread()
+        self.process = None
+        print("❌ Dashboard cerrado")
+
+
+class SnapshotStatistics:
+    """
+    Lado del proceso del dashboard: expone la interfaz de PostureStatistics que usa
+    PostureDashboard a partir de la última instantánea recibida
+    """
+
+    def __init__(self, snapshots, commands):
+        """
+        Inicializa con un resumen vacío hasta recibir la primera instantánea
+        Args:
+            snapshots: Cola de instantáneas (None para cerrar)
+            commands: Cola de comandos hacia el proceso principal
+        """
+        self.snapshots = snapshots
+        self.commands = commands
+        self.stopped = False
+        self.export_results = []  # (ruta, error) recibidos del proceso principal
+        self.summary = {
+            'session_duration_formatted': "00:00",
+            'good_posture_time': 0.0,
+            'bad_posture_time': 0.0,
+            'good_percentage': 0.0,
+            'bad_percentage': 0.0,
+            'problem_counts': {},
+            'alert_count': 0
+        }
+
+    def get_cached_summary(self):
+        """Descarta las instantáneas atrasadas y retorna la más reciente"""
+        while True:
+            try:
+                snapshot = self.snapshots.get_nowait()
+            except queue.Empty:
+                return self.summary
+            if snapshot is None:
+                self.stopped = True
+                return self.summary
+            if isinstance(snapshot, tuple):
+                _, path, error = snapshot  # ('export_result', ruta, error)
+                self.export_results.append((path, error))
+                continue
+            self.summary = snapshot
+
+    def reset_session(self):
+        """Pide al proceso principal reiniciar la sesión"""
+        self.commands.put(('reset',))
+
+    def export_to_csv(self, filename=None, output_dir="estadisticas"):
+        """
+        Pide al proceso principal exportar las estadísticas; el resultado llega después por
+        la cola de instantáneas (export_results)
+        Returns:
+            None: La exportación queda pendiente
+        """
+        path = os.path.join(output_dir, filename) if filename else None
+        self.commands.put(('export', path))
+        return None
+
+
+def _dashboard_main(snapshots, commands):
+    """
+    Proceso del dashboard: ventana Tk con refresco periódico hasta que el usuario la cierre
+    o el proceso principal envíe la marca de cierre
+    """
+    from dashboard import PostureDashboard
+
+    statistics = SnapshotStatistics(snapshots, commands)
+    dashboard = PostureDashboard(statistics)
+    dashboard._create_window()
+
+    def watch_stop():
+        statistics.get_cached_summary()  # Recibe también los resultados de exportación
+        while statistics.export_results and dashboard.is_open():
+            dashboard.show_export_result(*statistics.export_results.pop(0))
+        if statistics.stopped:
+            dashboard.close()
+        elif dashboard.is_open():
+            dashboard.window.after(200, watch_stop)
+
+    watch_stop()
+    dashboard.window.mainloop()
@@ -0,0 +1,152 @@
+"""
+Captura de frames en un hilo dedicado
+Desacopla la lectura de la cámara de la inferencia para que la latencia no crezca
+cuando MediaPipe es más lento que la cámara
+"""
+
+import threading
+import time
+
+
+class LatestFrameSlot:
+    """
+    Ranura acotada de un solo elemento: el frame más reciente siempre gana.
+    Si el consumidor no alcanzó a leer el frame anterior, este se descarta.
+    """
+
+    def __init__(self):
+        """Inicializa la ranura vacía"""
+        self._condition = threading.Condition()
+        self._item = None
+        self._sequence = 0
+        self._closed = False
+
+        # Contadores
+        self.frames_put = 0
+        self.frames_dropped = 0
+        self.frames_taken = 0
+
+    def put(self, frame, timestamp):
+        """
+        Publica un frame reemplazando el anterior si no fue consumido
+        Returns:
+            bool: True si se descartó un frame pendiente
+        """
+        with self._condition:
+            dropped = self._item is not None
+            if dropped:
+                self.frames_dropped += 1
+
+            self._sequence += 1
+            self._item = (self._sequence, frame, timestamp)
+            self.frames_put += 1
+            self._condition.notify()
+            return dropped
+
+    def get(self, timeout=None):
+        """
+        Espera y retira el frame más reciente
+        Returns:
+            tuple: (secuencia, frame, timestamp) o None si se agotó el tiempo o se cerró
+        """
+        with self._condition:
+            # Con predicado: un despertar espurio no devuelve la ranura vacía antes de tiempo
+            self._condition.wait_for(lambda: self._item is not None or self._closed, timeout)
+
+            item = self._item
+            self._item = None
+            if item is not None:
+                self.frames_taken += 1
+            return item
+
+    def close(self):
+        """Cierra la ranura y despierta a los consumidores en espera"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+class FrameGrabber:
+    """
+    Lee frames continuamente de una fuente de video en su propio hilo
+    y los publica en una LatestFrameSlot
+    """
+
+    def __init__(self, source, profiler=None):
+        """
+        Args:
+            source: Fuente con método read() -> (ret, frame, timestamp), ver frame_sources.py.
+                    La lectura (y el espejo de la fuente) ocurre en el hilo de captura
+            profiler: StageProfiler opcional; la lectura de la cámara se registra como 'capture'
+        """
+        self.source = source
+        self.profiler = profiler
+        self.slot = LatestFrameSlot()
+        self.thread = None
+        self.running = False
+        self.failed = False  # La fuente dejó de entregar frames
+
+    def start(self):
+        """Inicia el hilo de captura"""
+        if self.thread is not None and self.thread.is_alive():
+            return
+
+        self.running = True
+        self.failed = False
+        self.thread = threading.Thread(target=self._capture_loop, name="FrameGrabber", daemon=True)
+        self.thread.start()
+
+    def _capture_loop(self):
+        """Bucle del hilo de captura"""
+        while self.running:
+            start = time.perf_counter()
+            ret, frame, timestamp = self.source.read()
+            if self.profiler is not None:
+                self.profiler.record('capture', time.perf_counter() - start)
+
+            if not ret:
+                self.failed = True
+                break
+
+            self.slot.put(frame, timestamp)
+
+        self.running = False
+        self.slot.close()
+
+    def read(self, timeout=1.0):
+        """
+        Obtiene el frame más reciente para el hilo de inferencia
+        Returns:
+            tuple: (ret, frame, timestamp). ret es False si se agotó la espera
+            o la fuente terminó (ver self.running)
+        """
+        item = self.slot.get(timeout)
+        if item is None:
+            return False, None, None
+
+        _, frame, timestamp = item
+        return True, frame, timestamp
+
+    def stop(self):
+        """Detiene el hilo de captura"""
+        self.running = False
+        self.slot.close()
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
+            self.thread = None
+
+    def get_counters(self):
+        """
+        Retorna los contadores de captura
+        Returns:
+            dict: Frames capturados, entregados y descartados
+        """
+        return {
+            'captured': self.slot.frames_put,
+            'delivered': self.slot.frames_taken,
+            'dropped': self.slot.frames_dropped
+        }
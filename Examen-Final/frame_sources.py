@@ -0,0 +1,184 @@
+"""
+Fuentes de frames intercambiables: cámara, archivo de video o carpeta de imágenes
+Todas exponen read() -> (ret, frame, timestamp) y release()
+"""
+
+import cv2
+import os
+import time
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff')
+
+
+def flip_frame(frame, profiler=None):
+    """
+    Espejo horizontal del frame, medido como etapa 'flip' si hay perfilador
+    """
+    if profiler is None:
+        return cv2.flip(frame, 1)
+    with profiler.stage('flip'):
+        return cv2.flip(frame, 1)
+
+
+class CameraSource:
+    """
+    Cámara en vivo (cv2.VideoCapture)
+    """
+
+    is_live = True
+
+    def __init__(self, camera_index=0, width=640, height=480, mirror=True):
+        """
+        Args:
+            camera_index: Índice de la cámara (0 para cámara por defecto)
+            width, height: Resolución solicitada
+            mirror: Espejo horizontal para mayor naturalidad
+        """
+        self.name = f"camara_{camera_index}"
+        self.mirror = mirror
+        self.profiler = None  # StageProfiler opcional para medir el espejo
+        self.capture = cv2.VideoCapture(camera_index)
+
+        if not self.capture.isOpened():
+            raise Exception("No se pudo abrir la cámara")
+
+        # Configurar resolución
+        self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+        # Evitar que el driver acumule frames viejos (no todos los backends lo soportan)
+        self.capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    def read(self):
+        """
+        Returns:
+            tuple: (ret, frame, timestamp) con timestamp de reloj de pared
+        """
+        ret, frame = self.capture.read()
+        timestamp = time.time()
+        if ret and self.mirror:
+            frame = flip_frame(frame, self.profiler)
+        return ret, frame, timestamp
+
+    def release(self):
+        self.capture.release()
+
+
+class VideoFileSource:
+    """
+    Archivo de video grabado. Las marcas de tiempo siguen el tiempo del video,
+    así las estadísticas reflejan la duración real de lo grabado aunque se procese más rápido
+    """
+
+    is_live = False
+
+    def __init__(self, path, mirror=True):
+        """
+        Args:
+            path: Ruta del archivo de video
+            mirror: Espejo horizontal, igual que en vivo para que la calibración sea comparable
+        """
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        self.mirror = mirror
+        self.profiler = None
+        self.capture = cv2.VideoCapture(path)
+
+        if not self.capture.isOpened():
+            raise Exception(f"No se pudo abrir el video: {path}")
+
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frame_count = int(self.capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.frame_index = 0
+        self.start_time = time.time()  # Origen de las marcas de tiempo
+
+    def read(self):
+        """
+        Returns:
+            tuple: (ret, frame, timestamp) con timestamp = inicio + posición en el video
+        """
+        ret, frame = self.capture.read()
+        if not ret:
+            return False, None, None
+
+        position_ms = self.capture.get(cv2.CAP_PROP_POS_MSEC)
+        offset = position_ms / 1000 if position_ms > 0 else self.frame_index / self.fps
+        self.frame_index += 1
+
+        if self.mirror:
+            frame = flip_frame(frame, self.profiler)
+        return True, frame, self.start_time + offset
+
+    def release(self):
+        self.capture.release()
+
+
+class ImageDirectorySource:
+    """
+    Carpeta de imágenes procesadas en orden alfabético a una tasa nominal
+    """
+
+    is_live = False
+
+    def __init__(self, directory, fps=30.0, mirror=True):
+        """
+        Args:
+            directory: Carpeta con las imágenes
+            fps: Tasa nominal para asignar marcas de tiempo
+            mirror: Espejo horizontal
+        """
+        self.name = os.path.basename(os.path.normpath(directory))
+        self.fps = fps
+        self.mirror = mirror
+        self.profiler = None
+        self.files = sorted(os.path.join(directory, f) for f in os.listdir(directory)
+                            if f.lower().endswith(IMAGE_EXTENSIONS))
+
+        if not self.files:
+            raise Exception(f"No se encontraron imágenes en: {directory}")
+
+        self.frame_count = len(self.files)
+        self.frame_index = 0
+        self.start_time = time.time()
+
+    def read(self):
+        """
+        Returns:
+            tuple: (ret, frame, timestamp); las imágenes ilegibles se omiten
+        """
+        while self.frame_index < len(self.files):
+            frame = cv2.imread(self.files[self.frame_index])
+            timestamp = self.start_time + self.frame_index / self.fps
+            self.frame_index += 1
+
+            if frame is None:
+                print(f"⚠️  No se pudo leer {self.files[self.frame_index - 1]}")
+                continue
+
+            if self.mirror:
+                frame = flip_frame(frame, self.profiler)
+            return True, frame, timestamp
+
+        return False, None, None
+
+    def release(self):
+        pass
+
+
+def open_source(spec, mirror=True, fps=30.0):
+    """
+    Abre la fuente adecuada según la especificación
+    Args:
+        spec: Índice de cámara ("0"), ruta de video o carpeta de imágenes
+        mirror: Espejo horizontal
+        fps: Tasa nominal para carpetas de imágenes
+    """
+    spec = str(spec)
+
+    if spec.isdigit():
+        return CameraSource(int(spec), mirror=mirror)
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, fps=fps, mirror=mirror)
+    if os.path.isfile(spec):
+        return VideoFileSource(spec, mirror=mirror)
+
+    raise Exception(f"Fuente no encontrada: {spec}")
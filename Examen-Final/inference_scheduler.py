@@ -0,0 +1,104 @@
+"""
+Planificación adaptativa de la inferencia de MediaPipe
+La postura cambia en escala de segundos: cuando los últimos veredictos coinciden y el cuerpo
+casi no se mueve, se infiere a menor tasa y con la imagen reducida. Cualquier movimiento o
+cambio de veredicto devuelve la inferencia a tasa completa en el siguiente frame inferido
+"""
+
+from collections import deque
+import numpy as np
+from posture_analysis import KEY_POINT_INDICES
+
+
+class InferenceScheduler:
+    """
+    Decide en qué frames se ejecuta la inferencia y a qué escala
+    """
+
+    def __init__(self, stable_verdicts=10, motion_threshold=0.02, stable_interval=0.2, stable_scale=0.5):
+        """
+        Inicializa el planificador a tasa completa
+        Args:
+            stable_verdicts: Inferencias consecutivas con el mismo veredicto para reducir la tasa
+            motion_threshold: Desplazamiento máximo de los puntos clave (coordenadas normalizadas)
+                              respecto al inicio del tramo estable
+            stable_interval: Segundos entre inferencias en modo estable (0.2 s = 5 Hz)
+            stable_scale: Factor de escala de la imagen en modo estable
+        """
+        self.motion_threshold = motion_threshold
+        self.stable_interval = stable_interval
+        self.stable_scale = stable_scale
+
+        self.verdicts = deque(maxlen=stable_verdicts)  # Veredictos de las últimas inferencias
+        self.anchor = None  # Puntos clave (7, 2) al inicio del tramo actual
+        self.last_inference_time = None
+        self.stable = False
+
+        # Contadores de rendimiento
+        self.inferred = 0
+        self.skipped = 0
+
+    @property
+    def scale(self):
+        """Escala de la imagen para la próxima inferencia"""
+        return self.stable_scale if self.stable else 1.0
+
+    def should_infer(self, timestamp):
+        """
+        Indica si el frame con esta marca de tiempo debe pasar por MediaPipe
+        """
+        if not self.stable or self.last_inference_time is None:
+            return True
+        return timestamp - self.last_inference_time >= self.stable_interval
+
+    def skip(self):
+        """Registra un frame omitido"""
+        self.skipped += 1
+
+    def update(self, timestamp, landmarks, verdict):
+        """
+        Actualiza el estado tras una inferencia
+        Args:
+            timestamp: Marca de tiempo del frame inferido
+            landmarks: Arreglo (33, 4) o None si no se detectó pose
+            verdict: Veredicto comparable (p. ej. tupla de problemas), o None si no hay análisis
+                     (sin pose o calibrando): en ese caso se vuelve a tasa completa
+        """
+        self.inferred += 1
+        self.last_inference_time = timestamp
+
+        if landmarks is None or verdict is None:
+            self.reset()
+            return
+
+        points = landmarks[KEY_POINT_INDICES, :2]
+        moved = self.anchor is not None and np.abs(points - self.anchor).max() > self.motion_threshold
+        changed = bool(self.verdicts) and verdict != self.verdicts[-1]
+
+        if moved or changed or self.anchor is None:
+            # Nuevo tramo: tasa completa hasta acumular veredictos iguales otra vez
+            self.stable = False
+            self.verdicts.clear()
+            self.anchor = points
+
+        self.verdicts.append(verdict)
+        if len(self.verdicts) == self.verdicts.maxlen:
+            self.stable = True
+
+    def reset(self):
+        """Vuelve a tasa completa"""
+        self.stable = False
+        self.verdicts.clear()
+        self.anchor = None
+
+    def get_counters(self):
+        """
+        Returns:
+            dict: Frames inferidos, omitidos y proporción de inferencia
+        """
+        total = self.inferred + self.skipped
+        return {
+            'inferred': self.inferred,
+            'skipped': self.skipped,
+            'inference_ratio': self.inferred / total if total else 1.0
+        }
@@ -0,0 +1,242 @@
+"""
+Grabación y reproducción de sesiones de landmarks
+Guarda los landmarks de cada frame con su marca de tiempo, el estado de calibración y el
+veredicto del detector, para repetir el análisis sin cámara ni MediaPipe
+
+Formato:
+    sesion.npy       - Arreglo estructurado RECORD_DTYPE (memory-mappable con np.load(mmap_mode='r'))
+    sesion.npy.json  - Metadatos: nombres de problemas y referencia de calibración
+"""
+
+import json
+import os
+import time
+import numpy as np
+from npy_stream import NpyStreamWriter
+from posture_analysis import CalibrationBaseline, NUM_LANDMARKS
+
+FORMAT_VERSION = 2
+
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('has_pose', 'u1'),
+    ('calibrating', 'u1'),
+    ('bad_posture', 'u1'),  # Veredicto final (suavizado) del detector
+    ('issues', 'u1'),       # Máscara de bits en el orden de issue_names
+    ('inferred', 'u1'),     # 0 si el frame reutilizó el resultado anterior (inferencia adaptativa)
+    ('landmarks', '<f4', (NUM_LANDMARKS, 4))
+])
+
+
+def metadata_path(path):
+    """Ruta del archivo de metadatos de una grabación"""
+    return path + '.json'
+
+
+class LandmarkRecorder:
+    """
+    Graba los landmarks y veredictos de cada frame procesado
+    """
+
+    def __init__(self, path, issue_names):
+        """
+        Args:
+            path: Ruta del archivo .npy a crear
+            issue_names: Nombres de los problemas en el orden de PostureDetector.posture_checks
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.issue_names = list(issue_names)
+        self._issue_bits = {name: 1 << i for i, name in enumerate(self.issue_names)}
+        self.baseline = None
+        self.writer = NpyStreamWriter(path, RECORD_DTYPE)
+        self.metadata = {
+            'version': FORMAT_VERSION,
+            'created': time.time(),
+            'issue_names': self.issue_names,
+            'baseline': None
+        }
+        self._write_metadata()
+
+        print(f"⏺️  Grabando landmarks en: {path}")
+
+    def record(self, timestamp, landmarks, calibrating, is_bad_posture, posture_issues, inferred=True):
+        """
+        Agrega un frame a la grabación
+        Args:
+            timestamp: Marca de tiempo de captura del frame
+            landmarks: Arreglo (33, 4) o None si no se detectó pose
+            calibrating: Si el detector estaba calibrando
+            is_bad_posture: Veredicto final del detector
+            posture_issues: Problemas detectados en el frame
+            inferred: Si el frame pasó por MediaPipe o reutilizó el resultado anterior
+        """
+        record = self.writer.next_slot()
+        record['timestamp'] = timestamp
+        record['calibrating'] = calibrating
+        record['bad_posture'] = is_bad_posture
+        record['inferred'] = inferred
+
+        if landmarks is None:
+            record['has_pose'] = 0
+            record['landmarks'] = np.nan
+        else:
+            record['has_pose'] = 1
+            record['landmarks'] = landmarks
+
+        mask = 0
+        for issue in posture_issues:
+            mask |= self._issue_bits.get(issue, 0)
+        record['issues'] = mask
+
+        self.writer.commit()
+
+    def set_calibration(self, baseline):
+        """Guarda la referencia de calibración en los metadatos"""
+        self.baseline = baseline
+        self.metadata['baseline'] = baseline.to_dict()
+        self._write_metadata()
+
+    def _write_metadata(self):
+        """Escribe los metadatos junto a la grabación"""
+        self.metadata['frame_count'] = len(self.writer)
+        with open(metadata_path(self.path), 'w', encoding='utf-8') as f:
+            json.dump(self.metadata, f, indent=2)
+
+    def close(self):
+        """Cierra la grabación"""
+        if self.writer.file is None:
+            return
+
+        self.writer.close()
+        self._write_metadata()
+        print(f"💾 Grabación guardada: {self.path} ({self.writer.count} frames)")
+
+
+class LandmarkReplay:
+    """
+    Reproduce una sesión grabada sobre la etapa de análisis de PostureDetector
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: Ruta del archivo .npy grabado con LandmarkRecorder
+        """
+        self.path = path
+        self.records = np.load(path, mmap_mode='r')
+
+        with open(metadata_path(path), encoding='utf-8') as f:
+            self.metadata = json.load(f)
+
+        self.issue_names = self.metadata['issue_names']
+        baseline = self.metadata.get('baseline')
+        self.baseline = CalibrationBaseline.from_dict(baseline) if baseline else None
+
+    def __len__(self):
+        return len(self.records)
+
+    def landmarks(self):
+        """
+        Retorna todos los landmarks como arreglo (N, 33, 4); NaN en frames sin pose
+        """
+        return self.records['landmarks']
+
+    def frames(self):
+        """
+        Itera los frames grabados
+        Yields:
+            tuple: (timestamp, landmarks (33, 4) o None, inferido)
+        """
+        timestamps = self.records['timestamp']
+        has_pose = self.records['has_pose']
+        landmarks = self.records['landmarks']
+        # Las grabaciones de la versión 1 no tienen el campo: todos los frames fueron inferidos
+        inferred = self.records['inferred'] if 'inferred' in self.records.dtype.names else np.ones(len(self.records), 'u1')
+
+        for i in range(len(self.records)):
+            yield timestamps[i], (landmarks[i].astype(np.float64) if has_pose[i] else None), bool(inferred[i])
+
+    def issue_mask(self, posture_issues):
+        """Convierte una lista de problemas a la máscara de bits de la grabación"""
+        return sum(1 << self.issue_names.index(issue) for issue in posture_issues if issue in self.issue_names)
+
+    def run(self, detector, use_recorded_calibration=False):
+        """
+        Reproduce la sesión a máxima velocidad sobre la etapa de análisis del detector
+        Args:
+            detector: PostureDetector (puede crearse con enable_inference=False)
+            use_recorded_calibration: Usar la calibración grabada en lugar de recalibrar
+                                      con los frames de calibración de la grabación
+        Returns:
+            dict: Veredictos reproducidos, diferencias contra la grabación y rendimiento
+        """
+        frame_count = len(self.records)
+        bad_posture = np.zeros(frame_count, dtype=bool)
+        issues = np.zeros(frame_count, dtype=np.uint8)
+        calibrating_flags = self.records['calibrating']
+
+        if use_recorded_calibration:
+            if self.baseline is None:
+                raise ValueError("La grabación no contiene calibración")
+            detector.baseline = self.baseline
+            detector.is_calibrated = True
+        else:
+            detector.start_calibration()
+
+        start = time.perf_counter()
+        is_bad, mask = False, 0
+        for i, (timestamp, landmarks, inferred) in enumerate(self.frames()):
+            if use_recorded_calibration and calibrating_flags[i]:
+                continue
+
+            # Los frames omitidos por la inferencia adaptativa repiten el resultado anterior
+            if inferred:
+                is_bad, posture_issues, _ = detector.analyze_landmarks(landmarks, timestamp)
+                mask = self.issue_mask(posture_issues)
+            bad_posture[i] = is_bad
+            issues[i] = mask
+        elapsed = time.perf_counter() - start
+
+        compared = ~calibrating_flags.astype(bool) if use_recorded_calibration else slice(None)
+        verdict_mismatches = int(np.count_nonzero(bad_posture[compared] != self.records['bad_posture'][compared].astype(bool)))
+        issue_mismatches = int(np.count_nonzero(issues[compared] != self.records['issues'][compared]))
+
+        return {
+            'bad_posture': bad_posture,
+            'issues': issues,
+            'frames': frame_count,
+            'elapsed': elapsed,
+            'fps': frame_count / elapsed if elapsed > 0 else 0.0,
+            'verdict_mismatches': verdict_mismatches,
+            'issue_mismatches': issue_mismatches
+        }
+
+
+def main():
+    """
+    Reproduce una grabación sin cámara ni MediaPipe y compara los veredictos
+    """
+    import argparse
+    from posture_detector import PostureDetector
+
+    parser = argparse.ArgumentParser(description="Reproduce una sesión de landmarks grabada")
+    parser.add_argument('recording', help="Archivo .npy grabado con main.py --record")
+    parser.add_argument('--use-recorded-calibration', action='store_true',
+                        help="Usar la calibración grabada en lugar de recalibrar")
+    args = parser.parse_args()
+
+    replay = LandmarkReplay(args.recording)
+    detector = PostureDetector(enable_inference=False)
+    result = replay.run(detector, use_recorded_calibration=args.use_recorded_calibration)
+
+    print(f"🎞️  Frames reproducidos: {result['frames']} en {result['elapsed']:.2f}s ({result['fps']:.0f} FPS)")
+    print(f"🔍 Veredictos distintos a la grabación: {result['verdict_mismatches']}")
+    print(f"🔍 Problemas distintos a la grabación: {result['issue_mismatches']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Esqueleto del usuario en vivo para la ventana 3D
+Los landmarks de mundo de MediaPipe (metros, origen entre las caderas) se dibujan junto al modelo
+de postura correcta. Los actores se crean una sola vez: en cada frame solo se sobrescriben las
+coordenadas de sus puntos y, si cambian los problemas detectados, los colores de los segmentos
+"""
+
+import numpy as np
+import vedo
+from vtkmodules.util.numpy_support import numpy_to_vtk, numpy_to_vtkIdTypeArray, vtk_to_numpy
+from vtkmodules.vtkCommonCore import vtkPoints
+from vtkmodules.vtkCommonDataModel import vtkCellArray, vtkPolyData
+
+# === ARTICULACIONES (índices de MediaPipe Pose) ===
+JOINTS = (
+    ('nose', 0), ('left_ear', 7), ('right_ear', 8),
+    ('left_shoulder', 11), ('right_shoulder', 12), ('left_elbow', 13), ('right_elbow', 14),
+    ('left_wrist', 15), ('right_wrist', 16), ('left_hip', 23), ('right_hip', 24),
+    ('left_knee', 25), ('right_knee', 26), ('left_ankle', 27), ('right_ankle', 28)
+)
+JOINT_INDICES = np.array([index for _, index in JOINTS])
+# Puntos medios calculados (van después de las articulaciones)
+MIDPOINTS = (
+    ('ear_mid', 'left_ear', 'right_ear'),
+    ('shoulder_mid', 'left_shoulder', 'right_shoulder'),
+    ('hip_mid', 'left_hip', 'right_hip')
+)
+POINT_NAMES = tuple(name for name, _ in JOINTS) + tuple(name for name, _, _ in MIDPOINTS)
+_POINT = {name: i for i, name in enumerate(POINT_NAMES)}
+
+# === SEGMENTOS ===
+SEGMENTS = (
+    ('head', 'ear_mid', 'nose'), ('ears', 'left_ear', 'right_ear'),
+    ('neck', 'shoulder_mid', 'ear_mid'),
+    ('neck_left', 'left_shoulder', 'left_ear'), ('neck_right', 'right_shoulder', 'right_ear'),
+    ('shoulders', 'left_shoulder', 'right_shoulder'), ('spine', 'shoulder_mid', 'hip_mid'),
+    ('torso_left', 'left_shoulder', 'left_hip'), ('torso_right', 'right_shoulder', 'right_hip'),
+    ('hips', 'left_hip', 'right_hip'),
+    ('arm_left', 'left_shoulder', 'left_elbow'), ('forearm_left', 'left_elbow', 'left_wrist'),
+    ('arm_right', 'right_shoulder', 'right_elbow'), ('forearm_right', 'right_elbow', 'right_wrist'),
+    ('thigh_left', 'left_hip', 'left_knee'), ('shin_left', 'left_knee', 'left_ankle'),
+    ('thigh_right', 'right_hip', 'right_knee'), ('shin_right', 'right_knee', 'right_ankle')
+)
+_SEGMENT = {name: i for i, (name, _, _) in enumerate(SEGMENTS)}
+
+# Segmentos que colorea cada analizador de PostureDetector (si varios coinciden, gana el último)
+ISSUE_SEGMENTS = {
+    "Cabeza muy adelantada": ('neck', 'head'),
+    "Cabeza inclinada hacia abajo": ('head', 'ears'),
+    "Hombros desalineados/elevados": ('shoulders',),
+    "Columna encorvada": ('spine',),
+    "Hombros muy levantados": ('neck_left', 'neck_right', 'shoulders'),
+    "Cuerpo inclinado hacia adelante": ('torso_left', 'torso_right', 'spine')
+}
+ISSUE_COLORS = {
+    "Cabeza muy adelantada": 'orange',
+    "Cabeza inclinada hacia abajo": 'magenta',
+    "Hombros desalineados/elevados": 'red',
+    "Columna encorvada": 'darkred',
+    "Hombros muy levantados": 'gold',
+    "Cuerpo inclinado hacia adelante": 'purple'
+}
+BASE_COLOR = 'dodgerblue'
+MIN_VISIBILITY = 0.5  # Segmentos con un extremo menos visible se ocultan
+
+
+def _rgba(color, alpha=255):
+    """Color de vedo como RGBA uint8"""
+    return np.array([*np.round(np.array(vedo.get_color(color)) * 255), alpha], dtype=np.uint8)
+
+
+def world_to_scene(world_landmarks):
+    """
+    Landmarks de mundo de MediaPipe (x a la derecha de la imagen, y hacia abajo, z hacia la
+    cámara negativo) a la escena (z hacia arriba, mirando hacia la cámara 3D, como un espejo)
+    Args:
+        world_landmarks: Arreglo (33, 4) con x, y, z y visibilidad
+    Returns:
+        tuple: (puntos (len(POINT_NAMES), 3), visibilidad (len(POINT_NAMES),))
+    """
+    joints = world_landmarks[JOINT_INDICES]
+    xyz = np.column_stack((-joints[:, 0], -joints[:, 2], -joints[:, 1]))
+    visibility = joints[:, 3]
+
+    mid_points = [(xyz[_POINT[a]] + xyz[_POINT[b]]) / 2 for _, a, b in MIDPOINTS]
+    mid_visibility = [min(visibility[_POINT[a]], visibility[_POINT[b]]) for _, a, b in MIDPOINTS]
+    return np.vstack((xyz, mid_points)), np.concatenate((visibility, mid_visibility))
+
+
+class LiveSkeleton:
+    """
+    Esqueleto persistente (puntos y segmentos) actualizado en su lugar
+    """
+
+    def __init__(self, origin=(1.2, 0.0, 0.9), line_width=5, point_radius=9):
+        """
+        Crea los actores con el esqueleto oculto hasta recibir la primera pose
+        Args:
+            origin: Posición de la escena donde se ubica el centro de las caderas
+            line_width: Grosor de los segmentos
+            point_radius: Radio de las articulaciones (píxeles)
+        """
+        self.origin = np.asarray(origin, dtype=np.float64)
+        point_count = len(POINT_NAMES)
+
+        # Segmentos: celdas de línea que referencian los puntos compartidos
+        polydata = vtkPolyData()
+        points = vtkPoints()
+        points.SetData(numpy_to_vtk(np.tile(self.origin, (point_count, 1)).astype(np.float32), deep=True))
+        polydata.SetPoints(points)
+        connectivity = np.array([(_POINT[a], _POINT[b]) for _, a, b in SEGMENTS], dtype=np.int64).ravel()
+        offsets = np.arange(0, len(connectivity) + 1, 2, dtype=np.int64)
+        lines = vtkCellArray()
+        lines.SetData(numpy_to_vtkIdTypeArray(offsets, deep=True), numpy_to_vtkIdTypeArray(connectivity, deep=True))
+        polydata.SetLines(lines)
+
+        self.lines = vedo.Mesh(polydata).lw(line_width).lighting('off')
+        self.lines.name = "Esqueleto en vivo"
+        self.joints = vedo.Points(np.tile(self.origin, (point_count, 1)), r=point_radius, c='white')
+        self.joints.name = "Articulaciones en vivo"
+
+        # Vistas numpy sobre los puntos de VTK: se sobrescriben sin crear arreglos nuevos
+        self._line_points = vtk_to_numpy(self.lines.dataset.GetPoints().GetData())
+        self._joint_points = vtk_to_numpy(self.joints.dataset.GetPoints().GetData())
+
+        self._base_colors = np.tile(_rgba(BASE_COLOR), (len(SEGMENTS), 1))
+        self._issue_rgba = {issue: _rgba(color) for issue, color in ISSUE_COLORS.items()}
+        self._colors = None
+        self.lines.cellcolors = self._base_colors
+        self.set_visible(False)
+
+        self.updates = 0
+
+    def actors(self):
+        """Objetos para agregar al plotter"""
+        return [self.lines, self.joints]
+
+    def set_visible(self, visible):
+        """Muestra u oculta el esqueleto (p. ej. sin pose detectada)"""
+        for obj in self.actors():
+            obj.actor.SetVisibility(visible)
+
+    def update(self, world_landmarks, issues=()):
+        """
+        Mueve el esqueleto a la pose recibida y colorea los segmentos de los problemas detectados
+        Args:
+            world_landmarks: Arreglo (33, 4) de landmarks de mundo o None si no hay pose
+            issues: Problemas detectados en el frame (nombres de PostureDetector.posture_checks)
+        """
+        if world_landmarks is None:
+            self.set_visible(False)
+            return
+
+        points, visibility = world_to_scene(world_landmarks)
+        points += self.origin
+        self._line_points[:] = points
+        self._joint_points[:] = points
+        self.lines.dataset.GetPoints().Modified()
+        self.joints.dataset.GetPoints().Modified()
+
+        # Colores: base, problemas en el orden de los analizadores, transparentes si no son visibles
+        colors = self._base_colors.copy()
+        for issue in issues:
+            for segment in ISSUE_SEGMENTS.get(issue, ()):
+                colors[_SEGMENT[segment]] = self._issue_rgba[issue]
+        hidden = np.array([min(visibility[_POINT[a]], visibility[_POINT[b]]) < MIN_VISIBILITY
+                           for _, a, b in SEGMENTS])
+        colors[hidden, 3] = 0
+        if self._colors is None or not np.array_equal(colors, self._colors):
+            self.lines.cellcolors = colors
+            self._colors = colors
+
+        self.set_visible(True)
+        self.updates += 1
@@ -6,48 +6,144 @@ Autor: Sistema de Análisis Postural
 Fecha: Julio 2025
 """
 
+import argparse
+import csv
 import cv2
+import os
 import time
 import threading
+from datetime import datetime
 from posture_detector import PostureDetector
 from pose_3d_visualizer import Pose3DVisualizer
 from posture_statistics import PostureStatistics
-from dashboard import PostureDashboard
+from dashboard_process import DashboardProcess
+from frame_grabber import FrameGrabber
+from frame_sources import open_source
+from landmark_recorder import LandmarkRecorder
+from columnar_export import ColumnarFrameExporter
+from session_store import SessionStore, default_user
+from profiler import StageProfiler
 
 class PostureAnalysisSystem:
-    def __init__(self):
+    def __init__(self, source="0", headless=False, output_dir="estadisticas", mirror=True,
+                 image_fps=30.0, record_path=None, adaptive_inference=True, roi_tracking=True,
+                 profile='auto', target_fps=15.0, export_columns=True, user=None, source_name=None):
         """
         Inicializa el sistema completo de análisis postural
+        Args:
+            source: Índice de cámara, archivo de video o carpeta de imágenes
+            headless: Procesar sin ventanas, visualizador ni dashboard, tan rápido como sea posible
+            output_dir: Carpeta para estadísticas y resultados por frame
+            mirror: Espejo horizontal de los frames
+            image_fps: Tasa nominal para carpetas de imágenes
+            record_path: Archivo .npy donde grabar los landmarks de la sesión (opcional)
+            adaptive_inference: Reducir la tasa de inferencia cuando la postura es estable
+            roi_tracking: Inferir sobre un recorte de la parte superior del cuerpo
+            profile: Perfil del modelo ('lite', 'full', 'heavy' o 'auto')
+            target_fps: Tasa de inferencia objetivo del perfil automático
+            export_columns: Exportar mediciones y veredictos por frame en columnas .npy
+            user: Usuario al que se asigna la sesión en el historial (por defecto, el del sistema)
+            source_name: Nombre de la fuente en los archivos de salida (por defecto, el de la fuente)
         """
-        self.detector = PostureDetector()
-        self.visualizer = Pose3DVisualizer()
-        self.statistics = PostureStatistics()
-        self.dashboard = PostureDashboard(self.statistics, self)  # Pasar referencia de self
-        self.camera = None
+        self.source_spec = source
+        self.source_name = source_name
+        self.headless = headless
+        self.output_dir = output_dir
+        self.mirror = mirror
+        self.image_fps = image_fps
+        
+        self.detector = PostureDetector(profile=profile, target_fps=target_fps)
+        
+        # Latencia por etapa del bucle principal (compartida con el detector y la fuente)
+        self.profiler = StageProfiler()
+        self.detector.profiler = self.profiler
+        self.show_profiler = False  # Superposición de FPS y latencias (tecla 'p')
+        self.detector.draw_pose = not headless
+        self.detector.adaptive_inference = adaptive_inference
+        self.detector.roi_tracking = roi_tracking
+        self.statistics = PostureStatistics(clock=self.clock, log_dir=output_dir)
+        
+        # Componentes de interfaz solo con ventanas
+        self.visualizer = None if headless else Pose3DVisualizer()
+        self.dashboard = None if headless else DashboardProcess()  # Proceso aparte: la detección no se detiene
+        
+        self.source = None
+        self.grabber = None  # Hilo de captura desacoplado de la inferencia (solo fuentes en vivo)
+        self.current_frame_time = None  # Marca de tiempo del frame en proceso
+        self.results_file = None
+        self.results_writer = None
+        
+        # Rendimiento del procesamiento
+        self.frames_processed = 0
+        self.processing_time = 0.0
+        self.progress_callback = None  # callable(frames, fps) llamado periódicamente sin interfaz
         self.running = False
-        self.camera_paused = False  # Nuevo estado para pausar cámara
+        self.error = None  # Motivo por el que run() terminó con error (None si terminó bien)
+        
+        # Grabación de landmarks para reproducir la sesión sin cámara
+        self.record_path = record_path
+        self.recorder = None
+        
+        # Exportación columnar por frame para análisis
+        self.export_columns = export_columns
+        self.frame_exporter = None
+        
+        # Historial de sesiones entre ejecuciones y usuarios
+        self.user = user or default_user()
         
         # Variables de estado
         self.bad_posture_detected = False
         self.bad_posture_start_time = None
         self.warning_delay = 3.0  # segundos antes de mostrar advertencia
+        self.alert_logged = False  # Alerta ya registrada en el episodio actual (sin interfaz)
         
-    def setup_camera(self, camera_index=0):
+    def clock(self):
         """
-        Configura la cámara
-        Args:
-            camera_index: Índice de la cámara (0 para cámara por defecto)
+        Reloj de las estadísticas: marca de tiempo del frame en proceso
+        (tiempo del video al procesar grabaciones, reloj de pared en vivo)
         """
-        self.camera = cv2.VideoCapture(camera_index)
-        
-        if not self.camera.isOpened():
-            raise Exception("No se pudo abrir la cámara")
-        
-        # Configurar resolución
-        self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        
-        print("Cámara configurada correctamente")
+        return self.current_frame_time if self.current_frame_time is not None else time.time()
+    
+    def setup_source(self):
+        """
+        Abre la fuente de frames (cámara, video o carpeta de imágenes)
+        """
+        self.source = open_source(self.source_spec, mirror=self.mirror, fps=self.image_fps)
+        self.source.profiler = self.profiler
+        if self.source_name:
+            self.source.name = self.source_name
+        
+        if self.source.is_live:
+            # Captura en hilo propio: el frame más reciente siempre gana
+            self.grabber = FrameGrabber(self.source, profiler=self.profiler)
+            self.grabber.start()
+            print("Cámara configurada correctamente")
+        else:
+            # Grabaciones: se procesan todos los frames, sin descartar
+            print(f"Fuente configurada: {self.source.name} ({self.source.frame_count} frames)")
+    
+    def read_frame(self):
+        """
+        Obtiene el siguiente frame a procesar
+        Returns:
+            tuple: (ret, frame, timestamp)
+        """
+        if self.grabber:
+            return self.grabber.read(timeout=1.0)
+        return self.source.read()
+    
+    def open_results_file(self):
+        """
+        Abre el CSV de resultados por frame (modo sin interfaz)
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(self.output_dir, f"posture_frames_{self.source.name}_{timestamp}.csv")
+        
+        self.results_file = open(path, 'w', newline='', encoding='utf-8')
+        self.results_writer = csv.writer(self.results_file)
+        self.results_writer.writerow(['frame', 'timestamp', 'calibrating', 'bad_posture', 'issues'])
+        print(f"📝 Resultados por frame: {path}")
     
     def draw_posture_info(self, image, is_bad_posture, posture_issues, calibration_status):
         """
@@ -103,7 +199,7 @@ class PostureAnalysisSystem:
         
         # Agregar información de estadísticas (solo si no está calibrando)
         if not calibration_status['calibrating']:
-            stats = self.statistics.get_statistics_summary()
+            stats = self.statistics.get_cached_summary()
             
             # Mostrar estadísticas básicas en la esquina superior derecha
             stats_y = 20
@@ -116,27 +212,39 @@ class PostureAnalysisSystem:
             cv2.putText(image, f"Alertas: {stats['alert_count']}", 
                        (width - 200, stats_y + 60), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
         
+        # Latencias por etapa debajo de las estadísticas
+        if self.show_profiler:
+            self.profiler.draw_overlay(image, width - 260, 110)
+        
         # Instrucciones generales
         cv2.putText(image, "Presiona 'q' para salir, 's' para estadisticas", (10, height - 40), 
                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-        cv2.putText(image, "Presiona 'r' para reiniciar estadisticas", (10, height - 20), 
+        cv2.putText(image, "Presiona 'r' para reiniciar estadisticas, 'p' para latencias", (10, height - 20), 
                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
         
         return image
     
-    def handle_bad_posture(self):
+    def handle_bad_posture(self, current_time=None):
         """
         Maneja la detección de mala postura con control de ventana mejorado
+        Args:
+            current_time: Marca de tiempo del frame (por defecto el reloj de pared)
         """
-        current_time = time.time()
+        current_time = time.time() if current_time is None else current_time
         
         if self.bad_posture_start_time is None:
             self.bad_posture_start_time = current_time
         
         # Si ha pasado el tiempo de espera
         if (current_time - self.bad_posture_start_time) > self.warning_delay:
+            if self.headless:
+                # Sin visualizador: registrar una alerta por episodio de mala postura
+                if not self.alert_logged:
+                    self.statistics.log_alert_opened()
+                    self.alert_logged = True
+            
             # Si la ventana no está abierta Y se permite apertura automática
-            if not self.visualizer.is_open() and self.visualizer.allow_auto_open:
+            elif not self.visualizer.is_open() and self.visualizer.allow_auto_open:
                 print("⚠️  Mala postura detectada por más de 3 segundos")
                 print("🔄 Abriendo visualización 3D de postura correcta...")
                 self.visualizer.show_in_thread()
@@ -148,39 +256,57 @@ class PostureAnalysisSystem:
         Maneja la detección de buena postura y reinicia temporizador si fue cerrada manualmente
         """
         # Si había mala postura antes y ahora está bien, permitir reapertura
-        if self.bad_posture_start_time is not None:
+        if self.bad_posture_start_time is not None and self.visualizer:
             self.visualizer.allow_reopen()
         
         self.bad_posture_start_time = None
+        self.alert_logged = False
     
-    def pause_camera_and_show_stats(self):
-        """Pausa la cámara y muestra las estadísticas"""
-        self.camera_paused = True
-        
-        # Cerrar la ventana de OpenCV
-        cv2.destroyAllWindows()
+    def update_dashboard(self):
+        """
+        Envía el resumen al dashboard (si está abierto) y aplica sus comandos
+        """
+        for command in self.dashboard.poll_commands():
+            if command[0] == 'reset':
+                print("🔄 Estadísticas reiniciadas desde el dashboard")
+                self.statistics.reset_session()
+                self.statistics.start_session()
+                self.dashboard.publish(self.statistics, force=True)
+            elif command[0] == 'export':
+                path = command[1]
+                try:
+                    if path:
+                        path = self.statistics.export_to_csv(os.path.basename(path), output_dir=os.path.dirname(path))
+                    else:
+                        path = self.statistics.export_to_csv(output_dir=self.output_dir)
+                    self.dashboard.send_export_result(path)
+                except Exception as e:
+                    print(f"⚠️ Error exportando estadísticas: {e}")
+                    self.dashboard.send_export_result(path, str(e))
         
-        # Abrir dashboard
-        self.dashboard.show()
-        print("📊 Cámara pausada, dashboard abierto")
-    
-    def resume_camera_detection(self):
-        """Reanuda la detección con cámara"""
-        self.camera_paused = False
-        print("📷 Cámara reanudada, continuando detección...")
+        self.dashboard.publish(self.statistics)
     
     def run(self):
         """
         Ejecuta el bucle principal del sistema con calibración inicial
+        Returns:
+            bool: False si la fuente no se pudo abrir o el bucle terminó por un error (ver self.error)
         """
         print("🚀 Iniciando Sistema de Análisis Postural MEJORADO")
-        print("📷 Configurando cámara...")
+        print("📷 Configurando fuente de video...")
+        self.error = None
         
         try:
-            self.setup_camera()
+            self.setup_source()
         except Exception as e:
-            print(f"❌ Error configurando cámara: {e}")
-            return
+            self.error = f"Error configurando fuente de video: {e}"
+            print(f"❌ {self.error}")
+            return False
+        
+        if self.headless:
+            self.open_results_file()
+        self.statistics.log_name = f"session_{self.source.name}"
+        self.statistics.source = self.source.name
         
         print("✅ Sistema listo!")
         print("💡 Siéntate frente a la cámara en POSTURA CORRECTA")
@@ -192,67 +318,132 @@ class PostureAnalysisSystem:
         # Iniciar calibración
         self.detector.start_calibration()
         
+        # Iniciar grabación de landmarks si se solicitó
+        if self.record_path:
+            issue_names = [issue for issue, _ in self.detector.posture_checks]
+            self.recorder = LandmarkRecorder(self.record_path, issue_names)
+        
+        # Iniciar exportación columnar por frame
+        if self.export_columns:
+            issue_names = [issue for issue, _ in self.detector.posture_checks]
+            directory = os.path.join(self.output_dir, f"frames_{self.source.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+            self.frame_exporter = ColumnarFrameExporter(directory, issue_names)
+        
         # Iniciar estadísticas
         self.statistics.start_session()
+        self.statistics.log_event('calibration_start')
         
         self.running = True
         frame_count = 0
+        processing_start = time.time()
         
         try:
             while self.running:
-                # Si la cámara está pausada, esperar
-                if self.camera_paused:
-                    cv2.waitKey(100)  # Esperar 100ms y verificar de nuevo
-                    continue
-                
-                # Capturar frame
-                ret, frame = self.camera.read()
+                # Obtener el siguiente frame (en vivo: el más reciente del hilo de captura, que mide la
+                # lectura de la cámara como 'capture'; aquí solo se mide la espera por el frame)
+                frame_start = time.perf_counter()
+                with self.profiler.stage('wait_frame' if self.grabber else 'capture'):
+                    ret, frame, frame_time = self.read_frame()
                 if not ret:
-                    print("❌ Error capturando frame")
+                    if self.grabber and self.grabber.running:
+                        continue  # Sin frame nuevo todavía
+                    if self.source.is_live:
+                        print("❌ Error capturando frame")
+                    else:
+                        print("🏁 Fin de la fuente de video")
                     break
                 
-                # Espejo horizontal para mayor naturalidad
-                frame = cv2.flip(frame, 1)
+                self.current_frame_time = frame_time
                 
                 # Detectar postura con nuevo sistema
-                processed_frame, is_bad_posture, posture_issues, calibration_status = self.detector.detect_posture(frame)
+                processed_frame, is_bad_posture, posture_issues, calibration_status = self.detector.detect_posture(frame, frame_time)
+                
+                # Registrar la referencia al completar la calibración (solo en el frame que la termina;
+                # después 'complete' sigue en True toda la sesión)
+                if calibration_status['calibrating'] and calibration_status['complete']:
+                    self.statistics.log_event('calibration', profile=self.detector.profile,
+                                              **self.detector.baseline.to_dict())
+                
+                # Grabar landmarks y veredicto del frame
+                if self.recorder:
+                    self.recorder.record(frame_time, self.detector.last_landmarks,
+                                         calibration_status['calibrating'], is_bad_posture, posture_issues,
+                                         inferred=self.detector.last_inferred)
+                    if self.recorder.baseline is None and self.detector.baseline is not None:
+                        self.recorder.set_calibration(self.detector.baseline)
+                
+                # Mediciones y veredicto del frame en columnas
+                if self.frame_exporter:
+                    self.frame_exporter.append(frame_time, self.detector.last_measurements, posture_issues,
+                                               is_bad_posture, calibration_status['calibrating'],
+                                               inferred=self.detector.last_inferred)
                 
                 # Actualizar estadísticas (solo si no está calibrando)
                 if not calibration_status['calibrating']:
                     self.statistics.update_posture_state(not is_bad_posture, posture_issues)
                 
-                # Dibujar información en la imagen
-                display_frame = self.draw_posture_info(processed_frame, is_bad_posture, posture_issues, calibration_status)
+                # Resultados por frame
+                if self.results_writer:
+                    self.results_writer.writerow([frame_count, f"{frame_time:.3f}", int(calibration_status['calibrating']),
+                                                  int(is_bad_posture), ';'.join(posture_issues)])
                 
                 # Solo manejar postura si ya está calibrado
                 if not calibration_status['calibrating']:
                     if is_bad_posture:
-                        self.handle_bad_posture()
+                        self.handle_bad_posture(frame_time)
                     else:
                         self.handle_good_posture()
                 
-                # Mostrar frame
-                cv2.imshow('Análisis de Postura Corporal - SISTEMA MEJORADO', display_frame)
-                
-                # Control de FPS y salida
-                key = cv2.waitKey(1) & 0xFF
-                if key == ord('q'):
-                    print("👋 Saliendo del sistema...")
-                    break
-                elif key == ord('s'):
-                    print("📊 Pausando cámara y abriendo estadísticas...")
-                    self.pause_camera_and_show_stats()
-                elif key == ord('r'):
-                    print("🔄 Reiniciando estadísticas...")
-                    self.statistics.reset_session()
-                    self.statistics.start_session()
+                if not self.headless:
+                    # Pose del usuario para el esqueleto en vivo de la ventana 3D
+                    self.visualizer.publish_pose(self.detector.last_world_landmarks, posture_issues)
+                    
+                    # Instantánea para el dashboard y sus comandos
+                    self.update_dashboard()
+                    
+                    # Dibujar información en la imagen
+                    with self.profiler.stage('draw_posture_info'):
+                        display_frame = self.draw_posture_info(processed_frame, is_bad_posture, posture_issues, calibration_status)
+                    
+                    # Mostrar frame y control de FPS
+                    with self.profiler.stage('display'):
+                        cv2.imshow('Análisis de Postura Corporal - SISTEMA MEJORADO', display_frame)
+                        key = cv2.waitKey(1) & 0xFF
+                    
+                    # Salida y controles
+                    if key == ord('q'):
+                        print("👋 Saliendo del sistema...")
+                        break
+                    elif key == ord('s'):
+                        self.dashboard.show()
+                    elif key == ord('r'):
+                        print("🔄 Reiniciando estadísticas...")
+                        self.statistics.reset_session()
+                        self.statistics.start_session()
+                    elif key == ord('p'):
+                        self.show_profiler = not self.show_profiler
                 
+                self.profiler.record('frame', time.perf_counter() - frame_start)
                 frame_count += 1
+                self.frames_processed = frame_count
+                
+                # Progreso del procesamiento sin interfaz
+                if self.headless and frame_count % 300 == 0:
+                    fps = frame_count / max(time.time() - processing_start, 1e-6)
+                    print(f"⏩ {frame_count} frames procesados ({fps:.1f} FPS)")
+                    if self.progress_callback:
+                        self.progress_callback(frame_count, fps)
                 
                 # Debug info solo después de calibración
-                if frame_count % 30 == 0 and not calibration_status['calibrating']:
+                elif frame_count % 30 == 0 and not calibration_status['calibrating'] and not self.headless:
                     status = "❌ MALA" if is_bad_posture else "✅ BUENA"
-                    print(f"Frame {frame_count}: Postura {status}")
+                    if self.grabber:
+                        latency_ms = (time.time() - frame_time) * 1000
+                        counters = self.grabber.get_counters()
+                        print(f"Frame {frame_count}: Postura {status} | latencia {latency_ms:.0f}ms | "
+                              f"descartados {counters['dropped']}/{counters['captured']}")
+                    else:
+                        print(f"Frame {frame_count}: Postura {status}")
                     if posture_issues:
                         for issue in posture_issues:
                             print(f"  - {issue}")
@@ -265,10 +456,39 @@ class PostureAnalysisSystem:
             print("\n🛑 Interrumpido por usuario")
         
         except Exception as e:
-            print(f"❌ Error durante ejecución: {e}")
+            self.error = f"Error durante ejecución: {e}"
+            print(f"❌ {self.error}")
         
         finally:
+            self.processing_time = time.time() - processing_start
             self.cleanup()
+        
+        return self.error is None
+    
+    def get_counters(self):
+        """
+        Contadores de la sesión para el reporte de latencias
+        Returns:
+            dict: Frames procesados, descartados, inferidos, recortados y perfil del modelo
+        """
+        counters = {'frames_procesados': self.frames_processed, 'perfil_modelo': self.detector.profile}
+        if self.grabber:
+            grabber_counters = self.grabber.get_counters()
+            counters['frames_capturados'] = grabber_counters['captured']
+            counters['frames_descartados'] = grabber_counters['dropped']
+        scheduler_counters = self.detector.scheduler.get_counters()
+        counters['frames_inferidos'] = scheduler_counters['inferred']
+        counters['frames_reutilizados'] = scheduler_counters['skipped']
+        counters['inferencias_recortadas'] = self.detector.roi_tracker.cropped_frames
+        return counters
+    
+    def print_latency_summary(self):
+        """Imprime FPS y p50/p95/p99 por etapa"""
+        print("⏱️  Latencia por etapa (ms p50 / p95 / p99):")
+        for name, entry in self.profiler.summary().items():
+            if 'p50' in entry:
+                print(f"   • {name}: {entry['p50']:.1f} / {entry['p95']:.1f} / {entry['p99']:.1f} "
+                      f"({entry['count']} mediciones)")
     
     def cleanup(self):
         """
@@ -285,15 +505,68 @@ class PostureAnalysisSystem:
             
             # Exportar automáticamente
             try:
-                export_path = self.statistics.export_to_csv()
+                filename = None
+                if self.headless and self.source:
+                    filename = f"posture_stats_{self.source.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+                export_path = self.statistics.export_to_csv(filename, output_dir=self.output_dir)
                 print(f"📄 Estadísticas exportadas automáticamente: {export_path}")
             except Exception as e:
                 print(f"⚠️ Error exportando estadísticas: {e}")
+            
+            # Agregar la sesión al historial
+            if self.statistics.session_start_time is not None:
+                try:
+                    store = SessionStore(os.path.join(self.output_dir, "sessions.db"))
+                    session_id = store.add_session(self.statistics, self.user,
+                                                   source=self.source.name if self.source else None,
+                                                   profile=self.detector.profile)
+                    store.close()
+                    print(f"🗄️  Sesión #{session_id} guardada en el historial de {self.user}")
+                except Exception as e:
+                    print(f"⚠️ Error guardando la sesión en el historial: {e}")
+        
+        if self.recorder:
+            self.recorder.close()
+        
+        if self.frame_exporter:
+            self.frame_exporter.close()
+        
+        # Latencias por etapa junto a las estadísticas
+        if self.profiler.counts:
+            self.print_latency_summary()
+            try:
+                name = self.source.name if self.source else "sesion"
+                filename = f"latency_{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+                os.makedirs(self.output_dir, exist_ok=True)
+                self.profiler.export_to_csv(os.path.join(self.output_dir, filename), self.get_counters())
+            except Exception as e:
+                print(f"⚠️ Error exportando latencias: {e}")
+        
+        if self.detector.adaptive_inference:
+            counters = self.detector.scheduler.get_counters()
+            print(f"🧠 Frames inferidos: {counters['inferred']} | reutilizados: {counters['skipped']} "
+                  f"({counters['inference_ratio'] * 100:.0f}% con MediaPipe)")
+        
+        print(f"⚙️  Perfil final del modelo: {self.detector.profile}")
+        
+        if self.detector.roi_tracking:
+            tracker = self.detector.roi_tracker
+            print(f"✂️  Inferencias sobre recorte: {tracker.cropped_frames} | frame completo: {tracker.full_frames}")
         
-        if self.camera:
-            self.camera.release()
+        if self.grabber:
+            self.grabber.stop()
+            counters = self.grabber.get_counters()
+            print(f"📷 Frames capturados: {counters['captured']} | procesados: {counters['delivered']} | "
+                  f"descartados: {counters['dropped']}")
         
-        cv2.destroyAllWindows()
+        if self.source:
+            self.source.release()
+        
+        if self.results_file:
+            self.results_file.close()
+        
+        if not self.headless:
+            cv2.destroyAllWindows()
         
         if self.visualizer:
             self.visualizer.close()
@@ -303,10 +576,42 @@ class PostureAnalysisSystem:
         
         print("✅ Limpieza completada")
 
+def parse_args():
+    """
+    Lee los argumentos de línea de comandos
+    """
+    parser = argparse.ArgumentParser(description="Sistema de Detección de Postura Corporal")
+    parser.add_argument('--source', default="0",
+                        help="Índice de cámara, archivo de video o carpeta de imágenes (por defecto 0)")
+    parser.add_argument('--headless', action='store_true',
+                        help="Procesar sin ventanas, visualizador 3D ni dashboard, a máxima velocidad")
+    parser.add_argument('--output-dir', default="estadisticas",
+                        help="Carpeta para estadísticas y resultados por frame")
+    parser.add_argument('--no-mirror', action='store_true', help="No aplicar espejo horizontal a los frames")
+    parser.add_argument('--image-fps', type=float, default=30.0,
+                        help="Tasa nominal para carpetas de imágenes")
+    parser.add_argument('--record', metavar='ARCHIVO.npy',
+                        help="Grabar los landmarks de la sesión para reproducirlos con landmark_recorder.py")
+    parser.add_argument('--full-rate', action='store_true',
+                        help="Inferir en todos los frames aunque la postura sea estable")
+    parser.add_argument('--no-roi', action='store_true',
+                        help="Inferir siempre sobre el frame completo, sin recortar la región del cuerpo")
+    parser.add_argument('--no-columns', action='store_true',
+                        help="No exportar las mediciones por frame en columnas .npy")
+    parser.add_argument('--profile', choices=['auto', 'lite', 'full', 'heavy'], default=None,
+                        help="Perfil del modelo (por defecto 'auto' en vivo y 'full' sin interfaz)")
+    parser.add_argument('--target-fps', type=float, default=15.0,
+                        help="Tasa de inferencia objetivo del perfil automático")
+    parser.add_argument('--user', default=None,
+                        help="Usuario de la sesión en el historial (por defecto, el del sistema)")
+    return parser.parse_args()
+
 def main():
     """
     Función principal
     """
+    args = parse_args()
+    
     print("=" * 70)
     print("🎯 SISTEMA DE DETECCIÓN DE POSTURA CORPORAL - VERSIÓN MEJORADA")
     print("=" * 70)
@@ -326,13 +631,21 @@ def main():
     print("=" * 70)
     print("🎮 CONTROLES:")
     print("   • 'q' - Salir del sistema")
-    print("   • 's' - Pausar cámara y abrir estadísticas")
+    print("   • 's' - Abrir estadísticas (la detección continúa)")
     print("   • 'r' - Reiniciar estadísticas de la sesión")
-    print("   • En estadísticas: 'Volver a Camara' - Reanudar detección")
+    print("   • 'p' - Mostrar/ocultar FPS y latencia por etapa")
     print("=" * 70)
     
+    # Sin interfaz se prioriza la precisión: el tiempo de proceso no afecta al usuario
+    profile = args.profile or ('full' if args.headless else 'auto')
+    
     # Crear y ejecutar sistema
-    system = PostureAnalysisSystem()
+    system = PostureAnalysisSystem(source=args.source, headless=args.headless, output_dir=args.output_dir,
+                                   mirror=not args.no_mirror, image_fps=args.image_fps,
+                                   record_path=args.record, adaptive_inference=not args.full_rate,
+                                   roi_tracking=not args.no_roi, profile=profile,
+                                   target_fps=args.target_fps, export_columns=not args.no_columns,
+                                   user=args.user)
     
     try:
         system.run()
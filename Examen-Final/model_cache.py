@@ -0,0 +1,211 @@
+"""
+Caché en disco de los modelos 3D ya procesados
+Cargar un .obj grande, decodificar su textura PNG y centrarlo/escalarlo toma segundos; el
+resultado (vértices, caras, coordenadas de textura, normales y la textura decodificada) se guarda
+como arreglos .npy en models/.cache/<hash>/ y en los siguientes inicios se abre con memmap.
+
+Las entradas se identifican por el hash del contenido del modelo y su textura; un índice con
+tamaño y fecha de modificación evita recalcular el hash cuando los archivos no cambiaron
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+import vedo
+from vtkmodules.util.numpy_support import numpy_to_vtk, numpy_to_vtkIdTypeArray, vtk_to_numpy
+from vtkmodules.vtkCommonCore import vtkPoints
+from vtkmodules.vtkCommonDataModel import vtkCellArray, vtkImageData, vtkPolyData
+from vtkmodules.vtkRenderingCore import vtkTexture
+
+# Cambiar al modificar cómo se procesan los modelos (optimize_model): invalida las entradas previas
+CACHE_VERSION = 1
+
+
+def _polydata(mesh):
+    """Geometría de la malla con sus transformaciones aplicadas (vedo reciente y anterior)"""
+    if hasattr(mesh, 'dataset'):
+        return mesh.dataset
+    return mesh.polydata(True)
+
+
+def _actor(mesh):
+    """Actor de la malla (en versiones anteriores de vedo la malla es el actor)"""
+    return getattr(mesh, 'actor', mesh)
+
+
+def _file_stamp(path):
+    """(tamaño, fecha de modificación en ns) de un archivo"""
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class ModelCache:
+    """
+    Modelos procesados por hash de contenido, validados contra la fecha de modificación
+    """
+
+    def __init__(self, cache_dir):
+        """
+        Inicializa la caché (la carpeta se crea al guardar la primera entrada)
+        Args:
+            cache_dir: Carpeta de la caché
+        """
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.index = {}  # {ruta del modelo: {'model': sello, 'texture': [ruta, sello] o None, 'key': hash}}
+
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, encoding='utf-8') as f:
+                    self.index = json.load(f)
+            except (OSError, ValueError):
+                print("⚠️  Índice de la caché de modelos dañado, se reconstruirá")
+
+        # Contadores
+        self.hits = 0
+        self.misses = 0
+
+    def key_for(self, model_path, texture_path):
+        """
+        Clave de la entrada de un modelo: la del índice si tamaño y fecha no cambiaron,
+        si no el hash del contenido (y se actualiza el índice)
+        Returns:
+            str: Hash hexadecimal
+        """
+        model_path = os.path.abspath(model_path)
+        texture_path = os.path.abspath(texture_path) if texture_path else None
+        stamp = {
+            'model': _file_stamp(model_path),
+            'texture': [texture_path, _file_stamp(texture_path)] if texture_path else None
+        }
+        entry = self.index.get(model_path)
+        if entry is not None and entry['model'] == stamp['model'] and entry['texture'] == stamp['texture']:
+            return entry['key']
+
+        digest = hashlib.sha256(f"v{CACHE_VERSION}".encode())
+        for path in (model_path, texture_path):
+            if path:
+                with open(path, 'rb') as f:
+                    for block in iter(lambda: f.read(1 << 20), b''):
+                        digest.update(block)
+        key = digest.hexdigest()[:32]
+
+        self.index[model_path] = dict(stamp, key=key)
+        self._save_index()
+        return key
+
+    def load(self, key):
+        """
+        Reconstruye una malla guardada
+        Returns:
+            tuple: (vedo.Mesh, metadatos) o (None, None) si no está en la caché
+        """
+        entry_dir = os.path.join(self.cache_dir, key)
+        meta_path = os.path.join(entry_dir, "meta.json")
+        if not os.path.exists(meta_path):
+            self.misses += 1
+            return None, None
+
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+
+        def array(name):
+            # Copia en escritura: páginas leídas bajo demanda, modificaciones privadas
+            path = os.path.join(entry_dir, f"{name}.npy")
+            return np.load(path, mmap_mode='c') if os.path.exists(path) else None
+
+        polydata = vtkPolyData()
+        points = vtkPoints()
+        points.SetData(numpy_to_vtk(array('points')))
+        polydata.SetPoints(points)
+
+        polys = vtkCellArray()
+        polys.SetData(numpy_to_vtkIdTypeArray(np.ascontiguousarray(array('offsets'), dtype=np.int64)),
+                      numpy_to_vtkIdTypeArray(np.ascontiguousarray(array('connectivity'), dtype=np.int64)))
+        polydata.SetPolys(polys)
+
+        tcoords = array('tcoords')
+        if tcoords is not None:
+            polydata.GetPointData().SetTCoords(numpy_to_vtk(tcoords))
+        normals = array('normals')
+        if normals is not None:
+            polydata.GetPointData().SetNormals(numpy_to_vtk(normals))
+
+        mesh = vedo.Mesh(polydata)
+
+        texture_pixels = array('texture')
+        if texture_pixels is not None:
+            height, width, components = texture_pixels.shape
+            image = vtkImageData()
+            image.SetDimensions(width, height, 1)
+            image.GetPointData().SetScalars(numpy_to_vtk(texture_pixels.reshape(-1, components)))
+            texture = vtkTexture()
+            texture.SetInputData(image)
+            texture.InterpolateOn()
+            texture.RepeatOn()
+            mesh.texture(texture)
+
+        self.hits += 1
+        return mesh, meta
+
+    def store(self, key, mesh, meta):
+        """
+        Guarda una malla procesada (escribe en una carpeta temporal y la renombra al terminar)
+        Args:
+            key: Clave de key_for()
+            mesh: vedo.Mesh ya optimizada
+            meta: dict serializable a JSON (nombre, dimensiones, ...)
+        """
+        entry_dir = os.path.join(self.cache_dir, key)
+        if os.path.exists(entry_dir):
+            return
+
+        polydata = _polydata(mesh)
+        polys = polydata.GetPolys()
+        arrays = {
+            'points': vtk_to_numpy(polydata.GetPoints().GetData()).astype(np.float32),
+            'offsets': vtk_to_numpy(polys.GetOffsetsArray()).astype(np.int64),
+            'connectivity': vtk_to_numpy(polys.GetConnectivityArray()).astype(np.int64)
+        }
+        point_data = polydata.GetPointData()
+        if point_data.GetTCoords() is not None:
+            arrays['tcoords'] = vtk_to_numpy(point_data.GetTCoords()).astype(np.float32)
+        if point_data.GetNormals() is not None:
+            arrays['normals'] = vtk_to_numpy(point_data.GetNormals()).astype(np.float32)
+
+        # Textura decodificada, en el orden de filas de VTK (se reconstruye tal cual)
+        texture = _actor(mesh).GetTexture()
+        if texture is not None and texture.GetInput() is not None:
+            image = texture.GetInput()
+            width, height, _ = image.GetDimensions()
+            pixels = vtk_to_numpy(image.GetPointData().GetScalars())
+            arrays['texture'] = pixels.reshape(height, width, -1).astype(np.uint8)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_dir = entry_dir + ".tmp"
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        os.makedirs(temp_dir)
+        for name, values in arrays.items():
+            np.save(os.path.join(temp_dir, f"{name}.npy"), np.ascontiguousarray(values))
+        with open(os.path.join(temp_dir, "meta.json"), 'w', encoding='utf-8') as f:
+            json.dump(dict(meta, version=CACHE_VERSION), f, ensure_ascii=False, indent=2)
+        os.replace(temp_dir, entry_dir)
+
+        size_mb = sum(values.nbytes for values in arrays.values()) / 1e6
+        print(f"💾 Modelo guardado en caché ({size_mb:.1f} MB): {meta.get('filename', key)}")
+
+    def _save_index(self):
+        """Escribe el índice de forma atómica"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.index_path)
+
+    def clear(self):
+        """Borra toda la caché"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        self.index = {}
+        print(f"🗑️  Caché de modelos borrada: {self.cache_dir}")
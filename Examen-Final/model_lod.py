@@ -0,0 +1,151 @@
+"""
+Niveles de detalle (LOD) de los modelos 3D
+Un modelo escaneado puede tener cientos de miles de triángulos y una textura de varios MB; en
+equipos modestos, que además corren la detección, renderizarlo completo compite con MediaPipe.
+Al importar cada modelo se generan versiones simplificadas (decimación cuádrica que conserva
+coordenadas de textura y normales) con la textura reducida y mipmaps; el visualizador elige el
+nivel según el tiempo de render medido
+"""
+
+import numpy as np
+import vedo
+from vtkmodules.util.numpy_support import numpy_to_vtk, vtk_to_numpy
+from vtkmodules.vtkCommonDataModel import vtkImageData
+from vtkmodules.vtkFiltersCore import vtkQuadricDecimation
+from vtkmodules.vtkRenderingCore import vtkTexture
+
+from model_cache import _actor, _polydata
+
+# (triángulos máximos, lado máximo de la textura); el nivel 0 es el modelo completo
+LOD_LEVELS = (
+    (None, None),
+    (100000, 2048),
+    (25000, 1024),
+    (6000, 512)
+)
+
+
+def triangle_count(mesh):
+    """Número de polígonos de la malla"""
+    return _polydata(mesh).GetNumberOfPolys()
+
+
+def make_texture(pixels):
+    """
+    Textura con mipmaps a partir de los píxeles decodificados
+    Args:
+        pixels: Arreglo (alto, ancho, canales) uint8 en el orden de filas de VTK
+    Returns:
+        vtkTexture
+    """
+    height, width, components = pixels.shape
+    image = vtkImageData()
+    image.SetDimensions(width, height, 1)
+    image.GetPointData().SetScalars(numpy_to_vtk(pixels.reshape(-1, components)))
+
+    texture = vtkTexture()
+    texture.SetInputData(image)
+    texture.InterpolateOn()
+    texture.RepeatOn()
+    texture.MipmapOn()  # Sin parpadeo al alejar la cámara y menos ancho de banda de memoria
+    return texture
+
+
+def enable_mipmaps(mesh):
+    """Activa mipmaps en la textura de la malla, si tiene"""
+    texture = _actor(mesh).GetTexture()
+    if texture is not None:
+        texture.MipmapOn()
+    return mesh
+
+
+def texture_pixels(mesh):
+    """
+    Píxeles de la textura de la malla
+    Returns:
+        np.ndarray: (alto, ancho, canales) o None si no tiene textura
+    """
+    texture = _actor(mesh).GetTexture()
+    if texture is None or texture.GetInput() is None:
+        return None
+    image = texture.GetInput()
+    width, height, _ = image.GetDimensions()
+    return vtk_to_numpy(image.GetPointData().GetScalars()).reshape(height, width, -1)
+
+
+def downsample_texture(pixels, max_size):
+    """
+    Reduce la textura promediando bloques de 2x2 hasta que su lado mayor quepa en max_size
+    Args:
+        pixels: Arreglo (alto, ancho, canales)
+        max_size: Lado máximo en píxeles
+    Returns:
+        np.ndarray: Píxeles reducidos (uint8)
+    """
+    pixels = np.asarray(pixels)
+    while max(pixels.shape[:2]) > max_size:
+        height, width = pixels.shape[0] // 2 * 2, pixels.shape[1] // 2 * 2
+        blocks = pixels[:height, :width].astype(np.uint16)
+        pixels = ((blocks[0::2, 0::2] + blocks[1::2, 0::2] + blocks[0::2, 1::2] + blocks[1::2, 1::2] + 2)
+                  // 4).astype(np.uint8)
+    return np.ascontiguousarray(pixels, dtype=np.uint8)
+
+
+def decimate(mesh, target_triangles, max_texture_size=None):
+    """
+    Versión simplificada de una malla
+    Args:
+        mesh: vedo.Mesh (ya optimizada)
+        target_triangles: Triángulos objetivo
+        max_texture_size: Lado máximo de la textura (None = sin cambios)
+    Returns:
+        vedo.Mesh: Malla nueva; la original no se modifica
+    """
+    source = _polydata(mesh)
+    decimation = vtkQuadricDecimation()
+    decimation.SetInputData(source)
+    decimation.SetTargetReduction(1.0 - target_triangles / max(source.GetNumberOfPolys(), 1))
+    decimation.VolumePreservationOn()
+    # Las coordenadas de textura y normales entran en el error: las costuras de la textura se conservan
+    decimation.AttributeErrorMetricOn()
+    decimation.TCoordsAttributeOn()
+    decimation.NormalsAttributeOn()
+    decimation.Update()
+
+    reduced = vedo.Mesh(decimation.GetOutput())
+
+    pixels = texture_pixels(mesh)
+    if pixels is not None:
+        if max_texture_size:
+            pixels = downsample_texture(pixels, max_texture_size)
+        reduced.texture(make_texture(pixels))
+    return reduced
+
+
+def build_levels(mesh, levels=LOD_LEVELS, load=None, store=None):
+    """
+    Genera los niveles de detalle de una malla; cada nivel se obtiene del anterior
+    Args:
+        mesh: vedo.Mesh completa (nivel 0)
+        levels: Especificación (triángulos, lado de textura) de cada nivel
+        load: Función opcional (nivel) -> malla guardada o None
+        store: Función opcional (nivel, malla) para guardar un nivel generado
+    Returns:
+        list: [{'level', 'triangles', 'mesh'}], solo niveles con menos triángulos que el anterior
+    """
+    result = [{'level': 0, 'triangles': triangle_count(mesh), 'mesh': enable_mipmaps(mesh)}]
+
+    for level, (target, texture_size) in enumerate(levels):
+        if target is None or target >= result[-1]['triangles'] * 0.8:
+            continue  # Nivel completo o reducción insignificante
+
+        reduced = load(level) if load else None
+        if reduced is not None:
+            enable_mipmaps(reduced)
+        else:
+            reduced = decimate(result[-1]['mesh'], target, texture_size)
+            if store:
+                store(level, reduced)
+        result.append({'level': level, 'triangles': triangle_count(reduced), 'mesh': reduced})
+
+    return result
@@ -0,0 +1,106 @@
+"""
+Escritura incremental de archivos .npy
+Permite agregar registros por bloques durante la sesión y leer el archivo con
+np.load(ruta, mmap_mode='r') sin copias, incluso si el programa se interrumpe
+"""
+
+import numpy as np
+from numpy.lib import format as npy_format
+
+# Espacio reservado para el número de registros en el encabezado
+_SHAPE_PLACEHOLDER_DIGITS = 20
+
+
+class NpyStreamWriter:
+    """
+    Escribe un arreglo 1D (normalmente con dtype estructurado) en bloques.
+    El encabezado tiene tamaño fijo y se reescribe en cada vaciado con el número de registros
+    """
+
+    def __init__(self, path, dtype, chunk_size=256):
+        """
+        Args:
+            path: Ruta del archivo .npy
+            dtype: Tipo de dato de cada registro
+            chunk_size: Registros acumulados en memoria antes de escribir a disco
+        """
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.count = 0  # Registros ya escritos en disco
+        self._buffer = np.zeros(chunk_size, dtype=self.dtype)
+        self._buffered = 0
+
+        # Encabezado de tamaño fijo: alineado a 64 bytes como numpy y con espacio
+        # para el mayor número de registros posible
+        preamble_len = len(npy_format.MAGIC_PREFIX) + 2 + 2  # magic + versión + longitud
+        placeholder = self._header_dict(10 ** (_SHAPE_PLACEHOLDER_DIGITS - 1))
+        align = npy_format.ARRAY_ALIGN
+        self._header_len = -(-(preamble_len + len(placeholder) + 1) // align) * align
+        self._dict_len = self._header_len - preamble_len
+
+        self.file = open(path, 'wb')
+        self.file.write(self._header_bytes(0))
+
+    def _header_dict(self, count):
+        """Diccionario del encabezado .npy como texto"""
+        return repr({
+            'descr': npy_format.dtype_to_descr(self.dtype),
+            'fortran_order': False,
+            'shape': (count,)
+        })
+
+    def _header_bytes(self, count):
+        """Encabezado .npy v1.0 rellenado al tamaño fijo"""
+        header = self._header_dict(count).ljust(self._dict_len - 1) + '\n'
+        return npy_format.magic(1, 0) + self._dict_len.to_bytes(2, 'little') + header.encode('latin1')
+
+    def append(self, record):
+        """
+        Agrega un registro (tupla o escalar estructurado)
+        """
+        self._buffer[self._buffered] = record
+        self._buffered += 1
+        if self._buffered == len(self._buffer):
+            self.flush()
+
+    def next_slot(self):
+        """
+        Retorna el siguiente registro del búfer para llenarlo en sitio (evita crear tuplas)
+        Debe seguirse de commit()
+        """
+        return self._buffer[self._buffered]
+
+    def commit(self):
+        """Confirma el registro obtenido con next_slot()"""
+        self._buffered += 1
+        if self._buffered == len(self._buffer):
+            self.flush()
+
+    def flush(self):
+        """Escribe el búfer a disco y actualiza el encabezado"""
+        if self.file is None:
+            return
+
+        if self._buffered:
+            self.file.write(self._buffer[:self._buffered].tobytes())
+            self.count += self._buffered
+            self._buffered = 0
+            self._buffer[:] = 0
+
+        position = self.file.tell()
+        self.file.seek(0)
+        self.file.write(self._header_bytes(self.count))
+        self.file.seek(position)
+        self.file.flush()
+
+    def close(self):
+        """Vacía el búfer y cierra el archivo"""
+        if self.file is None:
+            return
+
+        self.flush()
+        self.file.close()
+        self.file = None
+
+    def __len__(self):
+        return self.count + self._buffered
@@ -1,25 +1,64 @@
 """
 Módulo de visualización 3D de postura correcta usando Vedo
 Muestra un modelo 3D interactivo de la postura ideal
+
+Los modelos se cargan en un hilo de segundo plano desde el inicio (incluida la importación de
+vedo); la cámara arranca sin esperarlos y la ventana 3D espera la carga solo si aún no terminó.
+
+La ventana vive en un hilo de render propio que crea la escena una sola vez: las alertas
+siguientes solo la vuelven a mostrar. El bucle principal le envía 'show', 'hide' o 'close'
+por una cola
 """
 
-import vedo
 import numpy as np
 import os
+import queue
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from threading import Thread
 import time
 
+vedo = None  # Se importa en el hilo de precarga (ver _import_vedo)
+
+
+def _import_vedo():
+    """Importa vedo una sola vez para todo el módulo"""
+    global vedo
+    if vedo is None:
+        import vedo as vedo_module
+        vedo = vedo_module
+    return vedo
+
 class Pose3DVisualizer:
-    def __init__(self, models_dir="models"):
+    def __init__(self, models_dir="models", use_cache=True, preload=True, live=True):
         """
         Inicializa el visualizador 3D
         Args:
             models_dir: Directorio donde buscar modelos 3D personalizados
+            use_cache: Guardar y reutilizar los modelos procesados en models_dir/.cache
+            preload: Cargar los modelos en segundo plano desde ya (si no, al mostrar la ventana)
+            live: Mostrar el esqueleto del usuario en vivo junto al modelo de referencia
         """
         self.models_dir = models_dir
+        self.use_cache = use_cache
+        self.model_cache = None
         self.plotter = None
         self.is_showing = False
-        self.thread = None
+        self.thread = None  # Hilo de render (dueño de la ventana y la escena)
+        self.commands = queue.Queue()  # 'show', 'hide', 'close'
+        self._pending_command = None
+        self.COMMAND_POLL_MS = 33  # Revisión de la cola y del esqueleto en vivo con la ventana visible
+        
+        # Esqueleto en vivo: el bucle de detección deja la última pose y el hilo de render la toma
+        self.live = live
+        self.live_skeleton = None
+        self.live_pose = None  # (landmarks de mundo, problemas), se reemplaza completo
+        self._drawn_pose = None
+        
+        # Nivel de detalle: se baja mientras el render supere el presupuesto
+        self.lod_level = 0
+        self.scene_models = []
+        self.RENDER_BUDGET_MS = 12.0  # Por frame, para no competir con la detección
+        self.LOD_PROBE_FRAMES = 5
         self.manually_closed = False  # Nueva variable para detectar cierre manual
         self.allow_auto_open = True  # Permite apertura automática
         self.last_show_time = 0  # Para evitar spam de ventanas
@@ -27,8 +66,56 @@ class Pose3DVisualizer:
         # Variables para manejo de modelos
         self.custom_models = []
         
-        # Cargar modelos disponibles al inicializar
-        self.load_all_models()
+        # Precarga en segundo plano: el futuro se completa con el número de modelos cargados
+        self.models_ready = Future()
+        self.preload_thread = None
+        self.load_time = None
+        if preload:
+            self.preload()
+    
+    def preload(self):
+        """
+        Inicia la carga de modelos en un hilo de segundo plano (solo la primera vez)
+        Returns:
+            Future: Se completa al terminar la carga
+        """
+        if self.preload_thread is None:
+            self.preload_thread = Thread(target=self._preload_worker, name="ModelPreload", daemon=True)
+            self.preload_thread.start()
+        return self.models_ready
+    
+    def _preload_worker(self):
+        """Importa vedo y carga los modelos; el resultado o el error quedan en models_ready"""
+        start = time.perf_counter()
+        try:
+            self.load_all_models()
+        except Exception as e:
+            print(f"❌ Error precargando modelos 3D: {e}")
+            self.models_ready.set_exception(e)
+            return
+        
+        self.load_time = time.perf_counter() - start
+        print(f"🧊 Modelos 3D listos en {self.load_time:.2f}s (segundo plano)")
+        self.models_ready.set_result(len(self.custom_models))
+    
+    def wait_until_ready(self, timeout=None):
+        """
+        Espera a que termine la precarga (la inicia si no se había iniciado)
+        Args:
+            timeout: Segundos máximos de espera (None = sin límite)
+        Returns:
+            bool: True si los modelos están listos, False si falló la carga o se agotó el tiempo
+        """
+        future = self.preload()
+        if not future.done():
+            print("⏳ Esperando a que terminen de cargar los modelos 3D...")
+        try:
+            future.result(timeout)
+            return True
+        except FutureTimeoutError:
+            return False
+        except Exception:
+            return False
         
     def create_correct_posture_model(self):
         """
@@ -173,6 +260,11 @@ class Pose3DVisualizer:
         """
         Carga todos los modelos 3D disponibles en la carpeta models y subcarpetas
         """
+        _import_vedo()
+        if self.use_cache and self.model_cache is None:
+            from model_cache import ModelCache
+            self.model_cache = ModelCache(os.path.join(self.models_dir, ".cache"))
+        
         self.custom_models = []
         
         if not os.path.exists(self.models_dir):
@@ -182,29 +274,30 @@ class Pose3DVisualizer:
         # Buscar archivos de modelo comunes
         model_extensions = ['.obj', '.ply', '.stl', '.vtk']
         model_files = []
+        listings = {}  # {carpeta: archivos}, cada carpeta se lista una sola vez
+        
+        def has_model_extension(name):
+            return any(name.lower().endswith(ext) for ext in model_extensions)
         
         # Buscar en la carpeta principal
-        for file in os.listdir(self.models_dir):
+        listings[self.models_dir] = sorted(os.listdir(self.models_dir))
+        for file in listings[self.models_dir]:
             file_path = os.path.join(self.models_dir, file)
             
             if os.path.isfile(file_path):
                 # Archivo en carpeta principal
-                for ext in model_extensions:
-                    if file.lower().endswith(ext):
-                        model_files.append((file_path, file))
-                        break
-            elif os.path.isdir(file_path):
-                # Buscar en subcarpetas
+                if has_model_extension(file):
+                    model_files.append((file_path, file))
+            elif os.path.isdir(file_path) and not file.startswith('.'):
+                # Buscar en subcarpetas (las ocultas, como la caché, se omiten)
                 try:
-                    for subfile in os.listdir(file_path):
-                        for ext in model_extensions:
-                            if subfile.lower().endswith(ext):
-                                subfile_path = os.path.join(file_path, subfile)
-                                display_name = f"{file}/{subfile}"
-                                model_files.append((subfile_path, display_name))
-                                break
+                    listings[file_path] = sorted(os.listdir(file_path))
                 except PermissionError:
                     print(f"⚠️  No se puede acceder a la carpeta {file_path}")
+                    continue
+                for subfile in listings[file_path]:
+                    if has_model_extension(subfile):
+                        model_files.append((os.path.join(file_path, subfile), f"{file}/{subfile}"))
         
         if not model_files:
             print(f"📁 No se encontraron modelos en {self.models_dir}/, usando modelo generado")
@@ -216,30 +309,31 @@ class Pose3DVisualizer:
         # Cargar cada modelo
         for model_path, display_name in model_files:
             try:
-                print(f"🔄 Cargando modelo: {display_name}")
+                texture_path = self.find_texture(model_path, listings[os.path.dirname(model_path)])
                 
-                # Buscar archivo de textura asociado
-                texture_path = None
-                model_dir = os.path.dirname(model_path)
-                base_name = os.path.splitext(os.path.basename(model_path))[0]
+                # Modelo ya procesado en una ejecución anterior
+                cache_key = None
+                if self.model_cache is not None:
+                    cache_key = self.model_cache.key_for(model_path, texture_path)
+                    model, _ = self.model_cache.load(cache_key)
+                    if model is not None:
+                        self.custom_models.append({
+                            'model': model,
+                            'filename': display_name,
+                            'path': model_path,
+                            'texture_path': texture_path,
+                            'cache_key': cache_key
+                        })
+                        print(f"⚡ Modelo cargado desde caché: {display_name}")
+                        continue
                 
-                # Buscar texturas con nombres similares
-                for ext in ['.png', '.jpg', '.jpeg', '.bmp', '.tga']:
-                    potential_texture = os.path.join(model_dir, base_name + ext)
-                    if os.path.exists(potential_texture):
-                        texture_path = potential_texture
-                        break
-                    # También buscar archivos que contengan "texture" en el nombre
-                    texture_files = [f for f in os.listdir(model_dir) if 'texture' in f.lower() and f.lower().endswith(ext)]
-                    if texture_files:
-                        texture_path = os.path.join(model_dir, texture_files[0])
-                        break
+                print(f"🔄 Cargando modelo: {display_name}")
                 
                 # Cargar modelo
                 model = vedo.load(model_path)
                 
                 # Aplicar textura si se encuentra
-                if texture_path and os.path.exists(texture_path):
+                if texture_path:
                     print(f"🎨 Aplicando textura: {os.path.basename(texture_path)}")
                     model.texture(texture_path)
                 else:
@@ -254,9 +348,17 @@ class Pose3DVisualizer:
                         'model': model,
                         'filename': display_name,
                         'path': model_path,
-                        'texture_path': texture_path
+                        'texture_path': texture_path,
+                        'cache_key': cache_key
                     })
                     print(f"✅ Modelo cargado y optimizado: {display_name}")
+                    
+                    if cache_key is not None:
+                        try:
+                            self.model_cache.store(cache_key, model, {'filename': display_name,
+                                                                      'texture_path': texture_path})
+                        except Exception as e:
+                            print(f"⚠️  No se pudo guardar {display_name} en caché: {e}")
                 else:
                     print(f"❌ Modelo vacío o inválido: {display_name}")
                     
@@ -264,6 +366,10 @@ class Pose3DVisualizer:
                 print(f"❌ Error cargando {display_name}: {e}")
                 print(f"   Ruta: {model_path}")
         
+        # Niveles de detalle (solo de los modelos que se muestran)
+        for model_info in self.custom_models[:2]:
+            model_info['levels'] = self.build_model_levels(model_info)
+        
         if self.custom_models:
             print(f"🎯 {len(self.custom_models)} modelos disponibles")
             for i, model_info in enumerate(self.custom_models):
@@ -273,6 +379,73 @@ class Pose3DVisualizer:
         else:
             print("⚠️  No se pudieron cargar modelos, usando generado por código")
     
+    def build_model_levels(self, model_info):
+        """
+        Genera (o carga de la caché) las versiones simplificadas de un modelo
+        Args:
+            model_info: Entrada de custom_models
+        Returns:
+            list: Niveles de model_lod.build_levels, del más detallado al más simple
+        """
+        from model_lod import build_levels
+        
+        cache_key = model_info.get('cache_key')
+        load = store = None
+        if cache_key is not None:
+            def load(level):
+                mesh, _ = self.model_cache.load(f"{cache_key}-lod{level}")
+                return mesh
+            
+            def store(level, mesh):
+                try:
+                    self.model_cache.store(f"{cache_key}-lod{level}", mesh,
+                                           {'filename': f"{model_info['filename']} (nivel {level})",
+                                            'level': level})
+                except Exception as e:
+                    print(f"⚠️  No se pudo guardar el nivel {level} de {model_info['filename']}: {e}")
+        
+        try:
+            levels = build_levels(model_info['model'], load=load, store=store)
+        except Exception as e:
+            print(f"⚠️  Error generando niveles de detalle de {model_info['filename']}: {e}")
+            return [{'level': 0, 'triangles': None, 'mesh': model_info['model']}]
+        
+        counts = ", ".join(f"{level['triangles']:,}" for level in levels)
+        print(f"🪜 Niveles de detalle de {model_info['filename']}: {counts} triángulos")
+        return levels
+    
+    def current_level(self, model_info):
+        """Nivel de detalle actual de un modelo (o el más simple disponible)"""
+        levels = model_info['levels']
+        return levels[min(self.lod_level, len(levels) - 1)]
+    
+    def lod_mesh(self, model_info):
+        """Malla del nivel de detalle actual"""
+        if not model_info.get('levels'):
+            return model_info['model']
+        return self.current_level(model_info)['mesh']
+    
+    def find_texture(self, model_path, listing):
+        """
+        Busca la textura de un modelo: mismo nombre con extensión de imagen o, si no,
+        un archivo de la carpeta que contenga "texture" (por orden de extensión)
+        Args:
+            model_path: Ruta del modelo
+            listing: Archivos de la carpeta del modelo
+        Returns:
+            str: Ruta de la textura o None
+        """
+        model_dir = os.path.dirname(model_path)
+        base_name = os.path.splitext(os.path.basename(model_path))[0]
+        
+        for ext in ['.png', '.jpg', '.jpeg', '.bmp', '.tga']:
+            if base_name + ext in listing:
+                return os.path.join(model_dir, base_name + ext)
+            texture_files = [f for f in listing if 'texture' in f.lower() and f.lower().endswith(ext)]
+            if texture_files:
+                return os.path.join(model_dir, texture_files[0])
+        return None
+    
     def optimize_model(self, model, name):
         """
         Optimiza un modelo 3D: centrado, escalado y posicionamiento
@@ -326,7 +499,7 @@ class Pose3DVisualizer:
         if len(self.custom_models) == 1:
             # Solo un modelo disponible, centrarlo
             current = self.custom_models[0]
-            model_copy = current['model'].clone()
+            model_copy = self.lod_mesh(current).clone()
             
             # Configurar orientación y tamaño para modelo único
             model_copy.pos(0, 0, -0.2)  # Centrar, ligeramente hacia atrás
@@ -336,8 +509,8 @@ class Pose3DVisualizer:
             return [model_copy], current['filename']
         
         # Dos o más modelos: mostrar los primeros dos lado a lado
-        model1 = self.custom_models[0]['model'].clone()
-        model2 = self.custom_models[1]['model'].clone()
+        model1 = self.lod_mesh(self.custom_models[0]).clone()
+        model2 = self.lod_mesh(self.custom_models[1]).clone()
         
         # === CONFIGURACIÓN MODELO IZQUIERDO - Orientado hacia el usuario ===
         model1.pos(-0.8, 0, -0.2)   # Posición izquierda, más cerca y ligeramente hacia atrás
@@ -363,13 +536,44 @@ class Pose3DVisualizer:
     
     def show_correct_posture(self):
         """
-        Muestra la ventana 3D con la postura correcta con soporte para múltiples modelos
+        Muestra la ventana 3D con la postura correcta con soporte para múltiples modelos.
+        Se ejecuta en el hilo de render: la primera vez crea la escena y las siguientes solo
+        vuelve a mostrar la ventana. Bloquea hasta que se oculta o el usuario la cierra
+        Returns:
+            bool: True si se pidió terminar el hilo de render ('close')
+        """
+        if self.plotter is None:
+            # Se ejecuta en el hilo de render: esperar aquí no detiene la cámara
+            if not self.wait_until_ready():
+                print("❌ Modelos 3D no disponibles, no se puede mostrar la ventana")
+                return False
+            self._build_scene()
+        else:
+            print("⚡ Reabriendo ventana 3D (escena ya cargada)")
+            self.plotter.window.SetShowWindow(True)
+        
+        # Ajustar orientación inicial y zoom en la visualización (también al reabrir)
+        self.plotter.show(camera=dict(pos=(0, 4.0, 2.0),       # Cámara frontal, más centrada
+                                      focalpoint=(0, 0, 0),      # Punto focal en el centro
+                                      viewup=(0, 0, 1)),         # Vector "arriba"
+                          interactive=False,
+                          zoom=0.8)  # Zoom reducido para ver ambos modelos completos
+        
+        self._pending_command = None
+        self.plotter.interactive()  # Hasta TerminateApp (comando o cierre del usuario)
+        
+        if self.plotter.window is None:
+            # Cerrada con Escape: vedo liberó la ventana, se recrea en la próxima alerta
+            self.plotter = None
+        else:
+            self.plotter.window.SetShowWindow(False)
+        return self._pending_command == 'close'
+    
+    def _build_scene(self):
+        """
+        Crea el plotter, los modelos y los textos una sola vez; quedan residentes para las
+        siguientes alertas
         """
-        if self.is_showing:
-            return
-            
-        self.is_showing = True
-        
         # Obtener modelo(s) actual(es)
         models, current_filename = self.get_current_model()
         
@@ -393,15 +597,13 @@ class Pose3DVisualizer:
             print("⏳ Necesitas 3 segundos continuos de mala postura para reabrir")
             self.manually_closed = True
             self.allow_auto_open = False  # Desactivar apertura automática
-            self.is_showing = False
+            # Con un observador de ExitEvent VTK ya no termina el bucle por su cuenta
+            self.plotter.interactor.TerminateApp()
         
         # Agregar callback de cierre usando el evento correcto
         self.plotter.add_callback('ExitEvent', on_close)
         
         # === TEXTOS INFORMATIVOS ACTUALIZADOS ===
-        # Título principal
-        title = vedo.Text2D("POSTURA CORRECTA ERGONÓMICA", pos="top-center", s=1.4, c='darkred', bold=True)
-        
         # Información del modelo actual
         model_info = [
             vedo.Text2D("📱 Modelos 3D: Postura Correcta y Postura Incorrecta", pos=(0.02, 0.95), s=1.0, c='purple', bold=True),
@@ -437,40 +639,159 @@ class Pose3DVisualizer:
         # Combinar todos los textos
         all_texts = (model_info + instructions + posture_tips + system_info)
         
+        # === ESQUELETO EN VIVO ===
+        live_objects = []
+        if self.live:
+            from live_skeleton import LiveSkeleton, ISSUE_COLORS, BASE_COLOR
+            
+            # A la derecha de la referencia en pantalla (la cámara mira hacia -y: x negativo queda
+            # a la derecha), con las caderas a media altura
+            bounds = np.array([model.bounds() for model in models])
+            origin = (bounds[:, 0].min() - 0.7, 0.0, (bounds[:, 4].min() + bounds[:, 5].max()) / 2)
+            self.live_skeleton = LiveSkeleton(origin=origin)
+            self._drawn_pose = None
+            live_objects = self.live_skeleton.actors()
+            
+            legend_y_start = 0.30
+            all_texts.append(vedo.Text2D("🧍 TU POSTURA (EN VIVO):", pos=(0.72, legend_y_start), s=0.9, c='darkblue', bold=True))
+            all_texts.append(vedo.Text2D("• Correcta", pos=(0.72, legend_y_start - 0.03), s=0.7, c=BASE_COLOR))
+            for i, (issue, color) in enumerate(ISSUE_COLORS.items()):
+                all_texts.append(vedo.Text2D(f"• {issue}", pos=(0.72, legend_y_start - 0.06 - 0.03 * i), s=0.7, c=color))
+        
         # Deshabilitar controles de usuario para cambiar modelos manualmente
         def on_key_press(evt):
             pass  # No se realiza ninguna acción al presionar teclas
         
-        # Agregar todos los elementos
-        all_objects = models + all_texts
-        
         # Mostrar con configuración de teclas
         self.plotter.add_callback('KeyPress', on_key_press)
         
-        # Ajustar orientación inicial y zoom en la visualización
-        self.plotter.show(*all_objects, 
-                         camera=dict(pos=(0, 4.0, 2.0),       # Cámara frontal, más centrada
-                                   focalpoint=(0, 0, 0),      # Punto focal en el centro
-                                   viewup=(0, 0, 1)),         # Vector "arriba"
-                         interactive=True,
-                         zoom=0.8)  # Zoom reducido para ver ambos modelos completos
+        # Agregar todos los elementos (se abre la ventana)
+        self.scene_models = models
+        self.plotter.show(*(models + live_objects + all_texts), interactive=False)
+        self._fit_render_budget()
+        
+        # Revisar la cola de comandos mientras la ventana está visible
+        self.plotter.add_callback('timer', self._on_timer)
+        self.plotter.timer_callback('start', dt=self.COMMAND_POLL_MS)
+        print("🧊 Escena 3D creada (se reutiliza en las siguientes alertas)")
+    
+    def _measure_render_ms(self):
+        """
+        Tiempo de render por frame de la escena actual (mediana, esperando a la GPU)
+        """
+        self.plotter.render()  # Calentamiento: subida de texturas y compilación de shaders
+        times = []
+        for _ in range(self.LOD_PROBE_FRAMES):
+            start = time.perf_counter()
+            self.plotter.render()
+            self.plotter.window.WaitForCompletion()
+            times.append((time.perf_counter() - start) * 1000)
+        return float(np.median(times))
+    
+    def _fit_render_budget(self):
+        """
+        Baja el nivel de detalle de los modelos mostrados hasta que el render quepa en
+        RENDER_BUDGET_MS; el nivel elegido se mantiene para las siguientes alertas
+        """
+        shown = [info for info in self.custom_models[:2] if info.get('levels')]
+        if not shown:
+            return
+        
+        max_level = max(len(info['levels']) for info in shown) - 1
+        while True:
+            render_ms = self._measure_render_ms()
+            if render_ms <= self.RENDER_BUDGET_MS or self.lod_level >= max_level:
+                break
+            
+            # Reemplazar las mallas por las del siguiente nivel
+            self.lod_level += 1
+            self.plotter.remove(*self.scene_models)
+            self.scene_models, _ = self.get_current_model()
+            self.plotter.add(*self.scene_models)
+        
+        triangles = sum(self.current_level(info)['triangles'] or 0 for info in shown)
+        print(f"🪜 Nivel de detalle {self.lod_level} ({triangles:,} triángulos): {render_ms:.1f} ms por frame")
+    
+    def _on_timer(self, evt):
+        """
+        Con la ventana visible (hilo de render): dibuja la pose más reciente y atiende 'hide' o 'close'
+        """
+        pose = self.live_pose
+        if self.live_skeleton is not None and pose is not self._drawn_pose:
+            self._drawn_pose = pose
+            self.live_skeleton.update(*pose)
+            self.plotter.render()
         
+        try:
+            command = self.commands.get_nowait()
+        except queue.Empty:
+            return
+        if command == 'show':
+            return  # Ya está visible
+        self._pending_command = command
+        self.plotter.interactor.TerminateApp()
+    
+    def _render_loop(self):
+        """
+        Hilo de render: dueño de todos los objetos VTK; atiende los comandos de la cola
+        mientras la ventana está oculta
+        """
+        while True:
+            command = self.commands.get()
+            if command == 'close':
+                break
+            if command != 'show':
+                continue  # 'hide' con la ventana ya oculta
+            
+            stop = self.show_correct_posture()
+            self.is_showing = False
+            if stop:
+                break
+        
+        if self.plotter is not None:
+            self.plotter.close()
+            self.plotter = None
         self.is_showing = False
     
+    def _send(self, command):
+        """Envía un comando al hilo de render (lo inicia al primer 'show')"""
+        if self.thread is None or not self.thread.is_alive():
+            if command != 'show':
+                return
+            self.thread = Thread(target=self._render_loop, name="Render3D", daemon=True)
+            self.thread.start()
+        self.commands.put(command)
+    
     def show_in_thread(self):
         """
-        Muestra la visualización 3D en un hilo separado, respetando cierre manual
+        Muestra la ventana 3D desde el hilo de render, respetando cierre manual
         """
-        import time
-        
         # Si fue cerrada manualmente y no se permite apertura automática, no mostrar
         if not self.allow_auto_open:
             return
         
-        if self.thread is None or not self.thread.is_alive():
+        if not self.is_showing:
+            self.is_showing = True
             self.last_show_time = time.time()
-            self.thread = Thread(target=self.show_correct_posture, daemon=True)
-            self.thread.start()
+            self._send('show')
+    
+    def publish_pose(self, world_landmarks, issues=()):
+        """
+        Entrega la pose del frame al esqueleto en vivo; no bloquea ni encola: el hilo de render
+        dibuja solo la más reciente
+        Args:
+            world_landmarks: PostureDetector.last_world_landmarks (None sin pose)
+            issues: Problemas detectados en el frame
+        """
+        if self.live and self.is_showing:
+            self.live_pose = (world_landmarks, tuple(issues))  # Asignación atómica
+    
+    def hide(self):
+        """
+        Oculta la ventana 3D sin destruir la escena
+        """
+        if self.is_showing:
+            self._send('hide')
     
     def allow_reopen(self):
         """
@@ -482,14 +803,15 @@ class Pose3DVisualizer:
     
     def close(self):
         """
-        Cierra la ventana 3D programáticamente
+        Cierra la ventana 3D y termina el hilo de render
         """
-        if self.plotter is not None:
-            self.plotter.close()
+        if self.thread is not None and self.thread.is_alive():
+            self._send('close')
+            self.thread.join(timeout=3.0)
         self.is_showing = False
     
     def is_open(self):
         """
-        Verifica si la ventana 3D está abierta
+        Verifica si la ventana 3D está abierta (o abriéndose)
         """
         return self.is_showing
@@ -0,0 +1,189 @@
+"""
+Cálculo vectorizado de métricas de postura
+Extrae los puntos clave una sola vez por frame y calcula todas las mediciones en una pasada de NumPy
+"""
+
+import numpy as np
+
+# === PUNTOS CLAVE ===
+# Orden de las filas del arreglo de puntos clave (7, 3)
+KEY_POINT_NAMES = ('nose', 'left_ear', 'right_ear', 'left_shoulder', 'right_shoulder', 'left_hip', 'right_hip')
+NOSE, LEFT_EAR, RIGHT_EAR, LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP, RIGHT_HIP = range(len(KEY_POINT_NAMES))
+
+# Índices de esos puntos dentro de los 33 landmarks de MediaPipe Pose (PoseLandmark)
+KEY_POINT_INDICES = np.array([0, 7, 8, 11, 12, 23, 24])
+NUM_LANDMARKS = 33
+
+# === MÉTRICAS ===
+# Las cinco mediciones de calculate_posture_measurements
+MEASUREMENT_NAMES = ('head_forward_distance', 'shoulder_height_diff', 'neck_angle',
+                     'spine_angle', 'shoulder_elevation_angle')
+# Métricas auxiliares usadas por los analizadores de inclinación y elevación
+AUXILIARY_METRIC_NAMES = ('shoulder_hip_distance', 'head_tilt', 'forward_lean')
+METRIC_NAMES = MEASUREMENT_NAMES + AUXILIARY_METRIC_NAMES
+METRIC_INDEX = {name: i for i, name in enumerate(METRIC_NAMES)}
+
+
+def landmarks_to_array(landmarks):
+    """
+    Convierte los landmarks de MediaPipe a un arreglo (33, 4) con x, y, z y visibilidad
+    """
+    return np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks], dtype=np.float64)
+
+
+def _angle_to_axis(vectors, axis):
+    """
+    Ángulo en grados entre cada vector 2D (..., 2) y un eje unitario
+    """
+    norms = np.linalg.norm(vectors, axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cosine = (vectors[..., 0] * axis[0] + vectors[..., 1] * axis[1]) / norms
+    return np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+
+
+def compute_metrics(points):
+    """
+    Calcula todas las métricas de postura para uno o varios conjuntos de puntos clave
+    Args:
+        points: Arreglo (..., 7, 3) en el orden de KEY_POINT_NAMES
+    Returns:
+        Arreglo (..., len(METRIC_NAMES)) en el orden de METRIC_NAMES
+    """
+    points = np.asarray(points, dtype=np.float64)
+
+    nose = points[..., NOSE, :]
+    ear_mid = (points[..., LEFT_EAR, :] + points[..., RIGHT_EAR, :]) / 2
+    shoulder_mid = (points[..., LEFT_SHOULDER, :] + points[..., RIGHT_SHOULDER, :]) / 2
+    hip_mid = (points[..., LEFT_HIP, :] + points[..., RIGHT_HIP, :]) / 2
+
+    metrics = np.empty(points.shape[:-2] + (len(METRIC_NAMES),))
+
+    # 1. Distancia de cabeza adelantada (coordenadas Z)
+    metrics[..., 0] = np.abs(nose[..., 2] - shoulder_mid[..., 2])
+
+    # 2. Diferencia de altura entre hombros
+    metrics[..., 1] = np.abs(points[..., LEFT_SHOULDER, 1] - points[..., RIGHT_SHOULDER, 1])
+
+    # 3. Ángulo del cuello: línea oreja-hombro contra la vertical (hacia arriba)
+    vertical = (0.0, -1.0)
+    metrics[..., 2] = _angle_to_axis(ear_mid[..., :2] - shoulder_mid[..., :2], vertical)
+
+    # 4. Ángulo de la columna: caderas a hombros contra la vertical
+    metrics[..., 3] = _angle_to_axis(shoulder_mid[..., :2] - hip_mid[..., :2], vertical)
+
+    # 5. Ángulo de elevación de hombros contra la horizontal
+    shoulder_vector = points[..., RIGHT_SHOULDER, :2] - points[..., LEFT_SHOULDER, :2]
+    metrics[..., 4] = _angle_to_axis(shoulder_vector, (1.0, 0.0))
+
+    # Auxiliares: distancia vertical hombro-cadera, caída de la cabeza e inclinación frontal
+    metrics[..., 5] = np.abs(hip_mid[..., 1] - shoulder_mid[..., 1])
+    metrics[..., 6] = nose[..., 1] - ear_mid[..., 1]
+    metrics[..., 7] = hip_mid[..., 2] - shoulder_mid[..., 2]
+
+    return metrics
+
+
+class FrameAnalysis:
+    """
+    Contexto de análisis de un frame: puntos clave y métricas se calculan una sola vez
+    y todos los analizadores leen de aquí
+    """
+
+    __slots__ = ('landmarks', 'points', 'metrics')
+
+    def __init__(self, landmarks):
+        """
+        Args:
+            landmarks: Arreglo (33, 4) de landmarks (x, y, z, visibilidad)
+        """
+        self.landmarks = landmarks
+        self.points = landmarks[..., KEY_POINT_INDICES, :3]
+        self.metrics = compute_metrics(self.points)
+
+    def __getitem__(self, name):
+        """Valor de una métrica por nombre"""
+        return self.metrics[..., METRIC_INDEX[name]]
+
+    def measurements(self):
+        """
+        Retorna las cinco mediciones de postura como diccionario
+        """
+        return {name: float(self.metrics[i]) for i, name in enumerate(MEASUREMENT_NAMES)}
+
+
+class CalibrationBaseline:
+    """
+    Referencia de postura correcta calculada una sola vez al completar la calibración.
+    Inmutable y respaldada por arreglos: media, desviación estándar y umbral adaptativo por métrica.
+    """
+
+    __slots__ = ('mean', 'std', 'thresholds', 'frame_count')
+
+    def __init__(self, mean, std, frame_count, std_multiplier=2.5, base_tolerance=1.3):
+        """
+        Args:
+            mean, std: Arreglos (len(METRIC_NAMES),) en el orden de METRIC_NAMES
+            frame_count: Número de frames usados en la calibración
+            std_multiplier: Desviaciones estándar toleradas sobre la media
+            base_tolerance: Factor adicional de tolerancia
+        """
+        mean = np.array(mean, dtype=np.float64)
+        std = np.array(std, dtype=np.float64)
+        thresholds = (np.abs(mean) + std_multiplier * std) * base_tolerance
+
+        for array in (mean, std, thresholds):
+            array.setflags(write=False)
+
+        object.__setattr__(self, 'mean', mean)
+        object.__setattr__(self, 'std', std)
+        object.__setattr__(self, 'thresholds', thresholds)
+        object.__setattr__(self, 'frame_count', int(frame_count))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CalibrationBaseline es inmutable")
+
+    @classmethod
+    def from_points(cls, points, **kwargs):
+        """
+        Calcula la referencia a partir de los puntos clave de calibración
+        Args:
+            points: Arreglo (N, 7, 3) con los puntos clave de cada frame de calibración
+        """
+        metrics = compute_metrics(points)
+        return cls(metrics.mean(axis=0), metrics.std(axis=0), len(metrics), **kwargs)
+
+    @classmethod
+    def from_landmarks(cls, landmarks, **kwargs):
+        """
+        Calcula la referencia a partir de landmarks completos de calibración
+        Args:
+            landmarks: Arreglo (N, 33, 4) con los landmarks de cada frame de calibración
+        """
+        return cls.from_points(np.asarray(landmarks)[:, KEY_POINT_INDICES, :3], **kwargs)
+
+    def __getitem__(self, name):
+        """Media de calibración de una métrica"""
+        return self.mean[METRIC_INDEX[name]]
+
+    def std_of(self, name):
+        """Desviación estándar de calibración de una métrica"""
+        return self.std[METRIC_INDEX[name]]
+
+    def threshold(self, name):
+        """Umbral adaptativo de una métrica"""
+        return self.thresholds[METRIC_INDEX[name]]
+
+    def to_dict(self):
+        """Representación serializable (JSON) de la referencia"""
+        return {
+            'frame_count': self.frame_count,
+            'mean': {name: float(self.mean[i]) for i, name in enumerate(METRIC_NAMES)},
+            'std': {name: float(self.std[i]) for i, name in enumerate(METRIC_NAMES)}
+        }
+
+    @classmethod
+    def from_dict(cls, data, **kwargs):
+        """Reconstruye la referencia desde to_dict()"""
+        mean = [data['mean'][name] for name in METRIC_NAMES]
+        std = [data['std'][name] for name in METRIC_NAMES]
+        return cls(mean, std, data['frame_count'], **kwargs)
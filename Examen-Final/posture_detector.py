@@ -4,43 +4,123 @@ Analiza la postura del usuario y determina si es correcta o incorrecta
 """
 
 import cv2
-import mediapipe as mp
 import numpy as np
 import math
+import time
+from collections import deque
+from inference_scheduler import InferenceScheduler
+from roi_tracker import RoiTracker
+from ring_buffer import RingBuffer
+from profiler import StageProfiler
+from posture_analysis import (FrameAnalysis, CalibrationBaseline, landmarks_to_array, compute_metrics,
+                              KEY_POINT_INDICES, KEY_POINT_NAMES, MEASUREMENT_NAMES, NUM_LANDMARKS)
+
+try:
+    import mediapipe as mp
+except ImportError:  # Permite reproducir sesiones grabadas sin MediaPipe instalado
+    mp = None
+
+# === PERFILES DEL MODELO ===
+MODEL_PROFILES = {
+    'lite': {'model_complexity': 0, 'min_detection_confidence': 0.5, 'min_tracking_confidence': 0.5},
+    'full': {'model_complexity': 1, 'min_detection_confidence': 0.5, 'min_tracking_confidence': 0.5},
+    'heavy': {'model_complexity': 2, 'min_detection_confidence': 0.5, 'min_tracking_confidence': 0.5}
+}
+PROFILE_ORDER = ('lite', 'full', 'heavy')  # De más rápido a más preciso
 
 class PostureDetector:
-    def __init__(self):
+    def __init__(self, enable_inference=True, profile='full', target_fps=15.0):
         """
         Inicializa el detector de postura usando MediaPipe Pose
+        Args:
+            enable_inference: Si es False no se crea el grafo de MediaPipe y solo se usa la
+                              etapa de análisis (analyze_landmarks / evaluate_batch), p. ej. al
+                              reproducir sesiones grabadas
+            profile: Perfil del modelo ('lite', 'full', 'heavy') o 'auto' para elegir el más
+                     preciso que cumpla target_fps
+            target_fps: Tasa de inferencia objetivo del modo automático
         """
-        self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(
-            static_image_mode=False,
-            model_complexity=1,
-            enable_segmentation=False,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
-        self.mp_drawing = mp.solutions.drawing_utils
+        if profile != 'auto' and profile not in MODEL_PROFILES:
+            raise ValueError(f"Perfil desconocido: {profile}")
+        
+        self.pose = None
+        self.mp_pose = None
+        self.mp_drawing = None
+        
+        # === SELECCIÓN DE PERFIL ===
+        # En modo automático se sondea durante la calibración desde el perfil más preciso hacia
+        # abajo, y en ejecución se baja de perfil si la latencia sostenida excede el presupuesto
+        self.profile_mode = profile
+        self.profile = PROFILE_ORDER[-1] if profile == 'auto' else profile
+        self.profile_probing = profile == 'auto'
+        self.TARGET_FPS = target_fps
+        self.inference_times = deque(maxlen=30)  # Latencias recientes de MediaPipe (segundos)
+        self.inferences_since_switch = 0
+        self.WARMUP_INFERENCES = 3  # Las primeras inferencias de un grafo nuevo son más lentas
+        self.PROBE_INFERENCES = 10  # Inferencias medidas para aceptar un perfil en calibración
+        self.LATENCY_TOLERANCE = 1.2  # Margen sobre el presupuesto antes de bajar en ejecución
+        
+        if enable_inference:
+            if mp is None:
+                raise ImportError("MediaPipe no está instalado; use enable_inference=False para reproducir sesiones")
+            self.mp_pose = mp.solutions.pose
+            self.mp_drawing = mp.solutions.drawing_utils
+            self.load_profile(self.profile)
+        
+        # Landmarks (33, 4) y mediciones (5,) del último frame procesado, None si no hubo pose
+        self.last_landmarks = None
+        self.last_measurements = None
+        # Landmarks de mundo (33, 4) de la última inferencia: metros, origen entre las caderas
+        self.last_world_landmarks = None
+        self.draw_pose = True  # Dibujar el esqueleto sobre la imagen (desactivado sin interfaz)
+        self.profiler = StageProfiler()  # Latencia por etapa (el sistema principal asigna el suyo)
+        
+        # === INFERENCIA ADAPTATIVA ===
+        # Con postura estable se infiere a menor tasa y resolución; los frames omitidos
+        # reutilizan el último resultado
+        self.adaptive_inference = True
+        self.scheduler = InferenceScheduler()
+        self.last_inferred = False  # Si el último frame pasó por MediaPipe
+        self.last_pose_landmarks = None  # Landmarks de MediaPipe para redibujar en frames omitidos
+        self.last_pose_box = None  # Recorte al que son relativos last_pose_landmarks
+        self.last_result = (False, [], {'calibrating': True, 'progress': 0, 'complete': False})
+        
+        # === REGIÓN DE INTERÉS ===
+        # Se infiere solo sobre la parte superior del cuerpo encontrada en el frame anterior
+        self.roi_tracking = True
+        self.roi_tracker = RoiTracker()
         
         # === SISTEMA DE CALIBRACIÓN ===
         self.is_calibrated = False
-        self.calibration_data = None
-        self.calibration_frames = []
-        self.calibration_frame_count = 0
+        self.baseline = None  # CalibrationBaseline, inmutable una vez calculada
         self.CALIBRATION_FRAMES_NEEDED = 90  # 3 segundos a 30 FPS para mejor calibración
+        self.calibration_frames = self.new_calibration_buffer()
+        self.calibration_frame_count = 0
+        
+        # === ANALIZADORES (en orden de reporte) ===
+        self.posture_checks = [
+            ("Cabeza muy adelantada", self.analyze_head_position),
+            ("Cabeza inclinada hacia abajo", self.analyze_head_tilt_down),
+            ("Hombros desalineados/elevados", self.analyze_shoulder_alignment),
+            ("Columna encorvada", self.analyze_spine_curvature),
+            ("Hombros muy levantados", self.analyze_shoulder_elevation),
+            ("Cuerpo inclinado hacia adelante", self.analyze_forward_lean)
+        ]
         
         # === FILTRADO TEMPORAL MÁS TOLERANTE ===
-        self.posture_history = []
-        self.HISTORY_SIZE = 8  # Más frames para suavizar
+        # Ventana en segundos reales: no depende de la tasa de inferencia
+        self.posture_history = RingBuffer(256, dtype=bool)  # (timestamp, mala postura) dentro de la ventana
+        self.NOMINAL_FPS = 30.0  # Tasa asumida cuando no hay marcas de tiempo
+        self.HISTORY_SECONDS = 0.25  # ~8 frames a 30 FPS
+        # Veredictos mínimos en la ventana y para empezar a suavizar: en modo estable (5 Hz) la
+        # ventana se extiende a las últimas 8 inferencias y un veredicto aislado no cambia el resultado
+        self.MIN_HISTORY_SAMPLES = 8
         self.BAD_POSTURE_THRESHOLD = 0.6  # Más tolerante (60% en lugar de 40%)
         
         # === UMBRALES ADAPTATIVOS RELAJADOS ===
-        self.head_forward_threshold = 0.08  # Menos estricto
-        self.shoulder_height_threshold = 0.04  # Menos estricto
-        self.shoulder_elevation_threshold = 15  # Menos estricto
-        self.spine_angle_threshold = 20  # Menos estricto
-        self.neck_angle_threshold = 25  # Menos estricto
+        # Se calculan una sola vez al completar la calibración (ver CalibrationBaseline)
+        self.STD_MULTIPLIER = 2.5  # Más tolerante que antes (era 1.5)
+        self.BASE_TOLERANCE = 1.3  # Factor adicional para mayor tolerancia
         
     def calculate_angle(self, point1, point2, point3):
         """
@@ -61,206 +141,423 @@ class PostureDetector:
         
         return np.degrees(angle)
     
-    def analyze_head_position(self, landmarks):
+    def analyze_head_position(self, frame, baseline=None):
         """
         Analiza si la cabeza está muy adelantada usando coordenadas Z y ángulo del cuello
         Más tolerante con valores de calibración
+        Args:
+            frame: FrameAnalysis con las métricas de uno o varios frames
+            baseline: CalibrationBaseline a usar (por defecto la calibración actual)
+        Returns:
+            bool, o arreglo de bool si frame contiene varios frames
         """
-        if not self.is_calibrated:
+        baseline = self.baseline if baseline is None else baseline
+        if baseline is None:
             return False
         
-        points = self.extract_key_points(landmarks)
-        measurements = self.calculate_posture_measurements(points)
-        
         # Comparar con valores de calibración de manera más tolerante
-        head_forward_distance = measurements['head_forward_distance']
-        neck_angle = abs(measurements['neck_angle'])
+        head_forward_distance = frame['head_forward_distance']
+        neck_angle = np.abs(frame['neck_angle'])
         
         # Usar los valores de calibración como referencia base
-        calibrated_head_distance = self.calibration_data['head_forward_distance']
-        calibrated_neck_angle = abs(self.calibration_data['neck_angle'])
+        calibrated_head_distance = baseline['head_forward_distance']
+        calibrated_neck_angle = abs(baseline['neck_angle'])
         
         # Detectar cabeza adelantada solo si excede significativamente los valores calibrados
-        head_forward_exceeded = head_forward_distance > (calibrated_head_distance + self.head_forward_threshold)
-        neck_angle_exceeded = neck_angle > (calibrated_neck_angle + self.neck_angle_threshold)
+        head_forward_exceeded = head_forward_distance > (calibrated_head_distance + baseline.threshold('head_forward_distance'))
+        neck_angle_exceeded = neck_angle > (calibrated_neck_angle + baseline.threshold('neck_angle'))
         
         # Solo reportar problema si ambos indicadores están mal O uno está muy mal
-        is_head_forward = (head_forward_exceeded and neck_angle_exceeded) or \
-                         (head_forward_distance > calibrated_head_distance * 2.0) or \
+        is_head_forward = (head_forward_exceeded & neck_angle_exceeded) | \
+                         (head_forward_distance > calibrated_head_distance * 2.0) | \
                          (neck_angle > calibrated_neck_angle * 2.0)
         
         return is_head_forward
     
-    def analyze_shoulder_alignment(self, landmarks):
+    def analyze_shoulder_alignment(self, frame, baseline=None):
         """
         Analiza desalineación de hombros (altura) y elevación excesiva
         Más tolerante con valores de calibración
         """
-        if not self.is_calibrated:
+        baseline = self.baseline if baseline is None else baseline
+        if baseline is None:
             return False
         
-        points = self.extract_key_points(landmarks)
-        measurements = self.calculate_posture_measurements(points)
-        
         # Usar valores de calibración como referencia
-        height_diff = measurements['shoulder_height_diff']
-        calibrated_height_diff = self.calibration_data['shoulder_height_diff']
+        height_diff = frame['shoulder_height_diff']
+        calibrated_height_diff = baseline['shoulder_height_diff']
         
         # Solo reportar problema si la diferencia es significativamente mayor que en calibración
-        is_height_misaligned = height_diff > (calibrated_height_diff + self.shoulder_height_threshold)
+        is_height_misaligned = height_diff > (calibrated_height_diff + baseline.threshold('shoulder_height_diff'))
         
         # Verificar elevación excesiva (hombros muy levantados)
-        elevation_angle = abs(measurements['shoulder_elevation_angle'])
-        calibrated_elevation = abs(self.calibration_data['shoulder_elevation_angle'])
+        elevation_angle = np.abs(frame['shoulder_elevation_angle'])
+        calibrated_elevation = abs(baseline['shoulder_elevation_angle'])
         
         # Solo reportar si la elevación excede significativamente la calibración
-        is_elevated = elevation_angle > (calibrated_elevation + self.shoulder_elevation_threshold)
+        is_elevated = elevation_angle > (calibrated_elevation + baseline.threshold('shoulder_elevation_angle'))
         
         # Ambos problemas deben ser evidentes para reportar
-        return is_height_misaligned and is_elevated
+        return is_height_misaligned & is_elevated
     
-    def analyze_spine_curvature(self, landmarks):
+    def analyze_spine_curvature(self, frame, baseline=None):
         """
         Analiza la curvatura excesiva de la columna
         Más tolerante con valores de calibración
         """
-        if not self.is_calibrated:
+        baseline = self.baseline if baseline is None else baseline
+        if baseline is None:
             return False
         
-        points = self.extract_key_points(landmarks)
-        measurements = self.calculate_posture_measurements(points)
-        
         # Usar valor de calibración como referencia
-        spine_angle = abs(measurements['spine_angle'])
-        calibrated_spine_angle = abs(self.calibration_data['spine_angle'])
+        spine_angle = np.abs(frame['spine_angle'])
+        calibrated_spine_angle = abs(baseline['spine_angle'])
         
         # Solo reportar si el ángulo excede significativamente el valor calibrado
-        is_spine_curved = spine_angle > (calibrated_spine_angle + self.spine_angle_threshold)
+        is_spine_curved = spine_angle > (calibrated_spine_angle + baseline.threshold('spine_angle'))
         
         return is_spine_curved
     
-    def analyze_shoulder_elevation(self, landmarks):
+    def analyze_shoulder_elevation(self, frame, baseline=None):
         """
         Analiza específicamente si los hombros están muy levantados
         """
-        if not self.is_calibrated:
+        baseline = self.baseline if baseline is None else baseline
+        if baseline is None:
             return False
         
-        points = self.extract_key_points(landmarks)
-        
-        # Calcular altura de hombros relativa a las caderas
-        shoulder_mid_y = (points['left_shoulder'][1] + points['right_shoulder'][1]) / 2
-        hip_mid_y = (points['left_hip'][1] + points['right_hip'][1]) / 2
-        
-        # En calibración, calcular la distancia normal hombro-cadera
-        calibration_shoulder_hip_distance = None
-        if hasattr(self, 'calibration_data') and self.calibration_data:
-            # Calcular distancia promedio durante calibración
-            distances = []
-            for frame in self.calibration_frames:
-                frame_shoulder_y = (frame['left_shoulder'][1] + frame['right_shoulder'][1]) / 2
-                frame_hip_y = (frame['left_hip'][1] + frame['right_hip'][1]) / 2
-                distances.append(abs(frame_hip_y - frame_shoulder_y))
-            calibration_shoulder_hip_distance = np.mean(distances)
-        
-        # Comparar distancia actual vs calibración
-        current_distance = abs(hip_mid_y - shoulder_mid_y)
-        
-        if calibration_shoulder_hip_distance:
-            # Si la distancia es significativamente menor, los hombros están levantados
-            distance_reduction = calibration_shoulder_hip_distance - current_distance
-            threshold = calibration_shoulder_hip_distance * 0.15  # 15% de reducción
-            return distance_reduction > threshold
-        
-        return False
+        # Distancia normal hombro-cadera durante la calibración
+        calibration_shoulder_hip_distance = baseline['shoulder_hip_distance']
+        
+        # Si la distancia actual es significativamente menor, los hombros están levantados
+        distance_reduction = calibration_shoulder_hip_distance - frame['shoulder_hip_distance']
+        threshold = calibration_shoulder_hip_distance * 0.15  # 15% de reducción
+        return distance_reduction > threshold
     
-    def detect_posture(self, image):
+    def detect_posture(self, image, timestamp=None):
         """
         Detecta la postura en una imagen con sistema de calibración y filtrado temporal
         Args:
             image: Imagen de OpenCV (BGR)
+            timestamp: Marca de tiempo de captura (por defecto, el reloj actual)
         Returns:
             tuple: (image_with_pose, is_bad_posture, posture_issues, calibration_status)
         """
+        timestamp = time.time() if timestamp is None else timestamp
+        
+        # Postura estable: reutilizar el último resultado sin pasar por MediaPipe
+        if self.adaptive_inference and self.is_calibrated and not self.scheduler.should_infer(timestamp):
+            self.scheduler.skip()
+            self.last_inferred = False
+            if self.draw_pose and self.last_pose_landmarks is not None:
+                self.draw_pose_landmarks(image, self.last_pose_landmarks, self.last_pose_box)
+            is_bad_posture, posture_issues, calibration_status = self.last_result
+            return image, is_bad_posture, posture_issues, calibration_status
+        
+        # Recortar la región de interés del frame anterior (frame completo sin seguimiento)
+        if self.roi_tracking:
+            roi_image, box = self.roi_tracker.crop(image)
+        else:
+            roi_image, box = image, None
+        
+        # Reducir la imagen en modo estable (los landmarks son normalizados, no cambian de escala)
+        scale = self.scheduler.scale if self.adaptive_inference else 1.0
+        if scale == 1.0:
+            small_image = roi_image
+        else:
+            with self.profiler.stage('resize'):
+                small_image = cv2.resize(roi_image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        
         # Convertir BGR a RGB
-        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        with self.profiler.stage('bgr2rgb'):
+            rgb_image = cv2.cvtColor(small_image, cv2.COLOR_BGR2RGB)
         
         # Procesar con MediaPipe
+        inference_start = time.perf_counter()
         results = self.pose.process(rgb_image)
+        inference_time = time.perf_counter() - inference_start
+        self.profiler.record('pose.process', inference_time)
+        self.record_inference_time(inference_time)
+        self.last_inferred = True
+        self.last_pose_landmarks = results.pose_landmarks
+        self.last_pose_box = box
+        # No dependen del recorte: MediaPipe los estima en metros respecto a las caderas
+        world_landmarks = getattr(results, 'pose_world_landmarks', None)
+        self.last_world_landmarks = landmarks_to_array(world_landmarks.landmark) if world_landmarks else None
         
         # Dibujar pose en la imagen
         if results.pose_landmarks:
-            self.mp_drawing.draw_landmarks(
-                image, results.pose_landmarks, self.mp_pose.POSE_CONNECTIONS)
+            if self.draw_pose:
+                self.draw_pose_landmarks(image, results.pose_landmarks, box)
+            # Landmarks en coordenadas normalizadas del frame completo
+            landmarks = self.roi_tracker.to_frame(landmarks_to_array(results.pose_landmarks.landmark),
+                                                  box, image.shape)
+        else:
+            landmarks = None
+        
+        # Región para el siguiente frame; sin pose se vuelve al frame completo
+        if self.roi_tracking:
+            self.roi_tracker.update(landmarks, image.shape)
+        
+        with self.profiler.stage('analysis'):
+            is_bad_posture, posture_issues, calibration_status = self.analyze_landmarks(landmarks, timestamp)
+        self.last_result = (is_bad_posture, posture_issues, calibration_status)
+        
+        # Sin análisis (sin pose o calibrando) el planificador vuelve a tasa completa
+        verdict = None if calibration_status['calibrating'] else (is_bad_posture, tuple(posture_issues))
+        self.scheduler.update(timestamp, landmarks, verdict)
+        
+        return image, is_bad_posture, posture_issues, calibration_status
+    
+    def load_profile(self, profile):
+        """
+        Crea el grafo de MediaPipe con la configuración del perfil
+        Args:
+            profile: Nombre del perfil en MODEL_PROFILES
+        """
+        if self.pose is not None:
+            self.pose.close()
+        
+        self.pose = self.mp_pose.Pose(
+            static_image_mode=False,
+            enable_segmentation=False,
+            **MODEL_PROFILES[profile]
+        )
+        self.profile = profile
+        self.inference_times.clear()
+        self.inferences_since_switch = 0
+    
+    def record_inference_time(self, elapsed):
+        """
+        Registra la latencia de una inferencia y revisa el presupuesto en modo automático
+        Args:
+            elapsed: Segundos que tardó pose.process
+        """
+        self.inferences_since_switch += 1
+        if self.inferences_since_switch <= self.WARMUP_INFERENCES:
+            return
+        
+        self.inference_times.append(elapsed)
+        if self.profile_mode == 'auto':
+            self.check_latency_budget()
+    
+    def check_latency_budget(self):
+        """
+        Modo automático: durante la calibración acepta el perfil actual si su mediana cumple
+        TARGET_FPS o baja al siguiente y recalibra; en ejecución baja de perfil si la mediana
+        de la ventana completa excede el presupuesto con LATENCY_TOLERANCE
+        """
+        budget = 1.0 / self.TARGET_FPS
+        
+        if self.profile_probing:
+            if len(self.inference_times) < self.PROBE_INFERENCES:
+                return
             
-            landmarks = results.pose_landmarks.landmark
+            latency = float(np.median(self.inference_times))
+            if latency <= budget or self.profile == PROFILE_ORDER[0]:
+                self.profile_probing = False
+                print(f"⚙️  Perfil del modelo: {self.profile} ({latency * 1000:.0f} ms por inferencia)")
+                return
             
-            # Si no está calibrado, continuar con calibración
+            self.downgrade_profile(latency)
+            # La referencia debe calcularse con el mismo modelo que se usará después
             if not self.is_calibrated:
-                calibration_complete = self.add_calibration_frame(landmarks)
-                progress = (self.calibration_frame_count / self.CALIBRATION_FRAMES_NEEDED) * 100
-                return image, False, [], {'calibrating': True, 'progress': progress, 'complete': calibration_complete}
-            
-            # Análisis de postura con nuevos métodos mejorados
-            posture_issues = []
-            
-            # Verificar diferentes aspectos de la postura
-            if self.analyze_head_position(landmarks):
-                posture_issues.append("Cabeza muy adelantada")
-            
-            if self.analyze_head_tilt_down(landmarks):
-                posture_issues.append("Cabeza inclinada hacia abajo")
-            
-            if self.analyze_shoulder_alignment(landmarks):
-                posture_issues.append("Hombros desalineados/elevados")
-            
-            if self.analyze_spine_curvature(landmarks):
-                posture_issues.append("Columna encorvada")
-            
-            if self.analyze_shoulder_elevation(landmarks):
-                posture_issues.append("Hombros muy levantados")
-            
-            if self.analyze_forward_lean(landmarks):
-                posture_issues.append("Cuerpo inclinado hacia adelante")
-            
-            # Aplicar filtrado temporal
-            current_bad_posture = len(posture_issues) > 0
-            self.posture_history.append(current_bad_posture)
-            
-            # Mantener historial de tamaño fijo
-            if len(self.posture_history) > self.HISTORY_SIZE:
-                self.posture_history.pop(0)
-            
-            # Determinar postura final basada en historial
-            if len(self.posture_history) >= self.HISTORY_SIZE:
-                bad_posture_ratio = sum(self.posture_history) / len(self.posture_history)
-                final_bad_posture = bad_posture_ratio >= self.BAD_POSTURE_THRESHOLD
-            else:
-                # Si no hay suficiente historial, usar detección actual
-                final_bad_posture = current_bad_posture
-            
-            return image, final_bad_posture, posture_issues, {'calibrating': False, 'progress': 100, 'complete': True}
+                self.start_calibration()
+            return
+        
+        if len(self.inference_times) < self.inference_times.maxlen or self.profile == PROFILE_ORDER[0]:
+            return
+        
+        latency = float(np.median(self.inference_times))
+        if latency > budget * self.LATENCY_TOLERANCE:
+            self.downgrade_profile(latency)
+    
+    def downgrade_profile(self, latency):
+        """
+        Cambia al siguiente perfil más rápido
+        Args:
+            latency: Latencia mediana medida con el perfil actual (segundos)
+        """
+        lower = PROFILE_ORDER[PROFILE_ORDER.index(self.profile) - 1]
+        print(f"⚠️  Perfil {self.profile} demasiado lento ({latency * 1000:.0f} ms > "
+              f"{1000 / self.TARGET_FPS:.0f} ms por inferencia), cambiando a {lower}")
+        
+        self.load_profile(lower)
+        self.scheduler.reset()
+        self.roi_tracker.reset()
+    
+    def draw_pose_landmarks(self, image, pose_landmarks, box=None):
+        """
+        Dibuja el esqueleto de MediaPipe sobre la imagen
+        Args:
+            pose_landmarks: Landmarks de MediaPipe, relativos a la caja si se infirió sobre un recorte
+            box: Caja (x0, y0, x1, y1) del recorte, o None para el frame completo
+        """
+        if box is not None:
+            x0, y0, x1, y1 = box
+            image = image[y0:y1, x0:x1]  # Vista: se dibuja en sitio sobre la imagen completa
+        with self.profiler.stage('draw_landmarks'):
+            self.mp_drawing.draw_landmarks(image, pose_landmarks, self.mp_pose.POSE_CONNECTIONS)
+    
+    def analyze_landmarks(self, landmarks, timestamp=None):
+        """
+        Etapa de análisis: calibración, analizadores y filtrado temporal sobre landmarks ya detectados
+        Args:
+            landmarks: Arreglo (33, 4) con x, y, z y visibilidad, o None si no se detectó pose
+            timestamp: Marca de tiempo del frame (por defecto, el reloj actual)
+        Returns:
+            tuple: (is_bad_posture, posture_issues, calibration_status)
+        """
+        self.last_landmarks = landmarks
         
         # Si no se detecta pose
-        return image, False, [], {'calibrating': not self.is_calibrated, 'progress': 0, 'complete': False}
+        if landmarks is None:
+            self.last_measurements = None
+            return False, [], {'calibrating': not self.is_calibrated, 'progress': 0, 'complete': False}
+        
+        # Contexto del frame: puntos clave y métricas se calculan una sola vez
+        frame = FrameAnalysis(landmarks)
+        self.last_measurements = frame.metrics[:len(MEASUREMENT_NAMES)]
+        
+        # Si no está calibrado, continuar con calibración
+        if not self.is_calibrated:
+            calibration_complete = self.add_calibration_frame(frame)
+            progress = (self.calibration_frame_count / self.CALIBRATION_FRAMES_NEEDED) * 100
+            return False, [], {'calibrating': True, 'progress': progress, 'complete': calibration_complete}
+        
+        # Análisis de postura: verificar diferentes aspectos de la postura
+        posture_issues = [issue for issue, check in self.posture_checks if check(frame)]
+        
+        # Aplicar filtrado temporal
+        timestamp = time.time() if timestamp is None else timestamp
+        current_bad_posture = len(posture_issues) > 0
+        self.posture_history.append(timestamp, current_bad_posture)
+        
+        # Mantener solo los frames dentro de la ventana de tiempo (y al menos MIN_HISTORY_SAMPLES)
+        self.posture_history.expire(timestamp, self.HISTORY_SECONDS, keep=self.MIN_HISTORY_SAMPLES)
+        
+        # Determinar postura final basada en historial (proporción acumulada, O(1))
+        if len(self.posture_history) >= self.MIN_HISTORY_SAMPLES:
+            bad_posture_ratio = self.posture_history.mean()
+            final_bad_posture = bad_posture_ratio >= self.BAD_POSTURE_THRESHOLD
+        else:
+            # Si no hay suficiente historial, usar detección actual
+            final_bad_posture = current_bad_posture
+        
+        return final_bad_posture, posture_issues, {'calibrating': False, 'progress': 100, 'complete': True}
+    
+    def evaluate_batch(self, landmarks, baseline=None, timestamps=None):
+        """
+        Evalúa secuencias completas de landmarks de forma vectorizada (sin MediaPipe ni bucles por frame)
+        Args:
+            landmarks: Arreglo (N, 33, 4) con x, y, z y visibilidad por frame.
+                       Los frames sin pose se marcan con NaN y, como en vivo, no entran al historial
+            baseline: CalibrationBaseline a usar (por defecto la calibración actual)
+            timestamps: Arreglo (N,) de marcas de tiempo (por defecto, NOMINAL_FPS constantes)
+        Returns:
+            dict: measurements (N, 5), issues (N, 6) bool, bad_posture (N,) bool,
+                  smoothed_bad_posture (N,) bool y los nombres de columnas
+        """
+        baseline = self.baseline if baseline is None else baseline
+        if baseline is None:
+            raise ValueError("Se requiere una calibración para evaluar en lote")
+        
+        landmarks = np.asarray(landmarks, dtype=np.float64)
+        if landmarks.ndim != 3 or landmarks.shape[1:] != (NUM_LANDMARKS, 4):
+            raise ValueError(f"Se esperaba un arreglo (N, {NUM_LANDMARKS}, 4), recibido {landmarks.shape}")
+        
+        frames = FrameAnalysis(landmarks)
+        has_pose = ~np.isnan(frames.points).any(axis=(1, 2))
+        
+        # Cada analizador opera sobre todos los frames a la vez
+        issues = np.column_stack([np.broadcast_to(check(frames, baseline), has_pose.shape)
+                                  for _, check in self.posture_checks])
+        issues &= has_pose[:, None]
+        bad_posture = issues.any(axis=1)
+        
+        if timestamps is None:
+            timestamps = np.arange(len(landmarks)) / self.NOMINAL_FPS
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        
+        # Filtrado temporal solo sobre los frames con pose, igual que en vivo
+        smoothed_bad_posture = np.zeros_like(bad_posture)
+        smoothed_bad_posture[has_pose] = self.smooth_bad_posture(bad_posture[has_pose], timestamps[has_pose])
+        
+        return {
+            'measurement_names': MEASUREMENT_NAMES,
+            'measurements': frames.metrics[:, :len(MEASUREMENT_NAMES)],
+            'issue_names': [issue for issue, _ in self.posture_checks],
+            'issues': issues,
+            'bad_posture': bad_posture,
+            'smoothed_bad_posture': smoothed_bad_posture,
+            'has_pose': has_pose
+        }
+    
+    def smooth_bad_posture(self, bad_posture, timestamps=None):
+        """
+        Versión vectorizada del filtrado temporal de analyze_landmarks
+        Args:
+            bad_posture: Arreglo (N,) de bool con la detección cruda de cada frame
+            timestamps: Arreglo (N,) creciente de marcas de tiempo (por defecto, NOMINAL_FPS constantes)
+        Returns:
+            Arreglo (N,) de bool: proporción de mala postura en los últimos HISTORY_SECONDS (al menos
+            MIN_HISTORY_SAMPLES frames) >= BAD_POSTURE_THRESHOLD (detección cruda mientras haya
+            menos de MIN_HISTORY_SAMPLES frames)
+        """
+        bad_posture = np.asarray(bad_posture, dtype=bool)
+        if timestamps is None:
+            timestamps = np.arange(len(bad_posture)) / self.NOMINAL_FPS
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        smoothed = bad_posture.copy()
+        if len(bad_posture) == 0:
+            return smoothed
+        
+        # Inicio de la ventana de cada frame: primer frame con timestamp - t < HISTORY_SECONDS
+        # (mismo criterio que RingBuffer.expire), extendido hacia atrás hasta MIN_HISTORY_SAMPLES frames
+        ends = np.arange(1, len(bad_posture) + 1)
+        starts = np.searchsorted(timestamps, timestamps - self.HISTORY_SECONDS, side='right')
+        starts = np.minimum(starts, np.maximum(ends - self.MIN_HISTORY_SAMPLES, 0))
+        counts = np.concatenate(([0], np.cumsum(bad_posture, dtype=np.int64)))
+        ratios = (counts[ends] - counts[starts]) / (ends - starts)
+        
+        full = ends >= self.MIN_HISTORY_SAMPLES
+        smoothed[full] = ratios[full] >= self.BAD_POSTURE_THRESHOLD
+        return smoothed
+    
     def start_calibration(self):
         """
         Inicia el proceso de calibración
         """
         self.is_calibrated = False
-        self.calibration_frames = []
+        self.baseline = None
+        self.posture_history.clear()
+        self.scheduler.reset()
+        self.roi_tracker.reset()
+        self.calibration_frames = self.new_calibration_buffer()
         self.calibration_frame_count = 0
         print("🎯 Iniciando calibración de postura correcta...")
         print("📏 Mantén una postura CORRECTA durante 3 segundos")
     
-    def add_calibration_frame(self, landmarks):
+    def new_calibration_buffer(self):
+        """
+        Arreglo vacío para los puntos clave de calibración
+        Returns:
+            np.ndarray: (CALIBRATION_FRAMES_NEEDED, puntos clave, 3)
+        """
+        return np.empty((self.CALIBRATION_FRAMES_NEEDED, len(KEY_POINT_NAMES), 3))
+    
+    def add_calibration_frame(self, frame):
         """
         Añade un frame a la calibración
+        Args:
+            frame: FrameAnalysis del frame actual
         """
         if self.calibration_frame_count < self.CALIBRATION_FRAMES_NEEDED:
-            # Extraer puntos clave para calibración
-            calibration_points = self.extract_key_points(landmarks)
-            self.calibration_frames.append(calibration_points)
+            # CALIBRATION_FRAMES_NEEDED pudo cambiar después de crear el arreglo
+            if len(self.calibration_frames) != self.CALIBRATION_FRAMES_NEEDED and self.calibration_frame_count == 0:
+                self.calibration_frames = self.new_calibration_buffer()
+            # Guardar puntos clave para calibración
+            self.calibration_frames[self.calibration_frame_count] = frame.points
             self.calibration_frame_count += 1
             
             # Mostrar progreso
@@ -276,219 +573,82 @@ class PostureDetector:
     def extract_key_points(self, landmarks):
         """
         Extrae puntos clave para análisis de postura
+        El análisis interno usa arreglos (ver posture_analysis.FrameAnalysis); se conserva el
+        formato de diccionario para código externo
+        Returns:
+            dict: {nombre de posture_analysis.KEY_POINT_NAMES: [x, y, z]}
         """
-        points = {}
-        
-        # Cabeza y cuello
-        points['nose'] = [landmarks[self.mp_pose.PoseLandmark.NOSE.value].x,
-                         landmarks[self.mp_pose.PoseLandmark.NOSE.value].y,
-                         landmarks[self.mp_pose.PoseLandmark.NOSE.value].z]
-        
-        points['left_ear'] = [landmarks[self.mp_pose.PoseLandmark.LEFT_EAR.value].x,
-                             landmarks[self.mp_pose.PoseLandmark.LEFT_EAR.value].y,
-                             landmarks[self.mp_pose.PoseLandmark.LEFT_EAR.value].z]
-        
-        points['right_ear'] = [landmarks[self.mp_pose.PoseLandmark.RIGHT_EAR.value].x,
-                              landmarks[self.mp_pose.PoseLandmark.RIGHT_EAR.value].y,
-                              landmarks[self.mp_pose.PoseLandmark.RIGHT_EAR.value].z]
-        
-        # Hombros
-        points['left_shoulder'] = [landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value].x,
-                                  landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value].y,
-                                  landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value].z]
-        
-        points['right_shoulder'] = [landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value].x,
-                                   landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value].y,
-                                   landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value].z]
-        
-        # Caderas
-        points['left_hip'] = [landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value].x,
-                             landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value].y,
-                             landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value].z]
-        
-        points['right_hip'] = [landmarks[self.mp_pose.PoseLandmark.RIGHT_HIP.value].x,
-                              landmarks[self.mp_pose.PoseLandmark.RIGHT_HIP.value].y,
-                              landmarks[self.mp_pose.PoseLandmark.RIGHT_HIP.value].z]
-        
-        return points
+        points = landmarks_to_array(landmarks)[KEY_POINT_INDICES, :3]
+        return {name: points[i].tolist() for i, name in enumerate(KEY_POINT_NAMES)}
     
     def complete_calibration(self):
         """
-        Completa la calibración calculando valores de referencia
+        Completa la calibración calculando una sola vez la referencia de postura correcta
+        (media, desviación estándar y umbral adaptativo de cada métrica)
         """
-        if len(self.calibration_frames) < self.CALIBRATION_FRAMES_NEEDED:
+        if self.calibration_frame_count < self.CALIBRATION_FRAMES_NEEDED:
             print("❌ Error: No hay suficientes frames para calibración")
             return
         
-        # Calcular promedios de postura correcta
-        self.calibration_data = {}
-        
-        # Promediar todas las mediciones
-        all_measurements = []
-        for frame in self.calibration_frames:
-            measurements = self.calculate_posture_measurements(frame)
-            all_measurements.append(measurements)
-        
-        # Calcular valores de referencia (promedios)
-        self.calibration_data = {
-            'head_forward_distance': np.mean([m['head_forward_distance'] for m in all_measurements]),
-            'shoulder_height_diff': np.mean([m['shoulder_height_diff'] for m in all_measurements]),
-            'neck_angle': np.mean([m['neck_angle'] for m in all_measurements]),
-            'spine_angle': np.mean([m['spine_angle'] for m in all_measurements]),
-            'shoulder_elevation_angle': np.mean([m['shoulder_elevation_angle'] for m in all_measurements])
-        }
-        
-        # Calcular umbrales adaptativos basados en desviación estándar
-        std_multiplier = 2.5  # Más tolerante que antes (era 1.5)
-        base_tolerance = 1.3  # Factor adicional para mayor tolerancia
-        
-        self.head_forward_threshold = (self.calibration_data['head_forward_distance'] + (
-            std_multiplier * np.std([m['head_forward_distance'] for m in all_measurements]))) * base_tolerance
-        
-        self.shoulder_height_threshold = (self.calibration_data['shoulder_height_diff'] + (
-            std_multiplier * np.std([m['shoulder_height_diff'] for m in all_measurements]))) * base_tolerance
-        
-        self.neck_angle_threshold = (abs(self.calibration_data['neck_angle']) + (
-            std_multiplier * np.std([m['neck_angle'] for m in all_measurements]))) * base_tolerance
-        
-        self.spine_angle_threshold = (abs(self.calibration_data['spine_angle']) + (
-            std_multiplier * np.std([m['spine_angle'] for m in all_measurements]))) * base_tolerance
-        
-        self.shoulder_elevation_threshold = (abs(self.calibration_data['shoulder_elevation_angle']) + (
-            std_multiplier * np.std([m['shoulder_elevation_angle'] for m in all_measurements]))) * base_tolerance
+        # Todas las métricas de todos los frames de calibración en una pasada vectorizada
+        self.baseline = CalibrationBaseline.from_points(
+            self.calibration_frames[:self.calibration_frame_count],
+            std_multiplier=self.STD_MULTIPLIER,
+            base_tolerance=self.BASE_TOLERANCE
+        )
         
         self.is_calibrated = True
         print("✅ Calibración completada exitosamente!")
         print(f"📊 Umbrales adaptativos calculados:")
-        print(f"   • Cabeza adelantada: {self.head_forward_threshold:.3f}")
-        print(f"   • Diferencia hombros: {self.shoulder_height_threshold:.3f}")
-        print(f"   • Ángulo cuello: {self.neck_angle_threshold:.1f}°")
-        print(f"   • Ángulo columna: {self.spine_angle_threshold:.1f}°")
-        print(f"   • Elevación hombros: {self.shoulder_elevation_threshold:.1f}°")
+        print(f"   • Cabeza adelantada: {self.baseline.threshold('head_forward_distance'):.3f}")
+        print(f"   • Diferencia hombros: {self.baseline.threshold('shoulder_height_diff'):.3f}")
+        print(f"   • Ángulo cuello: {self.baseline.threshold('neck_angle'):.1f}°")
+        print(f"   • Ángulo columna: {self.baseline.threshold('spine_angle'):.1f}°")
+        print(f"   • Elevación hombros: {self.baseline.threshold('shoulder_elevation_angle'):.1f}°")
     
     def calculate_posture_measurements(self, points):
         """
         Calcula todas las mediciones de postura para un conjunto de puntos
+        Adaptador sobre posture_analysis.compute_metrics
+        Args:
+            points: dict de extract_key_points ({nombre: [x, y, z]})
+        Returns:
+            dict: {nombre de MEASUREMENT_NAMES: valor}
         """
-        measurements = {}
-        
-        # 1. Distancia de cabeza adelantada (usando coordenadas Z)
-        nose_z = points['nose'][2]
-        shoulder_mid_z = (points['left_shoulder'][2] + points['right_shoulder'][2]) / 2
-        measurements['head_forward_distance'] = abs(nose_z - shoulder_mid_z)
-        
-        # 2. Diferencia de altura entre hombros
-        measurements['shoulder_height_diff'] = abs(points['left_shoulder'][1] - points['right_shoulder'][1])
-        
-        # 3. Ángulo del cuello (usando oreja, hombro y vertical)
-        ear_mid = [(points['left_ear'][0] + points['right_ear'][0]) / 2,
-                   (points['left_ear'][1] + points['right_ear'][1]) / 2]
-        shoulder_mid = [(points['left_shoulder'][0] + points['right_shoulder'][0]) / 2,
-                       (points['left_shoulder'][1] + points['right_shoulder'][1]) / 2]
-        
-        # Ángulo entre línea oreja-hombro y vertical
-        neck_vector = [ear_mid[0] - shoulder_mid[0], ear_mid[1] - shoulder_mid[1]]
-        vertical_vector = [0, -1]  # Hacia arriba
-        measurements['neck_angle'] = self.calculate_angle_between_vectors(neck_vector, vertical_vector)
-        
-        # 4. Ángulo de la columna (hombros a caderas)
-        hip_mid = [(points['left_hip'][0] + points['right_hip'][0]) / 2,
-                   (points['left_hip'][1] + points['right_hip'][1]) / 2]
-        
-        spine_vector = [shoulder_mid[0] - hip_mid[0], shoulder_mid[1] - hip_mid[1]]
-        measurements['spine_angle'] = self.calculate_angle_between_vectors(spine_vector, vertical_vector)
-        
-        # 5. Ángulo de elevación de hombros
-        shoulder_vector = [points['right_shoulder'][0] - points['left_shoulder'][0],
-                          points['right_shoulder'][1] - points['left_shoulder'][1]]
-        horizontal_vector = [1, 0]
-        measurements['shoulder_elevation_angle'] = self.calculate_angle_between_vectors(shoulder_vector, horizontal_vector)
-        
-        return measurements
+        points = np.array([points[name] for name in KEY_POINT_NAMES], dtype=np.float64)
+        metrics = compute_metrics(points)
+        return {name: float(metrics[i]) for i, name in enumerate(MEASUREMENT_NAMES)}
     
-    def calculate_angle_between_vectors(self, vector1, vector2):
-        """
-        Calcula el ángulo entre dos vectores en grados
-        """
-        v1 = np.array(vector1)
-        v2 = np.array(vector2)
-        
-        # Normalizar vectores
-        v1_norm = v1 / np.linalg.norm(v1)
-        v2_norm = v2 / np.linalg.norm(v2)
-        
-        # Calcular ángulo
-        dot_product = np.dot(v1_norm, v2_norm)
-        dot_product = np.clip(dot_product, -1.0, 1.0)
-        angle = np.arccos(dot_product)
-        
-        return np.degrees(angle)
-    def analyze_head_tilt_down(self, landmarks):
+    def analyze_head_tilt_down(self, frame, baseline=None):
         """
         Detecta específicamente cuando la cabeza está inclinada hacia abajo (mirando pantalla)
         """
-        if not self.is_calibrated:
+        baseline = self.baseline if baseline is None else baseline
+        if baseline is None:
             return False
         
-        # Usar orejas y nariz para detectar inclinación hacia abajo
-        nose = landmarks[self.mp_pose.PoseLandmark.NOSE.value]
-        left_ear = landmarks[self.mp_pose.PoseLandmark.LEFT_EAR.value]
-        right_ear = landmarks[self.mp_pose.PoseLandmark.RIGHT_EAR.value]
-        
-        # Calcular la inclinación de la cabeza
-        ear_mid_y = (left_ear.y + right_ear.y) / 2
-        nose_y = nose.y
-        
         # Si la nariz está significativamente más abajo que las orejas, la cabeza está caída
-        head_tilt = nose_y - ear_mid_y
-        
-        # Comparar con calibración
-        if hasattr(self, 'calibration_data'):
-            # Durante calibración, calcular inclinación normal
-            calibration_tilts = []
-            for frame in self.calibration_frames:
-                frame_ear_y = (frame['left_ear'][1] + frame['right_ear'][1]) / 2
-                frame_nose_y = frame['nose'][1]
-                calibration_tilts.append(frame_nose_y - frame_ear_y)
-            
-            normal_tilt = np.mean(calibration_tilts)
-            tilt_threshold = normal_tilt + 0.02  # Umbral de 2cm hacia abajo
-            
-            return head_tilt > tilt_threshold
+        head_tilt = frame['head_tilt']
+        
+        # Comparar con la inclinación normal de calibración
+        normal_tilt = baseline['head_tilt']
+        tilt_threshold = normal_tilt + 0.02  # Umbral de 2cm hacia abajo
         
-        return False
+        return head_tilt > tilt_threshold
     
-    def analyze_forward_lean(self, landmarks):
+    def analyze_forward_lean(self, frame, baseline=None):
         """
         Detecta inclinación del cuerpo hacia adelante (encorvamiento)
         """
-        if not self.is_calibrated:
+        baseline = self.baseline if baseline is None else baseline
+        if baseline is None:
             return False
         
-        # Usar hombros y caderas para detectar inclinación frontal
-        left_shoulder = landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-        right_shoulder = landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
-        left_hip = landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value]
-        right_hip = landmarks[self.mp_pose.PoseLandmark.RIGHT_HIP.value]
-        
-        # Calcular coordenadas Z promedio
-        shoulder_z = (left_shoulder.z + right_shoulder.z) / 2
-        hip_z = (left_hip.z + right_hip.z) / 2
-        
         # Inclinación hacia adelante: hombros más cerca de la cámara que caderas
-        forward_lean = hip_z - shoulder_z
-        
-        # Comparar con calibración
-        if hasattr(self, 'calibration_data'):
-            calibration_leans = []
-            for frame in self.calibration_frames:
-                frame_shoulder_z = (frame['left_shoulder'][2] + frame['right_shoulder'][2]) / 2
-                frame_hip_z = (frame['left_hip'][2] + frame['right_hip'][2]) / 2
-                calibration_leans.append(frame_hip_z - frame_shoulder_z)
-            
-            normal_lean = np.mean(calibration_leans)
-            lean_threshold = normal_lean - 0.03  # Umbral de inclinación hacia adelante
-            
-            return forward_lean < lean_threshold
+        forward_lean = frame['forward_lean']
+        
+        # Comparar con la inclinación normal de calibración
+        normal_lean = baseline['forward_lean']
+        lean_threshold = normal_lean - 0.03  # Umbral de inclinación hacia adelante
         
-        return False
+        return forward_lean < lean_threshold
@@ -1,27 +1,96 @@
 """
 🧮 Sistema de Estadísticas de Postura
-Recolecta y almacena datos de la sesión actual en memoria
+Recolecta y almacena datos de la sesión actual en memoria y, opcionalmente,
+registra cada evento en disco para reconstruir la sesión (ver session_log.py)
+
+Concurrencia: un solo escritor (el bucle de detección) modifica el estado y publica tras cada
+cambio una instantánea inmutable y versionada; los lectores (superposición, dashboard,
+exportaciones) solo leen la última instantánea publicada, sin candados ni estados a medias
 """
 
+import os
+import threading
 import time
 from datetime import datetime, timedelta
-from collections import defaultdict
+from types import MappingProxyType
+from collections import defaultdict, namedtuple
+from ring_buffer import RingBuffer
+from session_log import SessionLogWriter, read_session_log
+
+class StatisticsSnapshot(namedtuple('StatisticsSnapshot', (
+        'version', 'state_version', 'session_start_time', 'session_end_time',
+        'good_posture_time', 'bad_posture_time', 'current_posture_state',
+        'current_state_start_time', 'problem_counts', 'alert_count', 'recent_bad_fraction'))):
+    """
+    Estado de las estadísticas en un instante, publicado por el escritor. Inmutable (tupla): un
+    lector que la obtiene la puede usar sin sincronización. Se crea una por frame, por eso tupla
+    y no una clase con atributos protegidos
+
+    Campos:
+        version: Número de publicación (crece con cada cambio)
+        state_version: Crece solo con cambios de estado, alertas, inicio, fin y reinicio
+        problem_counts: Mapeo de solo lectura {problema: frames}
+        (los demás copian los atributos del mismo nombre de PostureStatistics)
+    """
+
+    __slots__ = ()
+
 
 class PostureStatistics:
     """
     Maneja las estadísticas de postura durante la sesión actual
     """
     
-    def __init__(self):
-        """Inicializa el sistema de estadísticas"""
+    def __init__(self, clock=time.time, log_dir=None, log_name="session", source=None):
+        """
+        Inicializa el sistema de estadísticas
+        
+        Args:
+            clock (callable): Fuente de tiempo en segundos. Por defecto el reloj de pared;
+                              al procesar video grabado se usa el tiempo del video
+            log_dir (str): Carpeta del registro de eventos de la sesión (None = sin registro)
+            log_name (str): Prefijo del archivo de registro
+            source (str): Nombre de la fuente de video; se guarda en el registro para que la sesión
+                          importada coincida con la ya guardada en el historial
+        """
+        self.clock = clock
+        self.source = source
+        
+        # Registro de eventos en disco
+        self.log_dir = log_dir
+        self.log_name = log_name
+        self.log_writer = None
+        self.HEARTBEAT_INTERVAL = 30.0  # Segundos entre latidos (acota lo perdido si se interrumpe)
+        
+        # Capacidad de los historiales (memoria fija, costo por frame constante)
+        self.HISTORY_CAPACITY = 65536  # Cambios de estado: cubre una jornada completa
+        self.RECENT_CAPACITY = 8192  # Frames recientes: ~4 minutos a 30 FPS
+        self.RECENT_WINDOW = 60.0  # Segundos de la proporción reciente de mala postura
+        self.SUMMARY_RATE = 4.0  # Recálculos por segundo del resumen en caché
+        
+        # Escritores serializados (reentrante: update_posture_state puede iniciar la sesión)
+        self._write_lock = threading.RLock()
+        self._snapshot = None  # Última instantánea publicada
+        self._cached = None  # (resumen, instante, state_version) del resumen en caché
+        # Secuencia de la línea de tiempo: impar mientras el escritor agrega un cambio
+        self._history_sequence = 0
+        
         self.reset_session()
     
     def reset_session(self):
         """Reinicia todas las estadísticas para una nueva sesión"""
+        with self._write_lock:
+            self._reset_state()
+            self.log_event('reset')
+            self._publish(state_changed=True)
+        print("📊 Estadísticas de postura reiniciadas")
+    
+    def _reset_state(self):
+        """Estado inicial de una sesión (solo el escritor)"""
         self.session_start_time = None
         self.session_end_time = None
         
-        # Contadores de tiempo
+        # Contadores de tiempo (solo tramos ya cerrados; el tramo en curso se suma al consultar)
         self.good_posture_time = 0.0  # Segundos en buena postura
         self.bad_posture_time = 0.0   # Segundos en mala postura
         
@@ -33,22 +102,93 @@ class PostureStatistics:
         self.problem_counts = defaultdict(int)  # {'head_tilt': 5, 'forward_lean': 3}
         self.alert_count = 0  # Número de alertas (ventanas abiertas)
         
-        # Historial para gráficos (últimos 20 puntos)
-        self.posture_history = []  # [(timestamp, 'good'/'bad')]
+        # Línea de tiempo para gráficos: cambios de estado (1 = mala postura)
+        self.posture_history = RingBuffer(self.HISTORY_CAPACITY, dtype=bool)
+        # Veredicto de cada frame reciente, para la proporción de los últimos RECENT_WINDOW segundos
+        self.recent_frames = RingBuffer(self.RECENT_CAPACITY, dtype=bool)
         
-        print("📊 Estadísticas de postura reiniciadas")
+        # Problemas abiertos para el registro por tramos: {problema: frames}
+        self._open_issues = {}
+        self._last_heartbeat = None
+    
+    def _publish(self, state_changed=False, counts_changed=True):
+        """
+        Publica una instantánea del estado actual (solo el escritor, con el candado tomado).
+        Reemplazar la referencia es atómico: los lectores ven la anterior o la nueva, nunca una mezcla
+        
+        Args:
+            state_changed (bool): Cambio que el resumen en caché debe reflejar de inmediato
+            counts_changed (bool): Copiar los contadores de problemas (si no, se reutiliza la copia anterior)
+        """
+        previous = self._snapshot
+        if counts_changed or previous is None:
+            problem_counts = MappingProxyType(dict(self.problem_counts))
+        else:
+            problem_counts = previous.problem_counts
+        
+        self._snapshot = StatisticsSnapshot(
+            version=previous.version + 1 if previous else 1,
+            state_version=(previous.state_version if previous else 0) + (1 if state_changed or previous is None else 0),
+            session_start_time=self.session_start_time,
+            session_end_time=self.session_end_time,
+            good_posture_time=self.good_posture_time,
+            bad_posture_time=self.bad_posture_time,
+            current_posture_state=self.current_posture_state,
+            current_state_start_time=self.current_state_start_time,
+            problem_counts=problem_counts,
+            alert_count=self.alert_count,
+            recent_bad_fraction=self.recent_frames.mean()
+        )
+    
+    def snapshot(self):
+        """
+        Última instantánea publicada (lectura sin bloqueo desde cualquier hilo)
+        
+        Returns:
+            StatisticsSnapshot
+        """
+        return self._snapshot
+    
+    def log_event(self, event_type, **data):
+        """
+        Agrega un evento al registro de la sesión (no bloquea; sin registro no hace nada)
+        
+        Args:
+            event_type (str): Tipo de evento
+            **data: Datos serializables a JSON
+        """
+        if self.log_writer is not None:
+            self.log_writer.write({'t': self.clock(), 'type': event_type, **data})
     
     def start_session(self):
         """Marca el inicio de una nueva sesión"""
-        self.session_start_time = time.time()
-        print(f"🚀 Sesión iniciada: {datetime.now().strftime('%H:%M:%S')}")
+        with self._write_lock:
+            self.session_start_time = self.clock()
+            self._last_heartbeat = self.session_start_time
+            
+            if self.log_dir and self.log_writer is None:
+                os.makedirs(self.log_dir, exist_ok=True)
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                self.log_writer = SessionLogWriter(os.path.join(self.log_dir, f"{self.log_name}_{timestamp}.jsonl"))
+                print(f"📝 Registro de eventos: {self.log_writer.path}")
+            self.log_event('session_start', source=self.source)
+            self._publish(state_changed=True)
+        print(f"🚀 Sesión iniciada: {datetime.fromtimestamp(self.session_start_time).strftime('%H:%M:%S')}")
     
     def end_session(self):
         """Marca el final de la sesión actual"""
-        if self.session_start_time:
-            self.session_end_time = time.time()
-            self._update_current_state_time()
-            print(f"🛑 Sesión finalizada: {datetime.now().strftime('%H:%M:%S')}")
+        with self._write_lock:
+            if self.session_start_time:
+                self.session_end_time = self.clock()
+                self._close_current_state(self.session_end_time)
+                self._update_open_issues(())
+                self.log_event('session_end')
+                self._publish(state_changed=True)
+                print(f"🛑 Sesión finalizada: {datetime.fromtimestamp(self.session_end_time).strftime('%H:%M:%S')}")
+            
+            if self.log_writer is not None:
+                self.log_writer.close()
+                self.log_writer = None
     
     def update_posture_state(self, is_good_posture, problem_types=None):
         """
@@ -58,84 +198,263 @@ class PostureStatistics:
             is_good_posture (bool): True si la postura es buena
             problem_types (list): Lista de problemas detectados ['head_tilt', 'forward_lean']
         """
-        if not self.session_start_time:
-            self.start_session()
-        
-        current_time = time.time()
-        new_state = 'good' if is_good_posture else 'bad'
-        
-        # Si cambió el estado, actualizar tiempos
-        if self.current_posture_state != new_state:
-            self._update_current_state_time()
-            self.current_posture_state = new_state
-            self.current_state_start_time = current_time
+        with self._write_lock:
+            if not self.session_start_time:
+                self.start_session()
+            
+            current_time = self.clock()
+            new_state = 'good' if is_good_posture else 'bad'
+            state_changed = self.current_posture_state != new_state
+            
+            # Si cambió el estado, actualizar tiempos
+            if state_changed:
+                self._close_current_state(current_time)
+                self.current_posture_state = new_state
+                self.current_state_start_time = current_time
+                
+                # Agregar a la línea de tiempo
+                self._append_history(current_time, new_state == 'bad')
+                self.log_event('state', state=new_state)
             
-            # Agregar al historial (máximo 20 puntos)
-            self.posture_history.append((current_time, new_state))
-            if len(self.posture_history) > 20:
-                self.posture_history.pop(0)
-        
-        # Si es mala postura, contar los tipos de problemas
-        if not is_good_posture and problem_types:
-            for problem in problem_types:
+            # Ventana reciente de veredictos por frame
+            self.recent_frames.append(current_time, not is_good_posture)
+            self.recent_frames.expire(current_time, self.RECENT_WINDOW)
+            
+            # Si es mala postura, contar los tipos de problemas
+            active_problems = problem_types if not is_good_posture and problem_types else ()
+            for problem in active_problems:
                 self.problem_counts[problem] += 1
+            
+            # Registro por tramos: un evento al aparecer y otro al desaparecer cada problema
+            if self.log_writer is not None:
+                self._update_open_issues(active_problems)
+                if current_time - self._last_heartbeat >= self.HEARTBEAT_INTERVAL:
+                    self._last_heartbeat = current_time
+                    self.log_event('heartbeat', open_issues=dict(self._open_issues))
+            
+            # El resumen debe reflejar un cambio de estado de inmediato
+            self._publish(state_changed=state_changed, counts_changed=bool(active_problems))
+    
+    def _append_history(self, timestamp, bad):
+        """
+        Agrega un cambio de estado a la línea de tiempo (solo el escritor); la secuencia impar
+        durante la escritura permite a get_posture_timeline detectar copias a medias
+        """
+        self._history_sequence += 1
+        self.posture_history.append(timestamp, bad)
+        self._history_sequence += 1
+    
+    def _update_open_issues(self, active_problems):
+        """
+        Actualiza los tramos de problemas abiertos y registra los que empiezan o terminan
+        
+        Args:
+            active_problems: Problemas contados en el frame actual
+        """
+        for problem in active_problems:
+            if problem in self._open_issues:
+                self._open_issues[problem] += 1
+            else:
+                self._open_issues[problem] = 1
+                self.log_event('issue_start', issue=problem)
+        
+        if len(self._open_issues) > len(active_problems):
+            for problem in [p for p in self._open_issues if p not in active_problems]:
+                self.log_event('issue_end', issue=problem, frames=self._open_issues.pop(problem))
     
     def log_alert_opened(self):
         """Registra que se abrió una ventana de alerta"""
-        self.alert_count += 1
+        with self._write_lock:
+            self.alert_count += 1
+            self.log_event('alert')
+            self._publish(state_changed=True)
         print(f"🚨 Alerta #{self.alert_count} registrada")
     
-    def _update_current_state_time(self):
-        """Actualiza el tiempo acumulado del estado actual"""
-        if self.current_state_start_time and self.current_posture_state:
-            elapsed = time.time() - self.current_state_start_time
+    def _close_current_state(self, end_time):
+        """
+        Suma el tramo del estado actual a los acumulados y abre uno nuevo en end_time
+        (cada tramo se cuenta una sola vez)
+        """
+        if self.current_state_start_time is not None and self.current_posture_state:
+            elapsed = max(end_time - self.current_state_start_time, 0.0)
             
             if self.current_posture_state == 'good':
                 self.good_posture_time += elapsed
             else:
                 self.bad_posture_time += elapsed
+            
+            self.current_state_start_time = end_time
+    
+    def _posture_times(self, snapshot, end_time):
+        """
+        Tiempos de buena y mala postura incluyendo el tramo en curso, sin modificar el estado
+        
+        Args:
+            snapshot (StatisticsSnapshot): Estado a consultar
+            end_time (float): Instante de la consulta (fin de la sesión si ya terminó)
+        
+        Returns:
+            tuple: (good_posture_time, bad_posture_time)
+        """
+        good_time, bad_time = snapshot.good_posture_time, snapshot.bad_posture_time
+        
+        if snapshot.current_state_start_time is not None and snapshot.current_posture_state:
+            elapsed = max(end_time - snapshot.current_state_start_time, 0.0)
+            if snapshot.current_posture_state == 'good':
+                good_time += elapsed
+            else:
+                bad_time += elapsed
+        
+        return good_time, bad_time
     
     def get_session_duration(self):
         """Retorna la duración total de la sesión en segundos"""
-        if not self.session_start_time:
+        snapshot = self._snapshot
+        if not snapshot.session_start_time:
             return 0
         
-        end_time = self.session_end_time or time.time()
-        return end_time - self.session_start_time
+        end_time = snapshot.session_end_time or self.clock()
+        return end_time - snapshot.session_start_time
     
-    def get_statistics_summary(self):
+    def get_statistics_summary(self, include_timeline=True):
         """
-        Retorna un resumen completo de las estadísticas
+        Retorna un resumen completo de las estadísticas, calculado en el momento
+        (no modifica el estado: puede llamarse cuantas veces sea necesario)
+        
+        Args:
+            include_timeline (bool): Incluir 'posture_history' (copia de toda la línea de tiempo)
         
         Returns:
             dict: Diccionario con todas las estadísticas
         """
-        self._update_current_state_time()
-        
-        total_duration = self.get_session_duration()
+        summary = self._summarize(self._snapshot)
+        if include_timeline:
+            summary['posture_history'] = self.get_posture_timeline()
+        return summary
+    
+    def _summarize(self, snapshot):
+        """Resumen de una instantánea; el tramo en curso se mide con una sola lectura del reloj"""
+        end_time = snapshot.session_end_time or self.clock()
+        total_duration = end_time - snapshot.session_start_time if snapshot.session_start_time else 0
+        good_time, bad_time = self._posture_times(snapshot, end_time)
         
         # Calcular porcentajes
         if total_duration > 0:
-            good_percentage = (self.good_posture_time / total_duration) * 100
-            bad_percentage = (self.bad_posture_time / total_duration) * 100
+            good_percentage = (good_time / total_duration) * 100
+            bad_percentage = (bad_time / total_duration) * 100
         else:
             good_percentage = bad_percentage = 0
         
         return {
             'session_duration': total_duration,
             'session_duration_formatted': self._format_duration(total_duration),
-            'good_posture_time': self.good_posture_time,
-            'good_posture_formatted': self._format_duration(self.good_posture_time),
-            'bad_posture_time': self.bad_posture_time,
-            'bad_posture_formatted': self._format_duration(self.bad_posture_time),
+            'good_posture_time': good_time,
+            'good_posture_formatted': self._format_duration(good_time),
+            'bad_posture_time': bad_time,
+            'bad_posture_formatted': self._format_duration(bad_time),
             'good_percentage': good_percentage,
             'bad_percentage': bad_percentage,
-            'problem_counts': dict(self.problem_counts),
-            'alert_count': self.alert_count,
-            'posture_history': self.posture_history.copy(),
-            'session_start': datetime.fromtimestamp(self.session_start_time) if self.session_start_time else None
+            'problem_counts': dict(snapshot.problem_counts),
+            'alert_count': snapshot.alert_count,
+            'recent_bad_percentage': snapshot.recent_bad_fraction * 100,
+            'session_start': datetime.fromtimestamp(snapshot.session_start_time) if snapshot.session_start_time else None,
+            'version': snapshot.version
         }
     
+    @classmethod
+    def from_log(cls, path):
+        """
+        Reconstruye las estadísticas de una sesión reproduciendo su registro de eventos.
+        Si la sesión se interrumpió, se cierra en el último evento y se suman los frames de los
+        problemas abiertos según el último latido
+        
+        Args:
+            path (str): Archivo .jsonl de la sesión
+            
+        Returns:
+            PostureStatistics: Estadísticas equivalentes a las de la sesión original
+        """
+        last_time = [None]
+        statistics = cls(clock=lambda: last_time[0])
+        pending_issues = {}  # Frames de problemas abiertos en el último latido
+        
+        for event in read_session_log(path):
+            timestamp = event['t']
+            last_time[0] = timestamp
+            event_type = event['type']
+            
+            if event_type == 'reset':
+                statistics.reset_session()
+                pending_issues = {}
+            elif event_type == 'session_start':
+                statistics.session_start_time = timestamp
+                statistics.source = event.get('source')  # Registros antiguos no la incluyen
+            elif event_type == 'state':
+                statistics._close_current_state(timestamp)
+                statistics.current_posture_state = event['state']
+                statistics.current_state_start_time = timestamp
+                statistics._append_history(timestamp, event['state'] == 'bad')
+            elif event_type == 'issue_end':
+                statistics.problem_counts[event['issue']] += event['frames']
+                pending_issues.pop(event['issue'], None)
+            elif event_type == 'heartbeat':
+                pending_issues = dict(event['open_issues'])
+            elif event_type == 'alert':
+                statistics.alert_count += 1
+            elif event_type == 'session_end':
+                statistics.session_end_time = timestamp
+                statistics._close_current_state(timestamp)
+                pending_issues = {}
+        
+        # Sesión interrumpida
+        if statistics.session_start_time is not None and statistics.session_end_time is None:
+            for problem, frames in pending_issues.items():
+                statistics.problem_counts[problem] += frames
+            statistics.session_end_time = last_time[0]
+            statistics._close_current_state(last_time[0])
+        
+        statistics._publish(state_changed=True)
+        return statistics
+    
+    def get_cached_summary(self):
+        """
+        Resumen de solo lectura para la superposición y el dashboard: se recalcula tras un cambio
+        de estado, alerta o reinicio, y como máximo SUMMARY_RATE veces por segundo en los demás casos
+        (los contadores de problemas y las duraciones pueden ir hasta 1/SUMMARY_RATE s atrasados)
+        
+        Returns:
+            MappingProxyType: Mismas claves que get_statistics_summary() salvo 'posture_history'
+            (la línea de tiempo se pide con get_posture_timeline())
+        """
+        snapshot = self._snapshot
+        cached = self._cached
+        now = time.monotonic()
+        if (cached is None or cached[2] != snapshot.state_version
+                or now - cached[1] >= 1.0 / self.SUMMARY_RATE):
+            summary = MappingProxyType(self._summarize(snapshot))
+            self._cached = (summary, now, snapshot.state_version)  # Reemplazo atómico de la tupla
+            return summary
+        return cached[0]
+    
+    def get_posture_timeline(self):
+        """
+        Retorna la línea de tiempo de cambios de estado
+        
+        Returns:
+            list: [(timestamp, 'good'/'bad')] en orden cronológico
+        """
+        # Copia sin candado: se repite si el escritor agregó un cambio durante la copia
+        while True:
+            sequence = self._history_sequence
+            history = self.posture_history
+            if sequence % 2 == 0:
+                times = history.ordered_times()
+                states = history.ordered_values()
+                if self._history_sequence == sequence and len(times) == len(states):
+                    break
+            time.sleep(0)  # Ceder el intérprete al escritor
+        return [(t, 'bad' if bad else 'good') for t, bad in zip(times.tolist(), states.tolist())]
+    
     def _format_duration(self, seconds):
         """Formatea duración en segundos a formato legible MM:SS"""
         if seconds < 60:
@@ -145,12 +464,13 @@ class PostureStatistics:
             secs = int(seconds % 60)
             return f"{minutes}:{secs:02d}min"
     
-    def export_to_csv(self, filename=None):
+    def export_to_csv(self, filename=None, output_dir="estadisticas"):
         """
         Exporta las estadísticas a un archivo CSV
         
         Args:
             filename (str): Nombre del archivo (opcional)
+            output_dir (str): Carpeta de destino
             
         Returns:
             str: Ruta del archivo creado
@@ -163,8 +483,8 @@ class PostureStatistics:
             filename = f"posture_stats_{timestamp}.csv"
         
         # Crear directorio si no existe
-        os.makedirs("estadisticas", exist_ok=True)
-        filepath = os.path.join("estadisticas", filename)
+        os.makedirs(output_dir, exist_ok=True)
+        filepath = os.path.join(output_dir, filename)
         
         stats = self.get_statistics_summary()
         
@@ -0,0 +1,186 @@
+"""
+Medición de latencia por etapa del bucle principal
+Cada etapa (captura, espera del frame, espejo, BGR→RGB, pose.process, análisis, dibujo, visualización) guarda sus
+duraciones recientes en un búfer circular para calcular p50/p95/p99 y la tasa de frames
+"""
+
+import csv
+import threading
+import time
+from contextlib import contextmanager
+import cv2
+import numpy as np
+from ring_buffer import RingBuffer
+
+PERCENTILES = (50, 95, 99)
+
+
+def _percentiles_ms(values):
+    """Percentiles en ms de duraciones en segundos; vacío si no hay valores"""
+    if values is None or len(values) == 0:
+        return {}
+    return {f"p{p}": float(v) * 1000 for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+
+class StageProfiler:
+    """
+    Latencias por etapa con ventana móvil y contadores totales de la sesión.
+    Seguro entre hilos: el hilo de captura y el principal registran en el mismo perfilador
+    """
+
+    def __init__(self, window=300):
+        """
+        Inicializa el perfilador vacío
+        Args:
+            window: Número de mediciones recientes por etapa para los percentiles
+        """
+        self.window = window
+        self.stages = {}  # {etapa: RingBuffer de duraciones en segundos}, en orden de aparición
+        self.counts = {}
+        self.totals = {}
+        self.maxima = {}
+        self._lock = threading.Lock()
+
+        # Texto de la superposición, recalculado cada OVERLAY_REFRESH segundos
+        self.OVERLAY_REFRESH = 0.5
+        self._overlay_lines = []
+        self._overlay_time = 0.0
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Mide la duración del bloque como la etapa indicada
+        Uso:
+            with profiler.stage('pose.process'):
+                results = pose.process(rgb_image)
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        """
+        Registra una duración medida fuera del perfilador
+        Args:
+            name: Nombre de la etapa
+            seconds: Duración en segundos
+        """
+        with self._lock:
+            samples = self.stages.get(name)
+            if samples is None:
+                samples = self.stages[name] = RingBuffer(self.window)
+                self.counts[name] = 0
+                self.totals[name] = 0.0
+                self.maxima[name] = 0.0
+
+            samples.append(time.perf_counter(), seconds)
+            self.counts[name] += 1
+            self.totals[name] += seconds
+            if seconds > self.maxima[name]:
+                self.maxima[name] = seconds
+
+    def percentiles(self, name):
+        """
+        Percentiles de la ventana reciente de una etapa
+        Returns:
+            dict: {'p50': ms, 'p95': ms, 'p99': ms}, vacío si la etapa no tiene mediciones
+        """
+        with self._lock:
+            samples = self.stages.get(name)
+            values = samples.ordered_values() if samples is not None else None
+
+        return _percentiles_ms(values)
+
+    def fps(self, name='frame'):
+        """
+        Tasa reciente de una etapa (por defecto el frame completo) a partir de sus marcas de tiempo
+        """
+        with self._lock:
+            samples = self.stages.get(name)
+            if samples is None or len(samples) < 2:
+                return 0.0
+            count, first, last = len(samples), samples.oldest_time(), samples.latest()[0]
+
+        return (count - 1) / (last - first) if last > first else 0.0
+
+    def summary(self):
+        """
+        Returns:
+            dict: {etapa: {'count', 'mean_ms', 'p50', 'p95', 'p99', 'max_ms'}} en orden de aparición
+        """
+        # Copia coherente bajo el candado (el hilo de captura puede estar registrando);
+        # los percentiles se calculan fuera
+        with self._lock:
+            state = [(name, self.counts[name], self.totals[name], self.maxima[name], samples.ordered_values())
+                     for name, samples in self.stages.items()]
+
+        result = {}
+        for name, count, total, maximum, values in state:
+            entry = {
+                'count': count,
+                'mean_ms': total / count * 1000,
+                'max_ms': maximum * 1000
+            }
+            entry.update(_percentiles_ms(values))
+            result[name] = entry
+        return result
+
+    def draw_overlay(self, image, x, y):
+        """
+        Dibuja FPS y p50/p95/p99 por etapa sobre la imagen
+        Args:
+            image: Imagen BGR
+            x, y: Esquina superior izquierda del texto
+        """
+        now = time.perf_counter()
+        if now - self._overlay_time >= self.OVERLAY_REFRESH:
+            self._overlay_time = now
+            self._overlay_lines = [f"FPS {self.fps():.1f}  (ms p50/p95/p99)"]
+            for name, entry in self.summary().items():
+                if name == 'frame' or 'p50' not in entry:
+                    continue
+                self._overlay_lines.append(f"{name}: {entry['p50']:.1f}/{entry['p95']:.1f}/{entry['p99']:.1f}")
+
+        for i, line in enumerate(self._overlay_lines):
+            cv2.putText(image, line, (x, y + i * 16), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 0), 1)
+        return image
+
+    def export_to_csv(self, filepath, counters=None):
+        """
+        Exporta la latencia por etapa y contadores adicionales
+        Args:
+            filepath: Ruta del CSV
+            counters: dict opcional de contadores (frames descartados, inferencias omitidas, ...)
+        Returns:
+            str: Ruta del archivo creado
+        """
+        with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+
+            writer.writerow(['LATENCIA POR ETAPA'])
+            writer.writerow(['Etapa', 'Mediciones', 'Media (ms)', 'p50 (ms)', 'p95 (ms)', 'p99 (ms)', 'Máx (ms)'])
+            for name, entry in self.summary().items():
+                writer.writerow([name, entry['count'], f"{entry['mean_ms']:.2f}",
+                                 f"{entry.get('p50', 0):.2f}", f"{entry.get('p95', 0):.2f}",
+                                 f"{entry.get('p99', 0):.2f}", f"{entry['max_ms']:.2f}"])
+
+            if counters:
+                writer.writerow([])
+                writer.writerow(['CONTADORES'])
+                writer.writerow(['Contador', 'Valor'])
+                for name, value in counters.items():
+                    writer.writerow([name, value])
+
+        print(f"⏱️  Latencias exportadas: {filepath}")
+        return filepath
+
+    def reset(self):
+        """Descarta todas las mediciones"""
+        with self._lock:
+            self.stages.clear()
+            self.counts.clear()
+            self.totals.clear()
+            self.maxima.clear()
+        self._overlay_lines = []
@@ -0,0 +1,140 @@
+"""
+Búfer circular de capacidad fija con marcas de tiempo
+Reemplaza las listas con append + pop(0): agregar, expirar y consultar la suma o la media
+cuestan O(1) sin importar la longitud del historial
+"""
+
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Pares (timestamp, valor) en arreglos de NumPy preasignados, del más antiguo al más reciente.
+    Al llenarse, cada valor nuevo reemplaza al más antiguo
+    """
+
+    def __init__(self, capacity, dtype=np.float64):
+        """
+        Inicializa el búfer vacío
+        Args:
+            capacity: Número máximo de valores
+            dtype: Tipo de los valores (bool para proporciones de eventos)
+        """
+        if capacity <= 0:
+            raise ValueError("La capacidad debe ser positiva")
+
+        self.capacity = int(capacity)
+        self.times = np.zeros(self.capacity, dtype=np.float64)
+        self.values = np.zeros(self.capacity, dtype=dtype)
+        self._start = 0  # Posición del valor más antiguo
+        self._size = 0
+        self._sum = 0  # Suma acumulada de los valores presentes
+        self._writes = 0  # Escrituras desde el último recálculo exacto de la suma
+
+    def __len__(self):
+        return self._size
+
+    def append(self, timestamp, value):
+        """
+        Agrega un valor; si el búfer está lleno descarta el más antiguo
+        """
+        if self._size == self.capacity:
+            self._sum -= self.values[self._start].item()
+            self._start = (self._start + 1) % self.capacity
+            self._size -= 1
+
+        index = (self._start + self._size) % self.capacity
+        self.times[index] = timestamp
+        self.values[index] = value
+        self._sum += self.values[index].item()
+        self._size += 1
+
+        # Con valores flotantes la suma acumulada deriva: se recalcula una vez por vuelta (O(1) amortizado)
+        self._writes += 1
+        if self._writes >= self.capacity:
+            self._writes = 0
+            self._sum = self.ordered_values().sum().item()
+
+    def popleft(self):
+        """
+        Quita y retorna el par más antiguo
+        Returns:
+            tuple: (timestamp, valor)
+        """
+        if self._size == 0:
+            raise IndexError("Búfer vacío")
+
+        timestamp = self.times[self._start].item()
+        value = self.values[self._start].item()
+        self._sum -= value
+        self._start = (self._start + 1) % self.capacity
+        self._size -= 1
+        return timestamp, value
+
+    def expire(self, timestamp, seconds, keep=0):
+        """
+        Descarta los valores con antigüedad >= seconds respecto a timestamp
+        Args:
+            keep: Conservar siempre al menos este número de valores (los más recientes)
+        """
+        cutoff = timestamp - seconds
+        while self._size > keep and self.times[self._start] <= cutoff:
+            self.popleft()
+
+    def clear(self):
+        """Vacía el búfer sin liberar memoria"""
+        self._start = 0
+        self._size = 0
+        self._sum = 0
+        self._writes = 0
+
+    @property
+    def total(self):
+        """Suma de los valores presentes"""
+        return self._sum
+
+    def mean(self):
+        """
+        Media de los valores presentes (proporción de True para valores bool), 0 si está vacío
+        """
+        return self._sum / self._size if self._size else 0.0
+
+    def oldest_time(self):
+        """Marca de tiempo del valor más antiguo, None si está vacío"""
+        return self.times[self._start].item() if self._size else None
+
+    def latest(self):
+        """
+        Par más reciente
+        Returns:
+            tuple: (timestamp, valor) o None si está vacío
+        """
+        if self._size == 0:
+            return None
+        index = (self._start + self._size - 1) % self.capacity
+        return self.times[index].item(), self.values[index].item()
+
+    def _ordered(self, array):
+        """Copia de un arreglo interno del más antiguo al más reciente"""
+        end = self._start + self._size
+        if end <= self.capacity:
+            return array[self._start:end].copy()
+        return np.concatenate((array[self._start:], array[:end - self.capacity]))
+
+    def ordered_times(self):
+        """Marcas de tiempo en orden cronológico (copia)"""
+        return self._ordered(self.times)
+
+    def ordered_values(self):
+        """Valores en orden cronológico (copia)"""
+        return self._ordered(self.values)
+
+    def window(self, timestamp, seconds):
+        """
+        Valores con antigüedad < seconds respecto a timestamp, sin descartarlos
+        Returns:
+            tuple: (times, values) en orden cronológico
+        """
+        times = self.ordered_times()
+        start = np.searchsorted(times, timestamp - seconds, side='right')
+        return times[start:], self.ordered_values()[start:]
@@ -0,0 +1,149 @@
+"""
+Región de interés para la inferencia de MediaPipe
+El análisis solo usa nariz, orejas, hombros y caderas: a partir de los landmarks del frame anterior
+se recorta la parte superior del cuerpo con margen y los landmarks del recorte se devuelven a
+coordenadas normalizadas del frame completo. Sin seguimiento se usa el frame completo.
+La caja se mantiene mientras el cuerpo siga dentro de ella y no cambie de tamaño: el seguimiento
+interno de MediaPipe (static_image_mode=False) trabaja en coordenadas del recorte, y un recorte que
+se mueve en cada frame produce temblor en los landmarks y más redetecciones
+"""
+
+import numpy as np
+from posture_analysis import KEY_POINT_INDICES
+
+
+class RoiTracker:
+    """
+    Recorte del frame siguiente a partir de los landmarks del frame actual
+    """
+
+    def __init__(self, margin=0.4, min_size=128, max_area_ratio=0.8, edge_fraction=0.1, resize_threshold=0.25):
+        """
+        Inicializa el seguimiento sin región (frame completo)
+        Args:
+            margin: Margen alrededor de los puntos clave, como fracción del tamaño de su caja
+            min_size: Lado mínimo del recorte en píxeles
+            max_area_ratio: Si el recorte cubre más de esta fracción del frame se usa el frame completo
+            edge_fraction: La caja se recalcula cuando un punto clave queda a menos de esta fracción
+                           de su ancho o alto del borde
+            resize_threshold: La caja se recalcula cuando el tamaño necesario cambia más que esta
+                              fracción respecto al actual
+        """
+        self.margin = margin
+        self.min_size = min_size
+        self.max_area_ratio = max_area_ratio
+        self.edge_fraction = edge_fraction
+        self.resize_threshold = resize_threshold
+        self.box = None  # (x0, y0, x1, y1) en píxeles del frame completo, None = frame completo
+
+        # Contadores de rendimiento
+        self.cropped_frames = 0
+        self.full_frames = 0
+
+    def crop(self, image):
+        """
+        Recorta la región de interés actual
+        Args:
+            image: Imagen completa (H, W, 3)
+        Returns:
+            tuple: (recorte, caja) - el recorte es una vista de la imagen; caja es None si se usa
+                   el frame completo
+        """
+        if self.box is None:
+            self.full_frames += 1
+            return image, None
+
+        x0, y0, x1, y1 = self.box
+        self.cropped_frames += 1
+        return image[y0:y1, x0:x1], self.box
+
+    def update(self, landmarks, image_shape):
+        """
+        Calcula la región para el siguiente frame
+        Args:
+            landmarks: Arreglo (33, 4) en coordenadas del frame completo, o None si se perdió la pose
+            image_shape: Forma de la imagen completa
+        """
+        if landmarks is None:
+            self.reset()
+            return
+
+        height, width = image_shape[:2]
+
+        # Caja de los puntos clave (las caderas fuera de cuadro se recortan al borde)
+        points = np.clip(landmarks[KEY_POINT_INDICES, :2], 0.0, 1.0) * (width, height)
+        target = self._target_box(points, width, height)
+
+        # Histéresis: se conserva la caja actual si aún contiene holgadamente el cuerpo
+        if self.box is not None and target is not None and self._keeps_box(points, target, width, height):
+            return
+        self.box = target
+
+    def _target_box(self, points, width, height):
+        """
+        Caja con margen alrededor de los puntos clave
+        Returns:
+            tuple: (x0, y0, x1, y1) en píxeles, o None si casi cubre el frame completo
+        """
+        (left, top), (right, bottom) = points.min(axis=0), points.max(axis=0)
+
+        box_width = max(right - left, self.min_size)
+        box_height = max(bottom - top, self.min_size)
+        center_x, center_y = (left + right) / 2, (top + bottom) / 2
+        half_width = box_width * (0.5 + self.margin)
+        half_height = box_height * (0.5 + self.margin)
+
+        x0 = int(max(center_x - half_width, 0))
+        y0 = int(max(center_y - half_height, 0))
+        x1 = int(min(center_x + half_width, width))
+        y1 = int(min(center_y + half_height, height))
+
+        # Recorte casi igual al frame completo: no compensa
+        if (x1 - x0) * (y1 - y0) > self.max_area_ratio * width * height:
+            return None
+        return x0, y0, x1, y1
+
+    def _keeps_box(self, points, target, width, height):
+        """
+        Indica si la caja actual sigue sirviendo: puntos clave lejos de sus bordes (salvo los bordes
+        del frame) y tamaño parecido al necesario
+        """
+        x0, y0, x1, y1 = self.box
+        box_width, box_height = x1 - x0, y1 - y0
+        target_width, target_height = target[2] - target[0], target[3] - target[1]
+        if (abs(target_width - box_width) > self.resize_threshold * box_width
+                or abs(target_height - box_height) > self.resize_threshold * box_height):
+            return False
+
+        # Un borde de la caja que coincide con el del frame no limita (los puntos ya se recortaron a él)
+        edge_x, edge_y = self.edge_fraction * box_width, self.edge_fraction * box_height
+        (left, top), (right, bottom) = points.min(axis=0), points.max(axis=0)
+        return ((x0 == 0 or left >= x0 + edge_x)
+                and (y0 == 0 or top >= y0 + edge_y)
+                and (x1 == width or right <= x1 - edge_x)
+                and (y1 == height or bottom <= y1 - edge_y))
+
+    def to_frame(self, landmarks, box, image_shape):
+        """
+        Convierte landmarks normalizados al recorte en landmarks normalizados al frame completo
+        Args:
+            landmarks: Arreglo (33, 4) relativo al recorte
+            box: Caja usada en crop() (None = frame completo, sin cambios)
+            image_shape: Forma de la imagen completa
+        """
+        if box is None:
+            return landmarks
+
+        height, width = image_shape[:2]
+        x0, y0, x1, y1 = box
+        crop_width, crop_height = x1 - x0, y1 - y0
+
+        mapped = landmarks.copy()
+        mapped[:, 0] = (x0 + landmarks[:, 0] * crop_width) / width
+        mapped[:, 1] = (y0 + landmarks[:, 1] * crop_height) / height
+        mapped[:, 2] = landmarks[:, 2] * crop_width / width  # z usa la escala de x
+        return mapped
+
+    def reset(self):
+        """Vuelve al frame completo"""
+        self.box = None
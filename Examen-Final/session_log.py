@@ -0,0 +1,141 @@
+"""
+Registro de eventos de la sesión en disco (JSON por línea, solo se agrega)
+Cada cambio de estado, problema, alerta y calibración se encola desde el bucle de video y un
+hilo escritor los guarda por lotes; si el programa se interrumpe, la sesión se reconstruye
+reproduciendo el registro
+
+Eventos (campo 'type'; todos llevan la marca de tiempo 't'):
+    session_start  - source: nombre de la fuente de video (None en registros antiguos)
+    session_end, reset
+    state          - state: 'good' / 'bad'
+    issue_start    - issue
+    issue_end      - issue, frames (frames con el problema durante mala postura)
+    alert
+    calibration_start
+    calibration    - perfil del modelo y referencia de calibración (CalibrationBaseline.to_dict)
+    heartbeat      - open_issues: {problema: frames} de los problemas aún abiertos
+
+Uso:
+    python session_log.py estadisticas/session_camara_0_20250701_101500.jsonl
+"""
+
+import json
+import queue
+import threading
+import time
+
+_STOP = object()  # Marca de cierre en la cola del escritor
+
+
+class SessionLogWriter:
+    """
+    Escritor en segundo plano: el bucle de video solo encola, el hilo escribe y vacía por lotes
+    """
+
+    def __init__(self, path, flush_interval=1.0):
+        """
+        Inicializa el escritor y su hilo
+        Args:
+            path: Archivo .jsonl (se agrega al final si ya existe)
+            flush_interval: Segundos entre lotes escritos a disco
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.queue = queue.SimpleQueue()
+        self.file = open(path, 'a', encoding='utf-8')
+        self._closing = threading.Event()
+
+        # Contadores
+        self.events_written = 0
+        self.batches_written = 0
+
+        self.thread = threading.Thread(target=self._writer_loop, name="SessionLogWriter", daemon=True)
+        self.thread.start()
+
+    def write(self, event):
+        """
+        Encola un evento (dict serializable a JSON); no bloquea
+        """
+        self.queue.put(event)
+
+    def _writer_loop(self):
+        """Escribe los eventos encolados en lotes hasta recibir la marca de cierre"""
+        while True:
+            try:
+                events = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+
+            # Tomar todo lo acumulado desde el último lote
+            while True:
+                try:
+                    events.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(event is _STOP for event in events)
+            lines = [json.dumps(event, ensure_ascii=False) + '\n' for event in events if event is not _STOP]
+            if lines:
+                self.file.write(''.join(lines))
+                self.file.flush()
+                self.events_written += len(lines)
+                self.batches_written += 1
+
+            if stop:
+                return
+
+            # Acumular el siguiente lote (se interrumpe al cerrar)
+            self._closing.wait(self.flush_interval)
+
+    def close(self):
+        """Escribe los eventos pendientes y cierra el archivo"""
+        if self.file is None:
+            return
+
+        self._closing.set()
+        self.queue.put(_STOP)
+        self.thread.join()
+        self.file.close()
+        self.file = None
+
+
+def read_session_log(path):
+    """
+    Lee los eventos de un registro
+    Yields:
+        dict: Eventos en orden; una última línea incompleta (interrupción al escribir) se ignora
+    """
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                print(f"⚠️  Línea incompleta ignorada en {path}")
+
+
+def main():
+    """
+    Reconstruye y muestra el resumen de una sesión a partir de su registro
+    """
+    import argparse
+    from posture_statistics import PostureStatistics
+
+    parser = argparse.ArgumentParser(description="Resumen de una sesión a partir de su registro de eventos")
+    parser.add_argument('log', help="Archivo .jsonl de la sesión")
+    parser.add_argument('--export', action='store_true', help="Exportar también el resumen a CSV")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    statistics = PostureStatistics.from_log(args.log)
+    print(f"🎞️  Registro reproducido en {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    statistics.print_summary()
+    if args.export:
+        statistics.export_to_csv()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""
+Historial de sesiones en SQLite
+Cada sesión terminada se guarda con sus problemas y se acumula en tablas pre-agregadas por hora y
+por día, para consultar semanas de historial por usuario sin recorrer sesión por sesión
+
+Uso:
+    python session_store.py --hourly --days 30 --user ana
+    python session_store.py --top-issues --days 7
+    python session_store.py --import-log estadisticas/session_camara_0_20250701_101500.jsonl --user ana
+"""
+
+import argparse
+import getpass
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    source TEXT,
+    start REAL NOT NULL,
+    end REAL NOT NULL,
+    good_time REAL NOT NULL,
+    bad_time REAL NOT NULL,
+    alert_count INTEGER NOT NULL,
+    profile TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_user_start ON sessions (user, start);
+CREATE INDEX IF NOT EXISTS idx_sessions_start ON sessions (start);
+
+CREATE TABLE IF NOT EXISTS session_issues (
+    session_id INTEGER NOT NULL REFERENCES sessions (id) ON DELETE CASCADE,
+    issue TEXT NOT NULL,
+    frames INTEGER NOT NULL,
+    PRIMARY KEY (session_id, issue)
+);
+
+-- Pre-agregados: segundos de buena/mala postura por usuario y hora
+CREATE TABLE IF NOT EXISTS hourly_rollup (
+    user TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    good_time REAL NOT NULL DEFAULT 0,
+    bad_time REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (user, hour)
+);
+CREATE INDEX IF NOT EXISTS idx_hourly_hour ON hourly_rollup (hour);
+
+-- Pre-agregados: frames con cada problema por usuario y día
+CREATE TABLE IF NOT EXISTS daily_issue_rollup (
+    user TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    issue TEXT NOT NULL,
+    frames INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user, day, issue)
+);
+CREATE INDEX IF NOT EXISTS idx_daily_issue_day ON daily_issue_rollup (day);
+"""
+
+# Una sesión se guarda una sola vez (p. ej. al importar dos veces el mismo registro)
+UNIQUE_SESSION_INDEX = """
+CREATE UNIQUE INDEX IF NOT EXISTS idx_sessions_unique ON sessions (user, IFNULL(source, ''), start)
+"""
+
+
+def split_by_hour(segments):
+    """
+    Reparte tramos de postura entre las horas que abarcan
+    Args:
+        segments: Iterable de (inicio, fin, es_mala)
+    Returns:
+        dict: {hora (epoch, múltiplo de 3600): [segundos buenos, segundos malos]}
+    """
+    hours = {}
+    for start, end, bad in segments:
+        while start < end:
+            hour = int(start // HOUR) * HOUR
+            chunk_end = min(end, hour + HOUR)
+            hours.setdefault(hour, [0.0, 0.0])[1 if bad else 0] += chunk_end - start
+            start = chunk_end
+    return hours
+
+
+def posture_segments(statistics):
+    """
+    Tramos (inicio, fin, es_mala) de una sesión a partir de la línea de tiempo de PostureStatistics.
+    Si la línea de tiempo perdió sus primeros cambios (búfer lleno), el tiempo faltante se reparte
+    en el hueco inicial con la proporción de la sesión
+    """
+    summary = statistics.get_statistics_summary(include_timeline=False)
+    end = statistics.session_end_time or statistics.clock()
+    timeline = statistics.get_posture_timeline()
+
+    segments = []
+    for i, (start, state) in enumerate(timeline):
+        segment_end = timeline[i + 1][0] if i + 1 < len(timeline) else end
+        segments.append((start, segment_end, state == 'bad'))
+
+    # Tiempo no cubierto por la línea de tiempo
+    missing_good = summary['good_posture_time'] - sum(e - s for s, e, bad in segments if not bad)
+    missing_bad = summary['bad_posture_time'] - sum(e - s for s, e, bad in segments if bad)
+    gap_start = statistics.session_start_time
+    gap_end = timeline[0][0] if timeline else end
+    missing = missing_good + missing_bad
+    if missing > 1.0 and gap_end > gap_start:
+        split = gap_start + (gap_end - gap_start) * max(missing_good, 0.0) / missing
+        segments.insert(0, (split, gap_end, True))
+        segments.insert(0, (gap_start, split, False))
+
+    return segments
+
+
+class SessionStore:
+    """
+    Base de datos local de sesiones con consultas por rango de tiempo y usuario
+    """
+
+    def __init__(self, path=os.path.join("estadisticas", "sessions.db")):
+        """
+        Abre (o crea) la base de datos
+        Args:
+            path: Archivo SQLite
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        # Varios procesos (stream_pool.py) pueden guardar a la vez: esperar el bloqueo
+        self.connection = sqlite3.connect(path, timeout=30.0)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(SCHEMA)
+        try:
+            self.connection.execute(UNIQUE_SESSION_INDEX)
+        except sqlite3.IntegrityError:
+            # Base creada antes del índice y con sesiones repetidas: se guarda igual, sin deduplicar
+            print("⚠️  El historial tiene sesiones repetidas; no se podrán detectar importaciones duplicadas")
+
+    def add_session(self, statistics, user, source=None, profile=None):
+        """
+        Guarda una sesión terminada y actualiza los pre-agregados en una sola transacción
+        Args:
+            statistics: PostureStatistics de la sesión (después de end_session)
+            user: Usuario de la sesión
+            source: Fuente de video
+            profile: Perfil del modelo
+        Returns:
+            int: Identificador de la sesión (el de la ya guardada si se repite usuario, fuente e inicio;
+                 en ese caso los pre-agregados no se modifican)
+        """
+        if statistics.session_start_time is None:
+            raise ValueError("La sesión no tiene inicio")
+
+        summary = statistics.get_statistics_summary(include_timeline=False)
+        start = statistics.session_start_time
+        end = statistics.session_end_time or statistics.clock()
+        day = int(start // DAY) * DAY
+        hours = split_by_hour(posture_segments(statistics))
+
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT OR IGNORE INTO sessions (user, source, start, end, good_time, bad_time, alert_count, profile) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (user, source, start, end, summary['good_posture_time'], summary['bad_posture_time'],
+                 summary['alert_count'], profile))
+            if cursor.rowcount == 0:
+                # Ya guardada: no sumar dos veces a los pre-agregados
+                row = self.connection.execute(
+                    "SELECT id FROM sessions WHERE user = ? AND IFNULL(source, '') = IFNULL(?, '') AND start = ?",
+                    (user, source, start)).fetchone()
+                print(f"ℹ️  La sesión ya estaba guardada (id {row[0]}), se omite")
+                return row[0]
+            session_id = cursor.lastrowid
+
+            self.connection.executemany(
+                "INSERT INTO session_issues (session_id, issue, frames) VALUES (?, ?, ?)",
+                [(session_id, issue, frames) for issue, frames in summary['problem_counts'].items()])
+
+            self.connection.executemany(
+                "INSERT INTO hourly_rollup (user, hour, good_time, bad_time) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (user, hour) DO UPDATE SET good_time = good_time + excluded.good_time, "
+                "bad_time = bad_time + excluded.bad_time",
+                [(user, hour, good, bad) for hour, (good, bad) in hours.items()])
+
+            self.connection.executemany(
+                "INSERT INTO daily_issue_rollup (user, day, issue, frames) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (user, day, issue) DO UPDATE SET frames = frames + excluded.frames",
+                [(user, day, issue, frames) for issue, frames in summary['problem_counts'].items()])
+
+        return session_id
+
+    def import_log(self, log_path, user, source=None):
+        """
+        Guarda una sesión reconstruida desde su registro de eventos (session_log.py)
+        La fuente por defecto es la registrada en session_start, la misma con la que el sistema guardó
+        la sesión en vivo: importar el registro de una sesión ya guardada no la duplica
+        """
+        from posture_statistics import PostureStatistics
+
+        statistics = PostureStatistics.from_log(log_path)
+        return self.add_session(statistics, user, source or statistics.source or os.path.basename(log_path))
+
+    def hourly_bad_percentage(self, days=30, user=None, now=None):
+        """
+        Porcentaje de mala postura por hora en los últimos días (desde los pre-agregados)
+        Returns:
+            list: [(hora datetime, porcentaje de mala postura, segundos observados)]
+        """
+        since = (now or time.time()) - days * DAY
+        query = ("SELECT hour, SUM(good_time), SUM(bad_time) FROM hourly_rollup WHERE hour >= ?"
+                 + (" AND user = ?" if user else "") + " GROUP BY hour ORDER BY hour")
+        params = (since - since % HOUR, user) if user else (since - since % HOUR,)
+
+        rows = []
+        for hour, good, bad in self.connection.execute(query, params):
+            total = good + bad
+            rows.append((datetime.fromtimestamp(hour), bad / total * 100 if total else 0.0, total))
+        return rows
+
+    def top_issues(self, days=30, user=None, limit=5, now=None):
+        """
+        Problemas más frecuentes en los últimos días (desde los pre-agregados)
+        Returns:
+            list: [(usuario, problema, frames)] ordenado por frames, por usuario si user es None
+        """
+        since = (now or time.time()) - days * DAY
+        query = ("SELECT user, issue, SUM(frames) AS total FROM daily_issue_rollup WHERE day >= ?"
+                 + (" AND user = ?" if user else "")
+                 + " GROUP BY user, issue ORDER BY user, total DESC")
+        params = (since - since % DAY, user) if user else (since - since % DAY,)
+
+        result, per_user = [], {}
+        for row_user, issue, frames in self.connection.execute(query, params):
+            per_user[row_user] = per_user.get(row_user, 0) + 1
+            if per_user[row_user] <= limit:
+                result.append((row_user, issue, frames))
+        return result
+
+    def recent_sessions(self, user=None, limit=20):
+        """
+        Últimas sesiones guardadas
+        Returns:
+            list: [(id, usuario, fuente, inicio datetime, duración s, % mala postura, alertas)]
+        """
+        query = ("SELECT id, user, source, start, end, good_time, bad_time, alert_count FROM sessions"
+                 + (" WHERE user = ?" if user else "") + " ORDER BY start DESC LIMIT ?")
+        params = (user, limit) if user else (limit,)
+
+        rows = []
+        for session_id, row_user, source, start, end, good, bad, alerts in self.connection.execute(query, params):
+            duration = end - start
+            rows.append((session_id, row_user, source, datetime.fromtimestamp(start), duration,
+                         bad / duration * 100 if duration > 0 else 0.0, alerts))
+        return rows
+
+    def close(self):
+        """Cierra la base de datos"""
+        self.connection.close()
+
+
+def default_user():
+    """Usuario del sistema operativo"""
+    try:
+        return getpass.getuser()
+    except Exception:
+        return "usuario"
+
+
+def main():
+    """
+    Consultas del historial desde la línea de comandos
+    """
+    parser = argparse.ArgumentParser(description="Historial de sesiones de postura")
+    parser.add_argument('--db', default=os.path.join("estadisticas", "sessions.db"), help="Base de datos")
+    parser.add_argument('--user', help="Filtrar por usuario (o usuario al importar)")
+    parser.add_argument('--days', type=int, default=30, help="Días hacia atrás")
+    parser.add_argument('--hourly', action='store_true', help="Porcentaje de mala postura por hora")
+    parser.add_argument('--top-issues', action='store_true', help="Problemas más frecuentes por usuario")
+    parser.add_argument('--import-log', metavar='SESION.jsonl', help="Importar una sesión desde su registro")
+    args = parser.parse_args()
+
+    store = SessionStore(args.db)
+
+    if args.import_log:
+        session_id = store.import_log(args.import_log, args.user or default_user())
+        print(f"💾 Sesión importada con id {session_id}")
+
+    if args.hourly:
+        print(f"🕒 Mala postura por hora (últimos {args.days} días)")
+        for hour, bad_percentage, total in store.hourly_bad_percentage(args.days, args.user):
+            print(f"   {hour:%Y-%m-%d %H:00}  {bad_percentage:5.1f}%  ({total / 60:.0f} min)")
+
+    if args.top_issues:
+        print(f"🔍 Problemas más frecuentes (últimos {args.days} días)")
+        for user, issue, frames in store.top_issues(args.days, args.user):
+            print(f"   {user}: {issue} ({frames} frames)")
+
+    if not (args.import_log or args.hourly or args.top_issues):
+        print("📋 Últimas sesiones")
+        for session_id, user, source, start, duration, bad_percentage, alerts in store.recent_sessions(args.user):
+            print(f"   #{session_id} {user} {start:%Y-%m-%d %H:%M} {source}: {duration / 60:.0f} min, "
+                  f"{bad_percentage:.1f}% mala postura, {alerts} alertas")
+
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
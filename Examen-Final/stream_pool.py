@@ -0,0 +1,204 @@
+"""
+Procesamiento en paralelo de varias fuentes de video
+Un supervisor reparte las fuentes entre procesos trabajadores; cada trabajador crea su propio
+PostureAnalysisSystem sin interfaz (con su PostureDetector y su calibración) y devuelve las
+estadísticas y el rendimiento por una cola
+
+Uso:
+    python stream_pool.py puesto1.mp4 puesto2.mp4 capturas/ --workers 4 --output-dir resultados/
+"""
+
+import argparse
+import contextlib
+import hashlib
+import multiprocessing
+import os
+import queue
+import time
+
+
+def source_label(source):
+    """
+    Nombre único de una fuente para sus archivos de salida: nombre base más un hash de la ruta
+    completa (cam1/video.mp4 y cam2/video.mp4 no comparten archivos)
+    """
+    path = os.path.abspath(os.path.normpath(source))
+    name = os.path.splitext(os.path.basename(path))[0]
+    return f"{name}_{hashlib.sha1(path.encode('utf-8')).hexdigest()[:8]}"
+
+
+def _process_source(worker_id, source, options, result_queue):
+    """
+    Procesa una fuente completa dentro de un trabajador
+    """
+    from main import PostureAnalysisSystem
+
+    def report_progress(frames, fps):
+        result_queue.put(('progress', worker_id, source, {'frames': frames, 'fps': fps}))
+
+    system = PostureAnalysisSystem(source=source, headless=True, output_dir=options['output_dir'],
+                                   mirror=options['mirror'], image_fps=options['image_fps'], profile='full',
+                                   user=options['user'], source_name=source_label(source))
+    system.progress_callback = report_progress
+    if not system.run():
+        # run() informa el error en lugar de lanzarlo: el supervisor debe contarlo como fuente con error
+        raise RuntimeError(system.error)
+
+    return {
+        'source': source,
+        'frames': system.frames_processed,
+        'elapsed': system.processing_time,
+        'fps': system.frames_processed / system.processing_time if system.processing_time > 0 else 0.0,
+        'statistics': system.statistics.get_statistics_summary(include_timeline=False)
+    }
+
+
+def _worker_main(worker_id, task_queue, result_queue, options):
+    """
+    Bucle de un proceso trabajador: toma fuentes de la cola hasta recibir None
+    """
+    import cv2
+
+    # Un hilo de OpenCV por proceso: el paralelismo lo dan los procesos
+    cv2.setNumThreads(1)
+
+    log_dir = os.path.join(options['output_dir'], 'logs')
+    os.makedirs(log_dir, exist_ok=True)
+
+    while True:
+        source = task_queue.get()
+        if source is None:
+            break
+
+        log_path = os.path.join(log_dir, f"{source_label(source)}.log")
+
+        try:
+            # La salida detallada de cada fuente va a su propio log
+            with open(log_path, 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log):
+                result = _process_source(worker_id, source, options, result_queue)
+            result_queue.put(('done', worker_id, source, result))
+        except Exception as e:
+            result_queue.put(('error', worker_id, source, str(e)))
+
+
+class StreamSupervisor:
+    """
+    Reparte N fuentes entre un grupo de procesos trabajadores y reúne sus resultados
+    """
+
+    def __init__(self, sources, workers=None, output_dir="estadisticas", mirror=True, image_fps=30.0,
+                 user=None):
+        """
+        Args:
+            sources: Lista de fuentes (archivos de video, carpetas de imágenes o índices de cámara)
+            workers: Número de procesos (por defecto uno por núcleo, sin exceder las fuentes)
+            output_dir: Carpeta de estadísticas, resultados por frame y logs
+            mirror: Espejo horizontal de los frames
+            image_fps: Tasa nominal para carpetas de imágenes
+            user: Usuario de las sesiones en el historial (por defecto, el del sistema)
+        """
+        self.sources = list(sources)
+        self.workers = min(workers or os.cpu_count() or 1, len(self.sources)) or 1
+        self.options = {'output_dir': output_dir, 'mirror': mirror, 'image_fps': image_fps, 'user': user}
+
+        self.results = []
+        self.errors = []
+        self.elapsed = 0.0
+        self.worker_totals = {}  # {worker_id: {'frames': n, 'elapsed': s, 'sources': n}}
+
+    def run(self):
+        """
+        Ejecuta todas las fuentes y espera a que terminen
+        Returns:
+            list: Resultados por fuente (frames, tiempo, FPS y resumen de estadísticas)
+        """
+        context = multiprocessing.get_context('spawn')  # Cada proceso con su propio grafo de MediaPipe
+        task_queue = context.Queue()
+        result_queue = context.Queue()
+
+        for source in self.sources:
+            task_queue.put(source)
+        for _ in range(self.workers):
+            task_queue.put(None)
+
+        print(f"🚀 Procesando {len(self.sources)} fuentes con {self.workers} procesos")
+        start = time.time()
+
+        processes = [context.Process(target=_worker_main, args=(i, task_queue, result_queue, self.options),
+                                     name=f"PostureWorker-{i}", daemon=True)
+                     for i in range(self.workers)]
+        for process in processes:
+            process.start()
+
+        pending = len(self.sources)
+        while pending:
+            try:
+                kind, worker_id, source, payload = result_queue.get(timeout=1.0)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    print("❌ Los trabajadores terminaron sin reportar todas las fuentes")
+                    break
+                continue
+
+            if kind == 'progress':
+                print(f"   [trabajador {worker_id}] {source}: {payload['frames']} frames ({payload['fps']:.1f} FPS)")
+                continue
+
+            pending -= 1
+            if kind == 'done':
+                self.results.append(payload)
+                totals = self.worker_totals.setdefault(worker_id, {'frames': 0, 'elapsed': 0.0, 'sources': 0})
+                totals['frames'] += payload['frames']
+                totals['elapsed'] += payload['elapsed']
+                totals['sources'] += 1
+                print(f"✅ [trabajador {worker_id}] {source}: {payload['frames']} frames en "
+                      f"{payload['elapsed']:.1f}s ({payload['fps']:.1f} FPS)")
+            else:
+                self.errors.append((source, payload))
+                print(f"❌ [trabajador {worker_id}] {source}: {payload}")
+
+        for process in processes:
+            process.join(timeout=5.0)
+
+        self.elapsed = time.time() - start
+        self.print_report()
+        return self.results
+
+    def print_report(self):
+        """Imprime el rendimiento por trabajador y total"""
+        total_frames = sum(result['frames'] for result in self.results)
+
+        print("\n" + "=" * 60)
+        print("📊 RENDIMIENTO DEL PROCESAMIENTO EN PARALELO")
+        print("=" * 60)
+        for worker_id, totals in sorted(self.worker_totals.items()):
+            fps = totals['frames'] / totals['elapsed'] if totals['elapsed'] > 0 else 0.0
+            print(f"   • Trabajador {worker_id}: {totals['sources']} fuentes, "
+                  f"{totals['frames']} frames, {fps:.1f} FPS")
+        if self.elapsed > 0:
+            print(f"⚡ Total: {total_frames} frames en {self.elapsed:.1f}s ({total_frames / self.elapsed:.1f} FPS)")
+        if self.errors:
+            print(f"⚠️  {len(self.errors)} fuentes con error")
+        print("=" * 60)
+
+
+def main():
+    """
+    Función principal
+    """
+    parser = argparse.ArgumentParser(description="Análisis de postura en paralelo sobre varias fuentes")
+    parser.add_argument('sources', nargs='+', help="Archivos de video, carpetas de imágenes o índices de cámara")
+    parser.add_argument('--workers', type=int, default=None, help="Número de procesos (por defecto, núcleos)")
+    parser.add_argument('--output-dir', default="estadisticas", help="Carpeta de resultados")
+    parser.add_argument('--no-mirror', action='store_true', help="No aplicar espejo horizontal a los frames")
+    parser.add_argument('--image-fps', type=float, default=30.0, help="Tasa nominal para carpetas de imágenes")
+    parser.add_argument('--user', default=None, help="Usuario de las sesiones en el historial")
+    args = parser.parse_args()
+
+    supervisor = StreamSupervisor(args.sources, workers=args.workers, output_dir=args.output_dir,
+                                  mirror=not args.no_mirror, image_fps=args.image_fps, user=args.user)
+    supervisor.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Pruebas de PostureDetector.evaluate_batch: debe coincidir frame a frame con analyze_landmarks
+"""
+
+import numpy as np
+import pytest
+from benchmark import synthetic_session
+from posture_detector import PostureDetector
+
+
+def calibrated_detector(landmarks, timestamps):
+    """Detector sin MediaPipe calibrado con los primeros frames; retorna el índice del primer frame analizado"""
+    detector = PostureDetector(enable_inference=False)
+    index = 0
+    while not detector.is_calibrated:
+        detector.analyze_landmarks(landmarks[index], timestamps[index])
+        index += 1
+    return detector, index
+
+
+def live_results(detector, landmarks, timestamps):
+    """Problemas y veredicto suavizado del camino por frame (NaN = sin pose)"""
+    issue_names = [issue for issue, _ in detector.posture_checks]
+    issues = np.zeros((len(landmarks), len(issue_names)), dtype=bool)
+    smoothed = np.zeros(len(landmarks), dtype=bool)
+    for i, (frame, timestamp) in enumerate(zip(landmarks, timestamps)):
+        frame = None if np.isnan(frame).any() else frame
+        smoothed[i], posture_issues, _ = detector.analyze_landmarks(frame, timestamp)
+        for issue in posture_issues:
+            issues[i, issue_names.index(issue)] = True
+    return issues, smoothed
+
+
+@pytest.fixture
+def session():
+    return synthetic_session(calibration_frames=90, good_frames=120, bad_frames=120, seed=1)
+
+
+def test_requires_calibration():
+    detector = PostureDetector(enable_inference=False)
+    with pytest.raises(ValueError):
+        detector.evaluate_batch(np.zeros((2, 33, 4)))
+
+
+def test_rejects_wrong_shape(session):
+    landmarks, timestamps, _ = session
+    detector, _ = calibrated_detector(landmarks, timestamps)
+    with pytest.raises(ValueError):
+        detector.evaluate_batch(np.zeros((2, 7, 3)))
+
+
+def test_matches_per_frame_path(session):
+    landmarks, timestamps, expected_bad = session
+    detector, start = calibrated_detector(landmarks, timestamps)
+    landmarks, timestamps = landmarks[start:], timestamps[start:]
+
+    batch = detector.evaluate_batch(landmarks, timestamps=timestamps)
+    issues, smoothed = live_results(detector, landmarks, timestamps)
+
+    np.testing.assert_array_equal(batch['issues'], issues)
+    np.testing.assert_array_equal(batch['smoothed_bad_posture'], smoothed)
+    assert batch['measurements'].shape == (len(landmarks), len(batch['measurement_names']))
+    # La sesión sintética se detecta como mala solo en su segmento malo
+    assert smoothed[expected_bad[start:]].mean() > 0.9
+    assert not smoothed[~expected_bad[start:]].any()
+
+
+def test_matches_per_frame_path_with_gaps_and_variable_rate(session):
+    landmarks, timestamps, _ = session
+    detector, start = calibrated_detector(landmarks, timestamps)
+    landmarks = landmarks[start:].copy()
+
+    # Tramos a 30 Hz y a 5 Hz (inferencia adaptativa) y frames sin pose
+    intervals = np.where((np.arange(len(landmarks)) // 40) % 2 == 0, 1 / 30, 1 / 5)
+    timestamps = timestamps[start] + np.cumsum(intervals)
+    landmarks[[10, 11, 75, 150]] = np.nan
+
+    batch = detector.evaluate_batch(landmarks, timestamps=timestamps)
+    issues, smoothed = live_results(detector, landmarks, timestamps)
+
+    assert not batch['has_pose'][[10, 11, 75, 150]].any()
+    np.testing.assert_array_equal(batch['issues'], issues)
+    np.testing.assert_array_equal(batch['smoothed_bad_posture'], smoothed)
+
+
+def test_smoothing_ignores_isolated_verdict_at_low_rate():
+    detector = PostureDetector(enable_inference=False)
+    bad = np.zeros(20, dtype=bool)
+    bad[12] = True
+    timestamps = np.arange(20) * 0.2  # 5 Hz: la ventana de tiempo tendría un solo veredicto
+
+    smoothed = detector.smooth_bad_posture(bad, timestamps)
+    assert not smoothed[detector.MIN_HISTORY_SAMPLES:].any()
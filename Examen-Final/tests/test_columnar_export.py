@@ -0,0 +1,69 @@
+"""
+Pruebas de la exportación columnar por frame
+"""
+
+import json
+import numpy as np
+from columnar_export import SCHEMA_FILE, ColumnarFrameExporter, issue_column, load_frame_columns
+from posture_analysis import MEASUREMENT_NAMES
+
+ISSUES = ["Cabeza muy adelantada", "Columna encorvada", "Cuerpo inclinado hacia adelante"]
+
+
+def test_empty_session(tmp_path):
+    exporter = ColumnarFrameExporter(str(tmp_path / "sesion"), ISSUES)
+    exporter.close()
+
+    columns, schema = load_frame_columns(str(tmp_path / "sesion"))
+    assert schema['frame_count'] == 0
+    assert set(columns) == set(schema['columns'])
+    assert all(len(column) == 0 for column in columns.values())
+
+
+def test_frames_round_trip(tmp_path):
+    directory = str(tmp_path / "sesion")
+    exporter = ColumnarFrameExporter(directory, ISSUES, chunk_size=2)
+    measurements = np.arange(len(MEASUREMENT_NAMES), dtype=np.float64)
+
+    exporter.append(10.0, None, [], False, calibrating=True)
+    exporter.append(10.1, measurements, ["Columna encorvada", "Otro"], True, calibrating=False)
+    exporter.append(10.2, measurements + 1, [], False, calibrating=False, inferred=False)
+    assert len(exporter) == 3
+    exporter.close()
+    exporter.close()  # Cerrar dos veces no falla
+
+    columns, schema = load_frame_columns(directory)
+    assert schema['frame_count'] == 3
+    assert schema['issue_names'] == ISSUES
+    assert columns['timestamp'].tolist() == [10.0, 10.1, 10.2]
+    assert columns['has_pose'].tolist() == [0, 1, 1]
+    assert columns['calibrating'].tolist() == [1, 0, 0]
+    assert columns['inferred'].tolist() == [1, 1, 0]
+    assert columns['bad_posture'].tolist() == [0, 1, 0]
+
+    first = MEASUREMENT_NAMES[0]
+    assert np.isnan(columns[first][0])
+    assert columns[first][1:].tolist() == [0.0, 1.0]
+    assert columns[MEASUREMENT_NAMES[-1]][1] == len(MEASUREMENT_NAMES) - 1
+
+    # Los problemas desconocidos se ignoran
+    assert columns[issue_column(0)].tolist() == [0, 0, 0]
+    assert columns[issue_column(1)].tolist() == [0, 1, 0]
+    assert columns[issue_column(2)].tolist() == [0, 0, 0]
+
+
+def test_interrupted_session_is_trimmed_to_common_length(tmp_path):
+    directory = str(tmp_path / "sesion")
+    exporter = ColumnarFrameExporter(directory, ISSUES, chunk_size=4)
+    for i in range(6):
+        exporter.append(float(i), None, [], False, calibrating=False)
+    # Una columna alcanzó a vaciarse más que las demás
+    exporter.writers['timestamp'].flush()
+
+    columns, schema = load_frame_columns(directory)
+    assert schema['frame_count'] == 0  # El esquema solo se actualiza al cerrar
+    assert {len(column) for column in columns.values()} == {4}
+    assert columns['timestamp'].tolist() == [0.0, 1.0, 2.0, 3.0]
+
+    with open(tmp_path / "sesion" / SCHEMA_FILE, encoding='utf-8') as f:
+        assert json.load(f)['columns'] == exporter.columns
@@ -0,0 +1,87 @@
+"""
+Pruebas de la captura en hilo propio: ranura del frame más reciente y medición de la lectura
+"""
+
+import threading
+import time
+from frame_grabber import FrameGrabber, LatestFrameSlot
+from profiler import StageProfiler
+
+
+class ListSource:
+    """Fuente que entrega una lista de frames y luego termina"""
+
+    def __init__(self, frames, delay=0.0):
+        self.frames = list(frames)
+        self.delay = delay
+
+    def read(self):
+        time.sleep(self.delay)
+        if not self.frames:
+            return False, None, None
+        frame = self.frames.pop(0)
+        return True, frame, float(frame)
+
+
+def test_latest_frame_wins():
+    slot = LatestFrameSlot()
+    assert slot.put("a", 1.0) is False
+    assert slot.put("b", 2.0) is True
+
+    assert slot.get(timeout=0) == (2, "b", 2.0)
+    assert slot.frames_dropped == 1
+    assert slot.frames_taken == 1
+
+
+def test_get_times_out_when_empty():
+    slot = LatestFrameSlot()
+    start = time.perf_counter()
+    assert slot.get(timeout=0.05) is None
+    assert time.perf_counter() - start >= 0.04
+
+
+def test_spurious_wakeup_keeps_waiting():
+    slot = LatestFrameSlot()
+    result = []
+    consumer = threading.Thread(target=lambda: result.append(slot.get(timeout=2.0)))
+    consumer.start()
+
+    # Despertar sin frame: el consumidor debe seguir esperando
+    time.sleep(0.05)
+    with slot._condition:
+        slot._condition.notify_all()
+    time.sleep(0.05)
+    assert consumer.is_alive()
+
+    slot.put("frame", 1.0)
+    consumer.join(timeout=1.0)
+    assert result == [(1, "frame", 1.0)]
+
+
+def test_close_wakes_consumer():
+    slot = LatestFrameSlot()
+    threading.Timer(0.05, slot.close).start()
+    assert slot.get(timeout=2.0) is None
+    assert slot.closed
+
+
+def test_grabber_records_camera_read_as_capture():
+    profiler = StageProfiler()
+    grabber = FrameGrabber(ListSource(range(3), delay=0.01), profiler=profiler)
+    grabber.start()
+
+    frames = []
+    while True:
+        ret, frame, _ = grabber.read(timeout=1.0)
+        if not ret:
+            if grabber.running:
+                continue
+            break
+        frames.append(frame)
+    grabber.stop()
+
+    assert frames and frames[-1] == 2
+    assert grabber.failed
+    capture = profiler.summary()['capture']
+    assert capture['count'] == 4  # Tres frames y la lectura final sin frame
+    assert capture['mean_ms'] >= 9.0
@@ -0,0 +1,112 @@
+"""
+Pruebas de InferenceScheduler: paso a modo estable y regreso a tasa completa
+"""
+
+import numpy as np
+import pytest
+from inference_scheduler import InferenceScheduler
+from posture_analysis import KEY_POINT_INDICES
+
+GOOD = ()
+BAD = ("Columna encorvada",)
+
+
+def pose(offset=0.0):
+    """Landmarks (33, 4) fijos, con los puntos clave desplazados en x"""
+    landmarks = np.full((33, 4), 0.5)
+    landmarks[KEY_POINT_INDICES, 0] += offset
+    return landmarks
+
+
+def make_stable(scheduler, start=0.0, verdict=GOOD):
+    """Inferencias a 30 Hz con el mismo veredicto hasta entrar en modo estable; retorna el último instante"""
+    timestamp = start
+    for i in range(scheduler.verdicts.maxlen):
+        timestamp = start + i / 30
+        assert scheduler.should_infer(timestamp)
+        scheduler.update(timestamp, pose(), verdict)
+    return timestamp
+
+
+def test_starts_at_full_rate():
+    scheduler = InferenceScheduler()
+    assert not scheduler.stable
+    assert scheduler.scale == 1.0
+    assert scheduler.should_infer(0.0)
+
+
+def test_becomes_stable_after_matching_verdicts():
+    scheduler = InferenceScheduler(stable_verdicts=5)
+    for i in range(4):
+        scheduler.update(i / 30, pose(), GOOD)
+        assert not scheduler.stable
+    scheduler.update(4 / 30, pose(), GOOD)
+
+    assert scheduler.stable
+    assert scheduler.scale == scheduler.stable_scale
+
+
+def test_stable_mode_infers_at_reduced_rate():
+    scheduler = InferenceScheduler(stable_verdicts=5, stable_interval=0.2)
+    last = make_stable(scheduler)
+
+    assert not scheduler.should_infer(last + 0.1)
+    assert scheduler.should_infer(last + 0.2)
+
+
+@pytest.mark.parametrize("landmarks, verdict", [
+    (pose(0.05), GOOD),   # Movimiento mayor que motion_threshold
+    (pose(), BAD),        # Cambio de veredicto
+    (None, None),         # Sin pose
+    (pose(), None)        # Sin análisis (calibrando)
+])
+def test_returns_to_full_rate(landmarks, verdict):
+    scheduler = InferenceScheduler(stable_verdicts=5)
+    last = make_stable(scheduler)
+
+    scheduler.update(last + 0.2, landmarks, verdict)
+    assert not scheduler.stable
+    assert scheduler.scale == 1.0
+    assert scheduler.should_infer(last + 0.21)
+
+
+def test_small_motion_keeps_stable_mode():
+    scheduler = InferenceScheduler(stable_verdicts=5, motion_threshold=0.02)
+    last = make_stable(scheduler)
+
+    scheduler.update(last + 0.2, pose(0.01), GOOD)
+    assert scheduler.stable
+
+
+def test_new_segment_needs_full_count_again():
+    scheduler = InferenceScheduler(stable_verdicts=5)
+    last = make_stable(scheduler)
+    scheduler.update(last + 0.2, pose(), BAD)
+
+    for i in range(3):
+        scheduler.update(last + 0.3 + i / 30, pose(), BAD)
+    assert not scheduler.stable
+    scheduler.update(last + 0.5, pose(), BAD)
+    assert scheduler.stable
+
+
+def test_drift_is_measured_from_segment_start():
+    scheduler = InferenceScheduler(stable_verdicts=5, motion_threshold=0.02)
+    last = make_stable(scheduler)
+
+    # Pasos pequeños que se acumulan más allá del umbral
+    scheduler.update(last + 0.2, pose(0.015), GOOD)
+    assert scheduler.stable
+    scheduler.update(last + 0.4, pose(0.03), GOOD)
+    assert not scheduler.stable
+
+
+def test_counters():
+    scheduler = InferenceScheduler()
+    assert scheduler.get_counters()['inference_ratio'] == 1.0
+
+    scheduler.update(0.0, pose(), GOOD)
+    scheduler.skip()
+    scheduler.skip()
+    scheduler.skip()
+    assert scheduler.get_counters() == {'inferred': 1, 'skipped': 3, 'inference_ratio': 0.25}
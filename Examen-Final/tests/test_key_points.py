@@ -0,0 +1,50 @@
+"""
+Pruebas de los adaptadores de puntos clave de PostureDetector (formato de diccionario original)
+"""
+
+import math
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from posture_analysis import KEY_POINT_INDICES, KEY_POINT_NAMES, MEASUREMENT_NAMES
+from posture_detector import PostureDetector
+
+
+def mediapipe_landmarks(seed=0):
+    """Lista de 33 landmarks con atributos x, y, z y visibility como los de MediaPipe"""
+    values = np.random.default_rng(seed).uniform(0.1, 0.9, (33, 4))
+    return [SimpleNamespace(x=x, y=y, z=z, visibility=v) for x, y, z, v in values]
+
+
+def angle(vector1, vector2):
+    cosine = np.dot(vector1, vector2) / (np.linalg.norm(vector1) * np.linalg.norm(vector2))
+    return math.degrees(math.acos(np.clip(cosine, -1.0, 1.0)))
+
+
+def test_extract_key_points_returns_named_points():
+    landmarks = mediapipe_landmarks()
+    points = PostureDetector(enable_inference=False).extract_key_points(landmarks)
+
+    assert list(points) == list(KEY_POINT_NAMES)
+    for name, index in zip(KEY_POINT_NAMES, KEY_POINT_INDICES):
+        assert points[name] == [landmarks[index].x, landmarks[index].y, landmarks[index].z]
+
+
+def test_calculate_posture_measurements_from_named_points():
+    detector = PostureDetector(enable_inference=False)
+    p = detector.extract_key_points(mediapipe_landmarks(1))
+    measurements = detector.calculate_posture_measurements(p)
+
+    mid = lambda a, b: [(p[a][0] + p[b][0]) / 2, (p[a][1] + p[b][1]) / 2]
+    ear_mid, shoulder_mid, hip_mid = mid('left_ear', 'right_ear'), mid('left_shoulder', 'right_shoulder'), \
+        mid('left_hip', 'right_hip')
+    expected = {
+        'head_forward_distance': abs(p['nose'][2] - (p['left_shoulder'][2] + p['right_shoulder'][2]) / 2),
+        'shoulder_height_diff': abs(p['left_shoulder'][1] - p['right_shoulder'][1]),
+        'neck_angle': angle(np.subtract(ear_mid, shoulder_mid), [0, -1]),
+        'spine_angle': angle(np.subtract(shoulder_mid, hip_mid), [0, -1]),
+        'shoulder_elevation_angle': angle(np.subtract(p['right_shoulder'][:2], p['left_shoulder'][:2]), [1, 0])
+    }
+
+    assert list(measurements) == list(MEASUREMENT_NAMES)
+    assert measurements == pytest.approx(expected)
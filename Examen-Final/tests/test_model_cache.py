@@ -0,0 +1,109 @@
+"""
+Pruebas de la caché de modelos 3D: invalidación por cambios en el modelo o la textura y
+entradas a medio escribir
+"""
+
+import os
+import numpy as np
+import pytest
+
+vedo = pytest.importorskip("vedo")
+from model_cache import ModelCache, _polydata  # noqa: E402
+
+
+@pytest.fixture
+def model(tmp_path):
+    """Modelo .obj y textura de prueba"""
+    model_path = tmp_path / "esfera.obj"
+    vedo.Sphere(res=12).write(str(model_path))
+    texture_path = tmp_path / "esfera.png"
+    texture_path.write_bytes(bytes(range(256)) * 4)
+    return str(model_path), str(texture_path)
+
+
+def cached_entry(cache, model_path, texture_path):
+    """Guarda la malla del modelo en la caché y retorna su clave"""
+    key = cache.key_for(model_path, texture_path)
+    cache.store(key, vedo.Mesh(model_path), {'filename': os.path.basename(model_path)})
+    return key
+
+
+def rewrite(path, change):
+    """Modifica un byte del archivo conservando su tamaño, con una fecha de modificación posterior"""
+    data = bytearray(open(path, 'rb').read())
+    data[change] ^= 0xFF
+    stat = os.stat(path)
+    with open(path, 'wb') as f:
+        f.write(data)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_round_trip_hit(tmp_path, model):
+    cache = ModelCache(str(tmp_path / "cache"))
+    key = cached_entry(cache, *model)
+
+    # Una caché nueva lee el índice del disco y encuentra la entrada
+    cache = ModelCache(str(tmp_path / "cache"))
+    assert cache.key_for(*model) == key
+    mesh, meta = cache.load(key)
+    assert meta['filename'] == "esfera.obj"
+    assert cache.hits == 1 and cache.misses == 0
+
+    original = vedo.Mesh(model[0])
+    np.testing.assert_allclose(mesh.vertices, original.vertices, rtol=1e-6)
+    assert _polydata(mesh).GetNumberOfPolys() == _polydata(original).GetNumberOfPolys()
+
+
+@pytest.mark.parametrize("changed", [0, 1])
+def test_changed_model_or_texture_misses(tmp_path, model, changed):
+    cache = ModelCache(str(tmp_path / "cache"))
+    key = cached_entry(cache, *model)
+
+    rewrite(model[changed], change=-2)
+    new_key = cache.key_for(*model)
+    assert new_key != key
+    assert cache.load(new_key) == (None, None)
+    assert cache.misses == 1
+
+
+def test_grown_file_misses(tmp_path, model):
+    cache = ModelCache(str(tmp_path / "cache"))
+    key = cached_entry(cache, *model)
+
+    with open(model[1], 'ab') as f:
+        f.write(b"\0")
+    assert cache.key_for(*model) != key
+
+
+def test_touched_file_with_same_content_keeps_key(tmp_path, model):
+    cache = ModelCache(str(tmp_path / "cache"))
+    key = cached_entry(cache, *model)
+    stamp = cache.index[os.path.abspath(model[0])]['model']
+
+    stat = os.stat(model[0])
+    os.utime(model[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    # La fecha cambió: se recalcula el hash, pero el contenido es el mismo
+    assert cache.key_for(*model) == key
+    assert cache.index[os.path.abspath(model[0])]['model'] != stamp
+    assert cache.load(key)[0] is not None
+
+
+def test_interrupted_write_is_never_loaded(tmp_path, model):
+    cache = ModelCache(str(tmp_path / "cache"))
+    key = cache.key_for(*model)
+
+    # Escritura interrumpida antes del renombrado: solo existe la carpeta temporal
+    temp_dir = tmp_path / "cache" / f"{key}.tmp"
+    temp_dir.mkdir(parents=True)
+    np.save(temp_dir / "points.npy", np.zeros((3, 3), dtype=np.float32))
+    (temp_dir / "meta.json").write_text('{"filename": "a medias"}', encoding='utf-8')
+
+    assert cache.load(key) == (None, None)
+
+    # La siguiente escritura reemplaza la carpeta temporal y la entrada queda completa
+    cache.store(key, vedo.Mesh(model[0]), {'filename': "esfera.obj"})
+    assert not temp_dir.exists()
+    mesh, meta = cache.load(key)
+    assert meta['filename'] == "esfera.obj"
+    assert len(mesh.vertices) == len(vedo.Mesh(model[0]).vertices)
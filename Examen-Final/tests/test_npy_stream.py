@@ -0,0 +1,72 @@
+"""
+Pruebas de NpyStreamWriter: el archivo es un .npy válido tras cada vaciado
+"""
+
+import numpy as np
+from npy_stream import NpyStreamWriter
+
+RECORD = np.dtype([('t', '<f8'), ('value', '<f4'), ('flag', 'u1')])
+
+
+def test_empty_file_loads_as_empty_array(tmp_path):
+    path = tmp_path / "empty.npy"
+    writer = NpyStreamWriter(str(path), RECORD)
+    writer.close()
+
+    data = np.load(path, mmap_mode='r')
+    assert data.shape == (0,)
+    assert data.dtype == RECORD
+
+
+def test_records_round_trip_across_chunks(tmp_path):
+    path = tmp_path / "records.npy"
+    writer = NpyStreamWriter(str(path), RECORD, chunk_size=4)
+    for i in range(10):
+        writer.append((i * 0.5, i * 2.0, i % 2))
+    assert len(writer) == 10
+    assert writer.count == 8  # Dos bloques completos en disco
+    writer.close()
+
+    data = np.load(path)
+    assert data['t'].tolist() == [i * 0.5 for i in range(10)]
+    assert data['value'].tolist() == [i * 2.0 for i in range(10)]
+    assert data['flag'].tolist() == [i % 2 for i in range(10)]
+
+
+def test_readable_before_close(tmp_path):
+    path = tmp_path / "partial.npy"
+    writer = NpyStreamWriter(str(path), '<f8', chunk_size=3)
+    for i in range(7):
+        writer.append(float(i))
+
+    # Solo lo ya vaciado es visible, como tras una interrupción
+    assert np.load(path, mmap_mode='r').tolist() == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+    writer.flush()
+    assert np.load(path, mmap_mode='r').tolist() == [float(i) for i in range(7)]
+    writer.close()
+
+
+def test_next_slot_fills_in_place(tmp_path):
+    path = tmp_path / "slots.npy"
+    writer = NpyStreamWriter(str(path), RECORD, chunk_size=2)
+    for i in range(3):
+        slot = writer.next_slot()
+        slot['t'] = i
+        slot['value'] = -i
+        writer.commit()
+    writer.close()
+    writer.close()  # Cerrar dos veces no falla
+
+    data = np.load(path)
+    assert data['t'].tolist() == [0.0, 1.0, 2.0]
+    assert data['value'].tolist() == [0.0, -1.0, -2.0]
+    assert data['flag'].tolist() == [0, 0, 0]  # El búfer se limpia entre bloques
+
+
+def test_header_keeps_data_aligned(tmp_path):
+    path = tmp_path / "aligned.npy"
+    writer = NpyStreamWriter(str(path), '<f8')
+    writer.append(1.0)
+    writer.close()
+
+    assert path.stat().st_size % 64 == 8
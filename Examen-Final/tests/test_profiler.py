@@ -0,0 +1,45 @@
+"""
+Pruebas de StageProfiler: agregados por etapa y resúmenes coherentes con registros concurrentes
+"""
+
+import threading
+import pytest
+from profiler import StageProfiler
+
+
+def test_summary_per_stage():
+    profiler = StageProfiler(window=3)
+    for seconds in (0.001, 0.002, 0.003, 0.010):
+        profiler.record('capture', seconds)
+    profiler.record('display', 0.005)
+
+    summary = profiler.summary()
+    assert list(summary) == ['capture', 'display']
+    capture = summary['capture']
+    assert capture['count'] == 4
+    assert capture['mean_ms'] == pytest.approx(4.0)
+    assert capture['max_ms'] == pytest.approx(10.0)
+    assert capture['p50'] == pytest.approx(3.0)  # Percentiles solo de la ventana reciente
+    assert profiler.percentiles('missing') == {}
+    assert profiler.fps('missing') == 0.0
+
+
+def test_summary_is_consistent_while_recording():
+    profiler = StageProfiler()
+    stop = threading.Event()
+
+    def writer():
+        # Cada medición vale 1 ms: la media de cualquier resumen coherente es exactamente 1 ms
+        while not stop.is_set():
+            profiler.record('capture', 0.001)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        for _ in range(200):
+            for entry in profiler.summary().values():
+                assert entry['mean_ms'] == pytest.approx(1.0)
+                assert entry['p99'] == pytest.approx(1.0)
+    finally:
+        stop.set()
+        thread.join()
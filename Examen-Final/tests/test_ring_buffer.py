@@ -0,0 +1,114 @@
+"""
+Pruebas de RingBuffer: expiración por tiempo, sobrescritura al llenarse y agregados
+"""
+
+import numpy as np
+import pytest
+from ring_buffer import RingBuffer
+
+
+def test_rejects_non_positive_capacity():
+    with pytest.raises(ValueError):
+        RingBuffer(0)
+
+
+def test_empty_buffer():
+    buffer = RingBuffer(4)
+    assert len(buffer) == 0
+    assert buffer.total == 0
+    assert buffer.mean() == 0.0
+    assert buffer.oldest_time() is None
+    assert buffer.latest() is None
+    with pytest.raises(IndexError):
+        buffer.popleft()
+
+
+def test_overwrites_oldest_when_full():
+    buffer = RingBuffer(3)
+    for t in range(5):
+        buffer.append(float(t), t * 10.0)
+
+    assert len(buffer) == 3
+    assert buffer.ordered_times().tolist() == [2.0, 3.0, 4.0]
+    assert buffer.ordered_values().tolist() == [20.0, 30.0, 40.0]
+    assert buffer.total == 90.0
+    assert buffer.mean() == 30.0
+    assert buffer.oldest_time() == 2.0
+    assert buffer.latest() == (4.0, 40.0)
+
+
+def test_expire_drops_values_at_or_beyond_window():
+    buffer = RingBuffer(8)
+    for t in range(6):
+        buffer.append(float(t), 1.0)
+
+    # Antigüedad >= 2 s respecto a t = 5: se descartan 0, 1, 2 y 3
+    buffer.expire(5.0, 2.0)
+    assert buffer.ordered_times().tolist() == [4.0, 5.0]
+    assert buffer.total == 2.0
+
+
+def test_expire_keeps_most_recent_values():
+    buffer = RingBuffer(8)
+    for t in range(6):
+        buffer.append(float(t), float(t))
+
+    buffer.expire(100.0, 1.0, keep=3)
+    assert buffer.ordered_times().tolist() == [3.0, 4.0, 5.0]
+    assert buffer.total == 12.0
+
+
+def test_bool_mean_is_event_fraction():
+    buffer = RingBuffer(4, dtype=bool)
+    for t, value in enumerate([True, False, True, True, False]):
+        buffer.append(float(t), value)
+
+    # Quedan los cuatro últimos: False, True, True, False
+    assert buffer.total == 2
+    assert buffer.mean() == 0.5
+
+
+def test_popleft_returns_oldest_pair():
+    buffer = RingBuffer(3)
+    buffer.append(1.0, 5.0)
+    buffer.append(2.0, 7.0)
+
+    assert buffer.popleft() == (1.0, 5.0)
+    assert len(buffer) == 1
+    assert buffer.total == 7.0
+
+
+def test_window_does_not_discard():
+    buffer = RingBuffer(5)
+    for t in range(7):  # Da la vuelta al arreglo interno
+        buffer.append(float(t), float(t))
+
+    times, values = buffer.window(6.0, 2.0)
+    assert times.tolist() == [5.0, 6.0]
+    assert values.tolist() == [5.0, 6.0]
+    assert len(buffer) == 5
+
+
+def test_running_sum_matches_exact_sum():
+    rng = np.random.default_rng(0)
+    buffer = RingBuffer(64)
+    values = rng.normal(size=1000)
+    for t, value in enumerate(values):
+        buffer.append(float(t), value)
+        buffer.expire(float(t), 40.0)
+
+    assert len(buffer) == 40
+    assert buffer.total == pytest.approx(values[-40:].sum())
+    assert buffer.mean() == pytest.approx(values[-40:].mean())
+
+
+def test_clear_resets_aggregates():
+    buffer = RingBuffer(3)
+    buffer.append(0.0, 2.0)
+    buffer.clear()
+
+    assert len(buffer) == 0
+    assert buffer.total == 0
+    buffer.append(1.0, 3.0)
+    assert buffer.ordered_values().tolist() == [3.0]
+    assert buffer.total == 3.0
@@ -0,0 +1,103 @@
+"""
+Pruebas de RoiTracker: conversión del recorte al frame completo e histéresis de la caja
+"""
+
+import numpy as np
+import pytest
+from posture_analysis import KEY_POINT_INDICES
+from roi_tracker import RoiTracker
+
+SHAPE = (480, 640, 3)
+
+
+def pose(center=(0.5, 0.4), size=(0.2, 0.3)):
+    """Landmarks (33, 4) con los puntos clave repartidos en una caja centrada en center"""
+    rng = np.random.default_rng(0)
+    landmarks = np.full((33, 4), 0.5)
+    offsets = rng.uniform(-0.5, 0.5, (len(KEY_POINT_INDICES), 2))
+    offsets[:2] = [[-0.5, -0.5], [0.5, 0.5]]  # Las esquinas fijan el tamaño exacto
+    landmarks[KEY_POINT_INDICES, :2] = np.asarray(center) + offsets * size
+    return landmarks
+
+
+def test_to_frame_without_box_is_identity():
+    landmarks = np.random.default_rng(1).random((33, 4))
+    assert RoiTracker().to_frame(landmarks, None, SHAPE) is landmarks
+
+
+def test_to_frame_maps_crop_to_full_frame():
+    box = (100, 60, 420, 300)  # 320 x 240 píxeles
+    landmarks = np.array([[0.0, 0.0, 0.0, 0.9],
+                          [1.0, 1.0, -0.5, 0.8],
+                          [0.5, 0.25, 0.2, 0.7]])
+
+    mapped = RoiTracker().to_frame(landmarks, box, SHAPE)
+
+    np.testing.assert_allclose(mapped[:, 0], [100 / 640, 420 / 640, 260 / 640])
+    np.testing.assert_allclose(mapped[:, 1], [60 / 480, 300 / 480, 120 / 480])
+    np.testing.assert_allclose(mapped[:, 2], [0.0, -0.25, 0.1])  # z con la escala de x: 320 / 640
+    np.testing.assert_array_equal(mapped[:, 3], landmarks[:, 3])
+    assert mapped is not landmarks and landmarks[1, 0] == 1.0  # La entrada no se modifica
+
+
+def test_crop_and_to_frame_round_trip():
+    tracker = RoiTracker()
+    tracker.update(pose(), SHAPE)
+    image = np.zeros(SHAPE, dtype=np.uint8)
+    crop, box = tracker.crop(image)
+    x0, y0, x1, y1 = box
+    assert crop.shape[:2] == (y1 - y0, x1 - x0)
+
+    # Un punto del frame expresado en coordenadas del recorte vuelve a su posición
+    point = np.array([[0.5, 0.4, 0.1, 1.0]])
+    in_crop = point.copy()
+    in_crop[0, 0] = (point[0, 0] * 640 - x0) / (x1 - x0)
+    in_crop[0, 1] = (point[0, 1] * 480 - y0) / (y1 - y0)
+    in_crop[0, 2] = point[0, 2] * 640 / (x1 - x0)
+    np.testing.assert_allclose(tracker.to_frame(in_crop, box, SHAPE), point)
+
+
+def test_box_is_kept_for_small_motion():
+    tracker = RoiTracker()
+    tracker.update(pose(), SHAPE)
+    box = tracker.box
+
+    for dx in (0.005, -0.01, 0.015, 0.0):
+        tracker.update(pose(center=(0.5 + dx, 0.4 - dx / 2)), SHAPE)
+        assert tracker.box == box
+
+
+def test_box_follows_body_near_edge():
+    tracker = RoiTracker()
+    tracker.update(pose(), SHAPE)
+    box = tracker.box
+
+    tracker.update(pose(center=(0.6, 0.4)), SHAPE)
+    assert tracker.box != box
+    x0, _, x1, _ = tracker.box
+    points = pose(center=(0.6, 0.4))[KEY_POINT_INDICES, 0] * 640
+    assert x0 < points.min() and points.max() < x1
+
+
+def test_box_is_recomputed_on_size_change():
+    tracker = RoiTracker()
+    tracker.update(pose(size=(0.35, 0.5)), SHAPE)
+    box = tracker.box
+
+    # Alejarse de la cámara: el cuerpo sigue dentro de la caja pero mucho más pequeño
+    tracker.update(pose(size=(0.22, 0.3)), SHAPE)
+    assert tracker.box != box
+    assert tracker.box[2] - tracker.box[0] < box[2] - box[0]
+
+
+@pytest.mark.parametrize("landmarks", [None, pose(size=(0.9, 0.9))])
+def test_falls_back_to_full_frame(landmarks):
+    tracker = RoiTracker()
+    tracker.update(pose(), SHAPE)
+    tracker.update(landmarks, SHAPE)
+    assert tracker.box is None
+
+    image = np.zeros(SHAPE, dtype=np.uint8)
+    crop, box = tracker.crop(image)
+    assert box is None and crop is image
+    assert tracker.full_frames == 1
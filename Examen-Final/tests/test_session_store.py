@@ -0,0 +1,126 @@
+"""
+Pruebas del historial de sesiones: pre-agregados por hora y por día e importaciones repetidas
+"""
+
+import pytest
+from posture_statistics import PostureStatistics
+from session_store import DAY, HOUR, SessionStore, split_by_hour
+
+# 20 minutos antes de una hora en punto: la sesión abarca dos horas
+START = 20000 * DAY + 10 * HOUR - 1200
+
+
+class FakeClock:
+    """Reloj controlado por la prueba"""
+
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def recorded_session(log_dir=None, start=START, source=None):
+    """
+    Sesión de 40 minutos: 10 buenos, 20 malos (cruzando la hora) y 10 buenos
+    Un frame por minuto con 'Columna encorvada' durante la mala postura
+    """
+    clock = FakeClock(start)
+    statistics = PostureStatistics(clock=clock, log_dir=log_dir, log_name="prueba", source=source)
+    for minute in range(40):
+        clock.now = start + minute * 60
+        bad = 10 <= minute < 30
+        statistics.update_posture_state(not bad, ["Columna encorvada"] if bad else None)
+    clock.now = start + 40 * 60
+    statistics.end_session()
+    return statistics
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.db"))
+    yield store
+    store.close()
+
+
+def test_split_by_hour():
+    hours = split_by_hour([(HOUR - 600, HOUR + 300, True), (HOUR + 300, HOUR + 900, False)])
+    assert hours == {0: [0.0, 600.0], HOUR: [600.0, 300.0]}
+
+
+def test_add_session_updates_rollups(store):
+    store.add_session(recorded_session(), "ana", source="camara_0")
+
+    hourly = store.hourly_bad_percentage(days=1, user="ana", now=START + DAY / 2)
+    assert len(hourly) == 2
+    # Primera hora: 10 min buenos y 10 malos; segunda: 10 malos y 10 buenos
+    assert [row[1] for row in hourly] == pytest.approx([50.0, 50.0])
+    assert [row[2] for row in hourly] == pytest.approx([1200.0, 1200.0])
+
+    assert store.top_issues(days=1, user="ana", now=START + DAY / 2) == [("ana", "Columna encorvada", 20)]
+
+    (session,) = store.recent_sessions(user="ana")
+    assert session[2] == "camara_0"
+    assert session[4] == pytest.approx(2400.0)
+    assert session[5] == pytest.approx(50.0)
+
+
+def test_rollups_accumulate_across_sessions_and_users(store):
+    store.add_session(recorded_session(), "ana")
+    store.add_session(recorded_session(start=START + HOUR), "ana")
+    store.add_session(recorded_session(), "luis")
+
+    now = START + DAY / 2
+    assert [row[2] for row in store.hourly_bad_percentage(days=1, user="ana", now=now)] == \
+        pytest.approx([1200.0, 2400.0, 1200.0])
+    assert store.top_issues(days=1, now=now) == [("ana", "Columna encorvada", 40),
+                                                 ("luis", "Columna encorvada", 20)]
+    # Fuera del rango consultado
+    assert store.hourly_bad_percentage(days=1, user="ana", now=START + 3 * DAY) == []
+
+
+def test_repeated_session_is_not_counted_twice(store):
+    statistics = recorded_session()
+    first = store.add_session(statistics, "ana")
+    assert store.add_session(statistics, "ana") == first
+    assert store.add_session(statistics, "ana", source="camara_0") != first  # Otra fuente, otra sesión
+
+    assert len(store.recent_sessions(user="ana")) == 2
+    assert store.top_issues(days=1, user="ana", now=START + DAY / 2) == [("ana", "Columna encorvada", 40)]
+
+
+def test_import_log_twice(store, tmp_path):
+    log_dir = tmp_path / "logs"
+    statistics = recorded_session(log_dir=str(log_dir))
+    (log_path,) = log_dir.glob("*.jsonl")
+
+    first = store.import_log(str(log_path), "ana")
+    assert store.import_log(str(log_path), "ana") == first
+
+    (session,) = store.recent_sessions(user="ana")
+    assert session[2] == log_path.name
+    assert session[4] == pytest.approx(statistics.get_session_duration())
+    assert store.top_issues(days=1, user="ana", now=START + DAY / 2) == [("ana", "Columna encorvada", 20)]
+    assert sum(row[2] for row in store.hourly_bad_percentage(days=1, user="ana", now=START + DAY / 2)) == \
+        pytest.approx(2400.0)
+
+
+def test_import_log_of_live_saved_session(store, tmp_path):
+    # Como main.py: la sesión se guarda al terminar con el nombre de la fuente y deja su registro
+    log_dir = tmp_path / "logs"
+    statistics = recorded_session(log_dir=str(log_dir), source="0")
+    saved = store.add_session(statistics, "ana", source="0", profile="full")
+    (log_path,) = log_dir.glob("*.jsonl")
+
+    assert store.import_log(str(log_path), "ana") == saved
+
+    (session,) = store.recent_sessions(user="ana")
+    assert session[2] == "0"
+    assert store.top_issues(days=1, user="ana", now=START + DAY / 2) == [("ana", "Columna encorvada", 20)]
+    assert sum(row[2] for row in store.hourly_bad_percentage(days=1, user="ana", now=START + DAY / 2)) == \
+        pytest.approx(2400.0)
+
+
+def test_session_without_start_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.add_session(PostureStatistics(clock=FakeClock(START)), "ana")
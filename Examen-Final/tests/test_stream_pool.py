@@ -0,0 +1,33 @@
+"""
+Pruebas del procesamiento en paralelo: las fuentes que fallan se reportan como errores
+"""
+
+import queue
+import pytest
+import main
+from posture_detector import PostureDetector
+from stream_pool import StreamSupervisor, _process_source, source_label
+
+
+def test_source_label_is_unique_per_path():
+    assert source_label("cam1/video.mp4") != source_label("cam2/video.mp4")
+    assert source_label("cam1/video.mp4").startswith("video_")
+    assert source_label("cam1/video.mp4") == source_label("cam1/../cam1/video.mp4")
+
+
+def test_failed_run_raises_in_worker(tmp_path, monkeypatch):
+    # Solo la etapa de análisis: la fuente falla antes de inferir
+    monkeypatch.setattr(main, 'PostureDetector', lambda **kwargs: PostureDetector(enable_inference=False))
+    options = {'output_dir': str(tmp_path), 'mirror': True, 'image_fps': 30.0, 'user': "ana"}
+
+    with pytest.raises(RuntimeError, match="Fuente no encontrada"):
+        _process_source(0, str(tmp_path / "no_existe.mp4"), options, queue.Queue())
+
+
+def test_missing_source_lands_in_errors(tmp_path):
+    missing = str(tmp_path / "no_existe.mp4")
+    supervisor = StreamSupervisor([missing], workers=1, output_dir=str(tmp_path))
+    supervisor.run()
+
+    assert supervisor.results == []
+    assert [source for source, _ in supervisor.errors] == [missing]